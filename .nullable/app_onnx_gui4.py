@@ -1,8 +1,5 @@
 import sys
 import pandas as pd
-import numpy as np
-import onnxruntime as ort
-from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 import matplotlib.pyplot as plt
 from PySide6.QtWidgets import (
@@ -10,6 +7,9 @@ from PySide6.QtWidgets import (
     QTableWidgetItem, QHBoxLayout
 )
 from PySide6.QtCore import Qt
+from latent_index import LatentIndex
+from onnx_engine import get_engine
+from scoring_graph import SCORING_MODEL_PATH, align_features, ensure_scoring_model, pivot_error_counts, read_feature_columns
 
 
 class ONNXAnalyzerApp(QMainWindow):
@@ -23,6 +23,8 @@ class ONNXAnalyzerApp(QMainWindow):
         self.analyze_btn = QPushButton("Проанализировать (ONNX)")
         self.status_label = QLabel("Выберите файл для анализа")
         self.table = QTableWidget()
+        self.similar_label = QLabel("Похожие прошлые смены: выберите строку")
+        self.similar_table = QTableWidget()
 
         layout = QVBoxLayout()
         top_layout = QHBoxLayout()
@@ -30,7 +32,9 @@ class ONNXAnalyzerApp(QMainWindow):
         top_layout.addWidget(self.analyze_btn)
         top_layout.addWidget(self.status_label)
         layout.addLayout(top_layout)
-        layout.addWidget(self.table)
+        layout.addWidget(self.table, stretch=3)
+        layout.addWidget(self.similar_label)
+        layout.addWidget(self.similar_table, stretch=1)
 
         container = QWidget()
         container.setLayout(layout)
@@ -39,13 +43,22 @@ class ONNXAnalyzerApp(QMainWindow):
         # === Логика ===
         self.load_btn.clicked.connect(self.load_csv)
         self.analyze_btn.clicked.connect(self.analyze_csv)
+        self.table.cellClicked.connect(self.show_similar)
 
         self.df = None
-        self.model_path = "autoencoder_model.onnx"
+        self.model_path = SCORING_MODEL_PATH
+        # История латентных векторов прошлых смен для поиска похожих
+        self.index = LatentIndex.load()
+        self.neighbours = None
+        self.k_similar = 5
 
-        # Загружаем модель
+        # Загружаем модель (скейлер обучения и ошибка восстановления уже в графе)
         try:
-            self.session = ort.InferenceSession(self.model_path)
+            # Одна прогретая сессия на модель с настроенными потоками и батчами
+            # При первом запуске граф собирается из autoencoder_model.onnx
+            self.engine = get_engine(ensure_scoring_model(self.model_path))
+            self.session = self.engine.session
+            self.feature_columns = read_feature_columns(self.session)
             self.status_label.setText("✅ Модель ONNX загружена")
         except Exception as e:
             self.session = None
@@ -71,33 +84,21 @@ class ONNXAnalyzerApp(QMainWindow):
 
         try:
             # === 1. Подготовка данных ===
-            agg = (
-                self.df.groupby(["export_time", "machine_id", "operator_id", "error_code"])["value"]
-                .agg(["count", "mean"])
-                .reset_index()
-                .pivot_table(
-                    index=["export_time", "machine_id", "operator_id"],
-                    columns="error_code",
-                    values="count",
-                    fill_value=0
-                )
-                .reset_index()
-            )
-
-            X = agg.drop(columns=["export_time", "machine_id", "operator_id"])
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X).astype(np.float32)
+            agg = pivot_error_counts(self.df)
+            X = align_features(agg, self.feature_columns)
 
-            # === 2. Инференс через ONNX ===
-            inputs = {"input": X_scaled}
-            outputs = self.session.run(["output", "latent"], inputs)
-            reconstructed, latent = outputs
-
-            # === 3. Расчет ошибки восстановления ===
-            mse = np.mean((reconstructed - X_scaled) ** 2, axis=1)
+            # === 2. Инференс через ONNX: сырые счётчики -> ошибка восстановления ===
+            result = self.engine.run(X, ["recon_error", "latent"])
+            mse, latent = result["recon_error"], result["latent"]
             agg["recon_error"] = mse
+            report = self.engine.last_report
+
+            # Соседи ищутся по истории до добавления текущей выгрузки — иначе ближайшей окажется сама смена
+            self.neighbours = self.index.query(latent, self.k_similar)
+            added = self.index.add(agg, latent)
+            self.index.save()
 
-            # === 4. Визуализация ===
+            # === 3. Визуализация ===
             pca = PCA(n_components=2)
             Z_pca = pca.fit_transform(latent)
             plt.figure(figsize=(6, 5))
@@ -108,26 +109,39 @@ class ONNXAnalyzerApp(QMainWindow):
             plt.ylabel("Latent 2")
             plt.show()
 
-            # === 5. Таблица ===
+            # === 4. Таблица ===
             self.show_table(agg)
-            self.status_label.setText("✅ Анализ завершен — чем выше ошибка, тем сильнее аномалия")
+            self.status_label.setText(
+                f"✅ Анализ завершен — чем выше ошибка, тем сильнее аномалия "
+                f"({report.throughput:,.0f} строк/с, в истории {len(self.index)} смен, новых {added})"
+            )
 
         except Exception as e:
             self.status_label.setText(f"Ошибка анализа: {e}")
 
-    def show_table(self, df: pd.DataFrame):
-        self.table.clear()
-        self.table.setRowCount(len(df))
-        self.table.setColumnCount(len(df.columns))
-        self.table.setHorizontalHeaderLabels(df.columns.astype(str).tolist())
-
-        for i, row in df.iterrows():
+    def show_similar(self, row: int, column: int = 0):
+        if self.neighbours is None or row >= len(self.neighbours[0]):
+            return
+        dist, idx = self.neighbours
+        similar = self.index.keys.iloc[idx[row]].reset_index(drop=True)
+        similar["distance"] = dist[row]
+        self.similar_label.setText(f"Похожие прошлые смены для строки {row + 1}: {len(similar)}")
+        self.show_table(similar, self.similar_table)
+
+    def show_table(self, df: pd.DataFrame, table: QTableWidget = None):
+        table = table or self.table
+        table.clear()
+        table.setRowCount(len(df))
+        table.setColumnCount(len(df.columns))
+        table.setHorizontalHeaderLabels(df.columns.astype(str).tolist())
+
+        for i, row in enumerate(df.itertuples(index=False)):
             for j, value in enumerate(row):
                 item = QTableWidgetItem(str(value))
                 item.setFlags(Qt.ItemIsEnabled)
-                self.table.setItem(i, j, item)
+                table.setItem(i, j, item)
 
-        self.table.resizeColumnsToContents()
+        table.resizeColumnsToContents()
 
 
 def main():
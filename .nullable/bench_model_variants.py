@@ -0,0 +1,77 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from model_variants import VARIANTS_DIR, build_variants
+from onnx_engine import InferenceEngine
+from scoring_graph import SCORING_MODEL_PATH, align_features, pivot_error_counts, read_feature_columns
+
+BATCH_SIZES = [1, 64, 1024, 8192]
+# Сколько строк гонять при batch_size=1 — иначе замер одиночных запросов идёт минутами
+SINGLE_ROWS = 5_000
+TOP_SHARE = 0.01
+
+
+def load_counts(model_path: str, source: str, rows: int) -> np.ndarray:
+    """Счётчики из выгрузки (CSV) или синтетические пуассоновские при source=None"""
+    engine = InferenceEngine(model_path, batch_size=1)
+    if source is not None:
+        agg = pivot_error_counts(pd.read_csv(source))
+        return align_features(agg, read_feature_columns(engine.session))
+    rng = np.random.default_rng(0)
+    return rng.poisson(1.0, size=(rows, engine.n_features)).astype(np.float32)
+
+
+def drift(reference: np.ndarray, scores: np.ndarray) -> dict:
+    """Расхождение recon_error варианта с fp32: абсолютное, относительное и по ранжированию"""
+    rel = np.abs(scores - reference) / np.maximum(np.abs(reference), 1e-12)
+    k = max(1, int(len(reference) * TOP_SHARE))
+    top_ref = set(np.argpartition(-reference, k - 1)[:k])
+    top_var = set(np.argpartition(-scores, k - 1)[:k])
+    return {
+        "max_abs": float(np.max(np.abs(scores - reference))),
+        "median_rel": float(np.median(rel)),
+        "spearman": float(pd.Series(reference).corr(pd.Series(scores), method="spearman")),
+        f"top{TOP_SHARE:.0%}_overlap": len(top_ref & top_var) / k,
+    }
+
+
+def main():
+    # python bench_model_variants.py [модель] [CSV выгрузки или строк синтетики]
+    model_path = sys.argv[1] if len(sys.argv) > 1 else SCORING_MODEL_PATH
+    source = sys.argv[2] if len(sys.argv) > 2 else "200000"
+    X = load_counts(model_path, None if source.isdigit() else source, int(source) if source.isdigit() else 0)
+    variants = build_variants(model_path, VARIANTS_DIR)
+    print(f"Данные: {X.shape[0]} строк × {X.shape[1]} признаков")
+
+    reference = None
+    latency_rows, drift_rows = [], []
+    for name, path in variants.items():
+        for batch_size in BATCH_SIZES:
+            engine = InferenceEngine(path, batch_size=batch_size)
+            sample = X[:SINGLE_ROWS] if batch_size == 1 else X
+            scores = engine.run(sample, ["recon_error"])["recon_error"]
+            report = engine.last_report
+            ms = np.asarray(report.latencies) * 1000
+            latency_rows.append({
+                "variant": name,
+                "batch": batch_size,
+                "p50_ms": np.percentile(ms, 50),
+                "p99_ms": np.percentile(ms, 99),
+                "rows_per_s": report.throughput,
+            })
+            if batch_size == BATCH_SIZES[-1]:
+                if reference is None:
+                    reference = scores
+                drift_rows.append({"variant": name, **drift(reference, scores)})
+
+    pd.set_option("display.width", 160)
+    print("\nЗадержка и пропускная способность:")
+    print(pd.DataFrame(latency_rows).to_string(index=False, float_format=lambda v: f"{v:,.3f}"))
+    print("\nДрейф recon_error относительно fp32:")
+    print(pd.DataFrame(drift_rows).to_string(index=False, float_format=lambda v: f"{v:.3g}"))
+
+
+if __name__ == "__main__":
+    main()
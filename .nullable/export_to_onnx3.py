@@ -1,8 +1,11 @@
 import torch
 import torch.nn as nn
 import torch.optim as optim
+import io
+import onnx
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
+from scoring_graph import ID_COLUMNS, SCORING_MODEL_PATH, build_scoring_model, pivot_error_counts
 
 class AutoEncoder(nn.Module):
     def __init__(self, input_dim, latent_dim=2):
@@ -25,19 +28,8 @@ class AutoEncoder(nn.Module):
 if __name__ == "__main__":
     # === 1. Загружаем данные ===
     df = pd.read_csv("iot_errors.csv")  # пример
-    agg = (
-        df.groupby(["export_time", "machine_id", "operator_id", "error_code"])["value"]
-        .agg(["count", "mean"])
-        .reset_index()
-        .pivot_table(
-            index=["export_time", "machine_id", "operator_id"],
-            columns="error_code",
-            values="count",
-            fill_value=0
-        )
-        .reset_index()
-    )
-    X = agg.drop(columns=["export_time", "machine_id", "operator_id"])
+    agg = pivot_error_counts(df)
+    X = agg.drop(columns=ID_COLUMNS)
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
 
@@ -58,15 +50,23 @@ if __name__ == "__main__":
     print("✅ Обучение завершено, экспортируем в ONNX...")
 
     # === 3. Экспорт ===
+    model.eval()
     dummy_input = torch.randn(1, X.shape[1])
+    buffer = io.BytesIO()
     torch.onnx.export(
         model,
         dummy_input,
-        "autoencoder_model.onnx",
+        buffer,
         input_names=["input"],
         output_names=["output", "latent"],
-        dynamic_axes={"input": {0: "batch_size"}, "output": {0: "batch_size"}},
+        dynamic_axes={"input": {0: "batch_size"}, "output": {0: "batch_size"}, "latent": {0: "batch_size"}},
         opset_version=17
     )
-
+    autoencoder = onnx.load_from_string(buffer.getvalue())
+    onnx.save(autoencoder, "autoencoder_model.onnx")
     print("💾 Модель сохранена как autoencoder_model.onnx")
+
+    # === 4. Единый граф: обучающий скейлер + автоэнкодер + ошибка восстановления ===
+    scoring = build_scoring_model(autoencoder, scaler.mean_, scaler.scale_, list(X.columns))
+    onnx.save(scoring, SCORING_MODEL_PATH)
+    print(f"💾 Скоринговая модель сохранена как {SCORING_MODEL_PATH}")
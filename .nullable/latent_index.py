@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree, KDTree
+
+from scoring_graph import ID_COLUMNS
+
+INDEX_PATH = "latent_index.joblib"
+
+
+class LatentIndex:
+    """Индекс ближайших соседей по латентным векторам прошлых смен.
+
+    Основная часть векторов лежит в KDTree (или BallTree для больших
+    размерностей); новые смены сначала попадают в «хвост», который
+    просматривается перебором. Дерево перестраивается, когда хвост
+    вырастает больше rebuild_share от проиндексированной части, так что
+    добавление дешёвое, а запрос остаётся логарифмическим.
+    """
+
+    def __init__(self, path: str = INDEX_PATH, leaf_size: int = 40, rebuild_share: float = 0.1,
+                 min_rebuild: int = 1024):
+        self.path = path
+        self.leaf_size = leaf_size
+        self.rebuild_share = rebuild_share
+        self.min_rebuild = min_rebuild
+        self.keys = pd.DataFrame(columns=ID_COLUMNS)
+        self.vectors = None
+        self.tree = None
+        self.n_indexed = 0
+        self._seen = set()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, keys: pd.DataFrame, latent: np.ndarray) -> int:
+        """Добавляет смены (уже известные ключи пропускаются); возвращает число новых"""
+        keys = keys[ID_COLUMNS].astype(str).reset_index(drop=True)
+        latent = np.asarray(latent, dtype=np.float64)
+        tuples = list(keys.itertuples(index=False, name=None))
+        fresh = np.array([key not in self._seen for key in tuples], dtype=bool)
+        # Повторы внутри одного пакета тоже отбрасываем
+        fresh &= ~keys.duplicated().to_numpy()
+        if not fresh.any():
+            return 0
+
+        self._seen.update(key for key, is_new in zip(tuples, fresh) if is_new)
+        self.keys = pd.concat([self.keys, keys[fresh]], ignore_index=True)
+        self.vectors = latent[fresh] if self.vectors is None else np.vstack([self.vectors, latent[fresh]])
+
+        tail = len(self.keys) - self.n_indexed
+        if tail >= max(self.min_rebuild, self.rebuild_share * self.n_indexed):
+            self.rebuild()
+        return int(fresh.sum())
+
+    def rebuild(self):
+        """Строит дерево по всем векторам"""
+        if self.vectors is None or not len(self.vectors):
+            return
+        # KD-дерево эффективно на малых размерностях, дальше лучше шаровое
+        tree_cls = KDTree if self.vectors.shape[1] <= 16 else BallTree
+        self.tree = tree_cls(self.vectors, leaf_size=self.leaf_size)
+        self.n_indexed = len(self.vectors)
+
+    def query(self, latent: np.ndarray, k: int = 5):
+        """k ближайших прошлых смен для каждой строки latent: (расстояния, индексы в keys), по возрастанию"""
+        latent = np.atleast_2d(np.asarray(latent, dtype=np.float64))
+        n = len(self.keys)
+        k = min(k, n)
+        if k == 0:
+            return np.empty((len(latent), 0)), np.empty((len(latent), 0), dtype=np.int64)
+
+        candidates_dist, candidates_idx = [], []
+        if self.tree is not None and self.n_indexed:
+            dist, idx = self.tree.query(latent, k=min(k, self.n_indexed))
+            candidates_dist.append(dist)
+            candidates_idx.append(idx)
+        if n > self.n_indexed:
+            # Хвост после последней перестройки — перебором
+            tail = self.vectors[self.n_indexed:]
+            dist = np.sqrt(((latent[:, None, :] - tail[None, :, :]) ** 2).sum(axis=2))
+            kk = min(k, len(tail))
+            idx = np.argpartition(dist, kk - 1, axis=1)[:, :kk]
+            candidates_dist.append(np.take_along_axis(dist, idx, axis=1))
+            candidates_idx.append(idx + self.n_indexed)
+
+        dist = np.hstack(candidates_dist)
+        idx = np.hstack(candidates_idx)
+        order = np.argsort(dist, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(dist, order, axis=1), np.take_along_axis(idx, order, axis=1)
+
+    def similar(self, latent: np.ndarray, k: int = 5) -> pd.DataFrame:
+        """Ближайшие прошлые смены для одного латентного вектора"""
+        dist, idx = self.query(latent, k)
+        result = self.keys.iloc[idx[0]].reset_index(drop=True)
+        result["distance"] = dist[0]
+        return result
+
+    def save(self, path: str = None):
+        path = path or self.path
+        tmp_path = f"{path}.tmp"
+        joblib.dump({"keys": self.keys, "vectors": self.vectors, "tree": self.tree, "n_indexed": self.n_indexed},
+                    tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = INDEX_PATH, **kwargs) -> "LatentIndex":
+        """Индекс с диска или пустой, если файла ещё нет"""
+        index = cls(path, **kwargs)
+        if os.path.exists(path):
+            state = joblib.load(path)
+            index.keys = state["keys"]
+            index.vectors = state["vectors"]
+            index.tree = state["tree"]
+            index.n_indexed = state["n_indexed"]
+            index._seen = set(index.keys.itertuples(index=False, name=None))
+        return index
+
+
+if __name__ == "__main__":
+    # Запрос к индексу против полного перебора: python latent_index.py [смен в истории] [размерность]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    rng = np.random.default_rng(0)
+    keys = pd.DataFrame({"export_time": np.arange(n).astype(str), "machine_id": "M001", "operator_id": "OP01"})
+    vectors = rng.normal(size=(n, dim))
+
+    index = LatentIndex(path=os.devnull)
+    began = time.perf_counter()
+    index.add(keys, vectors)
+    print(f"Построение на {n} сменах: {time.perf_counter() - began:.2f} с")
+
+    queries = rng.normal(size=(100, dim))
+    began = time.perf_counter()
+    dist, idx = index.query(queries, k=5)
+    tree_ms = (time.perf_counter() - began) / len(queries) * 1000
+
+    began = time.perf_counter()
+    for i, q in enumerate(queries[:10]):
+        brute = np.sqrt(((vectors - q) ** 2).sum(axis=1))
+        assert np.allclose(np.sort(brute)[:5], dist[i])
+    brute_ms = (time.perf_counter() - began) / 10 * 1000
+    print(f"✓ k=5: дерево {tree_ms:.3f} мс на запрос, перебор {brute_ms:.1f} мс на запрос")
@@ -0,0 +1,71 @@
+import asyncio
+import sys
+import time
+
+import httpx
+import numpy as np
+import orjson
+
+ERROR_CODES = ["E101", "E102", "E103", "E104"]
+
+
+def make_records(rng, shifts: int) -> list:
+    """Случайная выгрузка: shifts смен по 1–10 ошибок"""
+    records = []
+    for shift in range(shifts):
+        machine = f"M{rng.integers(1, 50):03d}"
+        operator = f"OP{rng.integers(1, 30):02d}"
+        export_time = f"2025-10-{rng.integers(1, 29):02d} 18:00:00"
+        for code in rng.choice(ERROR_CODES, size=rng.integers(1, 11)):
+            records.append({
+                "export_time": export_time,
+                "machine_id": machine,
+                "operator_id": operator,
+                "error_code": str(code),
+                "value": round(float(rng.uniform(0, 10)), 2),
+            })
+    return records
+
+
+async def worker(client: httpx.AsyncClient, url: str, payloads: list, stop_at: float, latencies: list, errors: list):
+    i = 0
+    while time.perf_counter() < stop_at:
+        began = time.perf_counter()
+        try:
+            response = await client.post(url, content=payloads[i % len(payloads)],
+                                         headers={"content-type": "application/json"})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - began)
+        except httpx.HTTPError as e:
+            errors.append(e)
+        i += 1
+
+
+async def run(url: str, concurrency: int, seconds: float, shifts: int):
+    rng = np.random.default_rng(0)
+    payloads = [orjson.dumps({"records": make_records(rng, shifts)}) for _ in range(64)]
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        began = time.perf_counter()
+        await asyncio.gather(*(worker(client, url, payloads, began + seconds, latencies, errors)
+                               for _ in range(concurrency)))
+        elapsed = time.perf_counter() - began
+        health = (await client.get(url.rsplit("/", 1)[0] + "/health")).json()
+
+    ms = np.asarray(latencies) * 1000
+    print(f"{concurrency} клиентов × {seconds:.0f} с, {shifts} смен в запросе")
+    print(f"✓ {len(ms)} запросов, {len(ms) / elapsed:,.0f} запросов/с, ошибок: {len(errors)}")
+    if len(ms):
+        print(f"  задержка p50 {np.percentile(ms, 50):.1f} мс, p95 {np.percentile(ms, 95):.1f} мс, "
+              f"p99 {np.percentile(ms, 99):.1f} мс, max {ms.max():.1f} мс")
+    print(f"  запросов на один прогон модели: {health['requests_per_batch']:.1f}")
+
+
+if __name__ == "__main__":
+    # python load_generator.py [url] [клиентов] [секунд] [смен в запросе]
+    url = sys.argv[1] if len(sys.argv) > 1 else "http://127.0.0.1:8000/score"
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+    shifts = int(sys.argv[4]) if len(sys.argv) > 4 else 20
+    asyncio.run(run(url, concurrency, seconds, shifts))
@@ -1,8 +1,6 @@
 import sys
 import pandas as pd
-import torch
 import torch.nn as nn
-import torch.optim as optim
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 import matplotlib.pyplot as plt
@@ -17,8 +15,10 @@ from PySide6.QtWidgets import (
     QTableWidget,
     QTableWidgetItem,
     QHBoxLayout,
+    QProgressBar,
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThread
+from training_service import TrainConfig, TrainingWorker
 
 
 # === 1. Простая нейросеть AutoEncoder ===
@@ -48,6 +48,10 @@ class ClusterApp(QMainWindow):
         # UI
         self.load_btn = QPushButton("Загрузить CSV")
         self.analyze_btn = QPushButton("Обучить и проанализировать")
+        self.cancel_btn = QPushButton("Остановить")
+        self.cancel_btn.setEnabled(False)
+        self.progress = QProgressBar()
+        self.progress.setVisible(False)
         self.status_label = QLabel("Выберите файл для анализа")
         self.table = QTableWidget()
 
@@ -55,7 +59,9 @@ class ClusterApp(QMainWindow):
         top_layout = QHBoxLayout()
         top_layout.addWidget(self.load_btn)
         top_layout.addWidget(self.analyze_btn)
+        top_layout.addWidget(self.cancel_btn)
         top_layout.addStretch()
+        top_layout.addWidget(self.progress)
         top_layout.addWidget(self.status_label)
 
         layout = QVBoxLayout()
@@ -68,10 +74,14 @@ class ClusterApp(QMainWindow):
         # Действия
         self.load_btn.clicked.connect(self.load_file)
         self.analyze_btn.clicked.connect(self.analyze_data)
+        self.cancel_btn.clicked.connect(self.cancel_training)
 
         # Данные
         self.df = None
         self.agg = None
+        self.config = TrainConfig()
+        self.thread = None
+        self.worker = None
 
     def load_file(self):
         file_path, _ = QFileDialog.getOpenFileName(
@@ -89,6 +99,8 @@ class ClusterApp(QMainWindow):
         if self.df is None:
             self.status_label.setText("Сначала загрузите CSV!")
             return
+        if self.thread is not None:
+            return
 
         try:
             # === 1. Агрегация ===
@@ -111,47 +123,94 @@ class ClusterApp(QMainWindow):
             X = agg.drop(columns=["export_time", "machine_id", "operator_id"])
             scaler = StandardScaler()
             X_scaled = scaler.fit_transform(X)
-
-            X_tensor = torch.tensor(X_scaled, dtype=torch.float32)
-
-            # === 3. Обучение AutoEncoder ===
-            model = AutoEncoder(input_dim=X.shape[1])
-            optimizer = optim.Adam(model.parameters(), lr=0.01)
-            loss_fn = nn.MSELoss()
-
-            for epoch in range(200):
-                optimizer.zero_grad()
-                out, _ = model(X_tensor)
-                loss = loss_fn(out, X_tensor)
-                loss.backward()
-                optimizer.step()
-
-            # === 4. Оценка аномальности ===
-            with torch.no_grad():
-                recon, Z = model(X_tensor)
-                mse = torch.mean((recon - X_tensor) ** 2, dim=1).numpy()
-
-            agg["recon_error"] = mse
-
-            # === 5. Визуализация ===
-            pca = PCA(n_components=2)
-            Z_pca = pca.fit_transform(Z.numpy())
-            plt.figure(figsize=(6, 5))
-            scatter = plt.scatter(Z_pca[:, 0], Z_pca[:, 1], c=mse, cmap="plasma")
-            plt.colorbar(scatter, label="Ошибка восстановления (аномальность)")
-            plt.title("Анализ смен (AutoEncoder)")
-            plt.xlabel("Latent 1")
-            plt.ylabel("Latent 2")
-            plt.show()
-
-            # === 6. Таблица ===
-            self.show_table(agg)
-            self.status_label.setText(
-                "Анализ завершён ✅ (чем выше ошибка, тем сильнее аномалия)"
-            )
-
         except Exception as e:
             self.status_label.setText(f"Ошибка анализа: {e}")
+            return
+
+        # === 3. Обучение AutoEncoder в фоновом потоке (окно не блокируется) ===
+        self.agg = agg
+        self.worker = TrainingWorker(AutoEncoder(input_dim=X.shape[1]), X_scaled, self.config)
+        self.thread = QThread(self)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.finished.connect(self.on_trained)
+        self.worker.failed.connect(self.on_failed)
+        self.worker.cancelled.connect(self.on_cancelled)
+
+        self.progress.setRange(0, self.config.max_epochs)
+        self.progress.setValue(0)
+        self.progress.setVisible(True)
+        self.analyze_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.status_label.setText("Обучение...")
+        self.thread.start()
+
+    def cancel_training(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.status_label.setText("Остановка...")
+
+    def on_progress(self, epoch: int, train_loss: float, val_loss: float):
+        self.progress.setValue(epoch)
+        self.status_label.setText(
+            f"Эпоха {epoch}/{self.config.max_epochs}: loss {train_loss:.4f}, val {val_loss:.4f}"
+        )
+
+    def on_trained(self, result: dict):
+        self.finish_training()
+        agg = self.agg
+        mse = result["recon_error"]
+        agg["recon_error"] = mse
+
+        # === 4. Визуализация ===
+        pca = PCA(n_components=2)
+        Z_pca = pca.fit_transform(result["latent"])
+        plt.figure(figsize=(6, 5))
+        scatter = plt.scatter(Z_pca[:, 0], Z_pca[:, 1], c=mse, cmap="plasma")
+        plt.colorbar(scatter, label="Ошибка восстановления (аномальность)")
+        plt.title("Анализ смен (AutoEncoder)")
+        plt.xlabel("Latent 1")
+        plt.ylabel("Latent 2")
+        plt.show()
+
+        # === 5. Таблица ===
+        self.show_table(agg)
+        self.status_label.setText(
+            f"Анализ завершён ✅ (лучшая эпоха {result['best_epoch']} из {result['epochs']}, "
+            f"веса в {self.config.checkpoint_path}; чем выше ошибка, тем сильнее аномалия)"
+        )
+
+    def on_failed(self, message: str):
+        self.finish_training()
+        self.status_label.setText(f"Ошибка анализа: {message}")
+
+    def on_cancelled(self):
+        self.finish_training()
+        self.status_label.setText("Обучение остановлено")
+
+    def finish_training(self):
+        self.thread.quit()
+        self.thread.wait()
+        self.thread = None
+        self.worker = None
+        self.progress.setVisible(False)
+        self.analyze_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+
+    def closeEvent(self, event):
+        # Не оставляем поток обучения работать после закрытия окна
+        if self.thread is not None:
+            # Сигналы воркера отключаем заранее: поставленный в очередь cancelled
+            # не должен вызвать finish_training после остановки потока
+            for signal in (self.worker.progress, self.worker.finished, self.worker.failed, self.worker.cancelled):
+                signal.disconnect()
+            self.worker.cancel()
+            self.thread.quit()
+            self.thread.wait()
+            self.thread = None
+            self.worker = None
+        super().closeEvent(event)
 
     def show_table(self, df: pd.DataFrame):
         self.table.clear()
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import onnxruntime as ort
+from onnxruntime.quantization import QuantType, quant_pre_process, quantize_dynamic
+
+VARIANTS_DIR = "variants"
+
+
+def optimize_offline(model_path: str, out_path: str,
+                     level=ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED) -> str:
+    """Сохраняет граф после оптимизаций ORT (слияние Gemm+Relu, свёртка констант и т. п.).
+
+    ENABLE_ALL не используется: layout-оптимизации привязаны к железу, на котором
+    граф сохранён, а такой файл должен переноситься между машинами.
+    """
+    options = ort.SessionOptions()
+    options.graph_optimization_level = level
+    options.optimized_model_filepath = out_path
+    ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+    return out_path
+
+
+def quantize_int8(model_path: str, out_path: str) -> str:
+    """Динамическое int8-квантование весов (активации квантуются на лету при инференсе)"""
+    prepared = f"{out_path}.prep.onnx"
+    try:
+        # Вывод форм и упрощение графа перед квантованием, как рекомендует ORT
+        quant_pre_process(model_path, prepared, skip_symbolic_shape=True)
+        quantize_dynamic(prepared, out_path, weight_type=QuantType.QInt8)
+    finally:
+        if os.path.exists(prepared):
+            os.remove(prepared)
+    return out_path
+
+
+def build_variants(model_path: str, out_dir: str = VARIANTS_DIR) -> dict:
+    """Все варианты модели: {имя: путь}; fp32 — исходный файл"""
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    optimized = optimize_offline(model_path, os.path.join(out_dir, f"{stem}.opt.onnx"))
+    int8 = quantize_int8(model_path, os.path.join(out_dir, f"{stem}.int8.onnx"))
+    int8_optimized = optimize_offline(int8, os.path.join(out_dir, f"{stem}.int8.opt.onnx"))
+    return {"fp32": model_path, "fp32_opt": optimized, "int8": int8, "int8_opt": int8_optimized}
+
+
+if __name__ == "__main__":
+    # python model_variants.py [autoencoder_scoring.onnx] [папка]
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "autoencoder_scoring.onnx"
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else VARIANTS_DIR
+    for name, path in build_variants(model_path, out_dir).items():
+        print(f"💾 {name}: {path} ({os.path.getsize(path) / 1024:.1f} КБ)")
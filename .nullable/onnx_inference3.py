@@ -1,43 +1,27 @@
-import onnxruntime as ort
-import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 import matplotlib.pyplot as plt
+from onnx_engine import get_engine
+from scoring_graph import align_features, ensure_scoring_model, pivot_error_counts, read_feature_columns
 
 
-# === 1. Загружаем ONNX модель ===
-session = ort.InferenceSession("autoencoder_model.onnx")
+# === 1. Загружаем ONNX модель (скейлер и ошибка восстановления внутри графа) ===
+# При первом запуске граф собирается из autoencoder_model.onnx
+engine = get_engine(ensure_scoring_model())
+feature_columns = read_feature_columns(engine.session)
 
 # === 2. Загружаем новые данные ===
 df = pd.read_csv("iot_errors_new.csv")  # новая выгрузка
-agg = (
-    df.groupby(["export_time", "machine_id", "operator_id", "error_code"])["value"]
-    .agg(["count", "mean"])
-    .reset_index()
-    .pivot_table(
-        index=["export_time", "machine_id", "operator_id"],
-        columns="error_code",
-        values="count",
-        fill_value=0
-    )
-    .reset_index()
-)
-X = agg.drop(columns=["export_time", "machine_id", "operator_id"])
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X).astype(np.float32)
+agg = pivot_error_counts(df)
+X = align_features(agg, feature_columns)
 
-# === 3. Инференс ===
-inputs = {"input": X_scaled}
-outputs = session.run(["output", "latent"], inputs)
-reconstructed = outputs[0]
-latent = outputs[1]
-
-# === 4. Подсчет ошибки восстановления ===
-mse = np.mean((reconstructed - X_scaled) ** 2, axis=1)
+# === 3. Инференс: сырые счётчики -> ошибка восстановления ===
+result = engine.run(X, ["recon_error", "latent"])
+mse, latent = result["recon_error"], result["latent"]
 agg["recon_error"] = mse
+print(f"⏱ {engine.last_report.summary()}")
 
-# === 5. Визуализация ===
+# === 4. Визуализация ===
 pca = PCA(n_components=2)
 Z_pca = pca.fit_transform(latent)
 plt.scatter(Z_pca[:, 0], Z_pca[:, 1], c=mse, cmap="plasma")
@@ -45,6 +29,6 @@ plt.colorbar(label="Ошибка восстановления (аномальн
 plt.title("ONNX-анализ производительности смен")
 plt.show()
 
-# === 6. Сохранение отчета ===
+# === 5. Сохранение отчета ===
 agg.to_csv("anomaly_report.csv", index=False)
 print("✅ Анализ завершен. Результаты сохранены в anomaly_report.csv")
@@ -0,0 +1,154 @@
+import json
+import os
+import sys
+
+import numpy as np
+import onnx
+import pandas as pd
+from onnx import TensorProto, helper, numpy_helper
+
+ID_COLUMNS = ["export_time", "machine_id", "operator_id"]
+SCORING_MODEL_PATH = "autoencoder_scoring.onnx"
+# Сырой автоэнкодер из репозитория и выгрузка, по которой для него считается скейлер
+RAW_MODEL_PATH = "autoencoder_model.onnx"
+TRAIN_DATA_PATH = "errors.csv"
+
+# Имена входа/выходов скорингового графа
+COUNTS_INPUT = "counts"
+SCORING_OUTPUTS = ["recon_error", "latent", "output"]
+FEATURES_KEY = "feature_columns"
+
+
+def pivot_error_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """Число ошибок каждого кода по смене (export_time, machine_id, operator_id)"""
+    return (
+        df.groupby(ID_COLUMNS + ["error_code"])["value"]
+        .count()
+        .reset_index()
+        .pivot_table(index=ID_COLUMNS, columns="error_code", values="value", fill_value=0)
+        .reset_index()
+    )
+
+
+def build_scoring_model(autoencoder: onnx.ModelProto, mean, scale, feature_columns: list) -> onnx.ModelProto:
+    """Оборачивает граф автоэнкодера в один граф «сырые счётчики -> recon_error».
+
+    Перед автоэнкодером добавляется нормализация обучающим скейлером
+    ((counts - mean) / scale), после — ошибка восстановления
+    mean((output - scaled)^2) по признакам. У всех выходов динамическая ось батча.
+    Порядок признаков сохраняется в метаданных модели (feature_columns).
+    Переданный autoencoder не изменяется.
+    """
+    # Входы узлов переписываются ниже — работаем с копией, а не с моделью вызывающего
+    copy = onnx.ModelProto()
+    copy.CopyFrom(autoencoder)
+    autoencoder = copy
+    graph = autoencoder.graph
+    ae_input = graph.input[0].name
+    n_features = len(feature_columns)
+
+    # Вход автоэнкодера теперь — нормализованные признаки внутри графа
+    for node in graph.node:
+        node.input[:] = ["scaled" if name == ae_input else name for name in node.input]
+
+    mean = np.asarray(mean, dtype=np.float32).reshape(1, -1)
+    scale = np.asarray(scale, dtype=np.float32).reshape(1, -1)
+    opset = next(op.version for op in autoencoder.opset_import if op.domain in ("", "ai.onnx"))
+    if opset >= 18:
+        # С opset 18 оси ReduceMean передаются входом, а не атрибутом
+        reduce_mean = helper.make_node("ReduceMean", ["squared", "reduce_axes"], ["recon_error"], keepdims=0)
+        extra = [numpy_helper.from_array(np.array([1], dtype=np.int64), "reduce_axes")]
+    else:
+        reduce_mean = helper.make_node("ReduceMean", ["squared"], ["recon_error"], axes=[1], keepdims=0)
+        extra = []
+
+    nodes = [
+        helper.make_node("Sub", [COUNTS_INPUT, "scaler_mean"], ["centered"]),
+        helper.make_node("Div", ["centered", "scaler_scale"], ["scaled"]),
+        *graph.node,
+        helper.make_node("Sub", ["output", "scaled"], ["residual"]),
+        helper.make_node("Mul", ["residual", "residual"], ["squared"]),
+        reduce_mean,
+    ]
+    initializers = [
+        numpy_helper.from_array(mean, "scaler_mean"),
+        numpy_helper.from_array(scale, "scaler_scale"),
+        *graph.initializer,
+        *extra,
+    ]
+    latent_dim = _last_dim(graph.output, "latent")
+
+    scoring = helper.make_graph(
+        nodes,
+        "autoencoder_scoring",
+        [helper.make_tensor_value_info(COUNTS_INPUT, TensorProto.FLOAT, ["batch_size", n_features])],
+        [
+            helper.make_tensor_value_info("recon_error", TensorProto.FLOAT, ["batch_size"]),
+            helper.make_tensor_value_info("latent", TensorProto.FLOAT, ["batch_size", latent_dim]),
+            helper.make_tensor_value_info("output", TensorProto.FLOAT, ["batch_size", n_features]),
+        ],
+        initializers,
+    )
+    model = helper.make_model(scoring, opset_imports=list(autoencoder.opset_import))
+    model.ir_version = autoencoder.ir_version
+    helper.set_model_props(model, {FEATURES_KEY: json.dumps([str(c) for c in feature_columns])})
+    onnx.checker.check_model(model)
+    return model
+
+
+def _last_dim(values, name: str):
+    for value in values:
+        if value.name == name:
+            dim = value.type.tensor_type.shape.dim[-1]
+            return dim.dim_value or dim.dim_param
+    raise ValueError(f"В графе нет выхода {name}")
+
+
+def read_feature_columns(session) -> list:
+    """Порядок признаков, на котором обучалась модель (из метаданных ONNX)"""
+    props = session.get_modelmeta().custom_metadata_map
+    if FEATURES_KEY not in props:
+        raise ValueError("В модели нет feature_columns — нужен граф из export_to_onnx3.py")
+    return json.loads(props[FEATURES_KEY])
+
+
+def align_features(agg: pd.DataFrame, feature_columns: list) -> np.ndarray:
+    """Счётчики в порядке обучения: незнакомые коды отбрасываются, отсутствующие — нули"""
+    counts = agg.drop(columns=ID_COLUMNS)
+    counts.columns = counts.columns.astype(str)
+    return counts.reindex(columns=feature_columns, fill_value=0).to_numpy(dtype=np.float32)
+
+
+def build_from_raw(train_path: str = TRAIN_DATA_PATH, model_path: str = RAW_MODEL_PATH,
+                   out_path: str = SCORING_MODEL_PATH) -> str:
+    """Обёртка уже обученного автоэнкодера без переобучения.
+
+    Скейлер считается по обучающей выгрузке — той же, на которой обучался автоэнкодер.
+    """
+    X = pivot_error_counts(pd.read_csv(train_path)).drop(columns=ID_COLUMNS)
+    values = X.to_numpy(dtype=np.float64)
+    std = values.std(axis=0)
+    # Как у StandardScaler: постоянные признаки не масштабируются
+    scale = np.where(std > 0, std, 1.0)
+    model = build_scoring_model(onnx.load(model_path), values.mean(axis=0), scale, list(X.columns))
+    onnx.save(model, out_path)
+    print(f"🔹 Скейлер пересчитан по {train_path} ({len(values)} смен), а не взят из обучения")
+    print(f"💾 Скоринговая модель сохранена как {out_path}")
+    return out_path
+
+
+def ensure_scoring_model(path: str = SCORING_MODEL_PATH, raw_path: str = RAW_MODEL_PATH,
+                         train_path: str = TRAIN_DATA_PATH) -> str:
+    """Путь к скоринговой модели; она собирается из сырого автоэнкодера, если её ещё нет
+    или сырой автоэнкодер новее (переобучен после сборки)"""
+    if not os.path.exists(path):
+        build_from_raw(train_path, raw_path, path)
+    elif os.path.exists(raw_path) and os.path.getmtime(raw_path) > os.path.getmtime(path):
+        print(f"🔹 {raw_path} новее {path} — скоринговая модель собирается заново")
+        build_from_raw(train_path, raw_path, path)
+    return path
+
+
+if __name__ == "__main__":
+    # python scoring_graph.py [обучающий CSV] [autoencoder_model.onnx] [autoencoder_scoring.onnx]
+    build_from_raw(*sys.argv[1:4])
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+import numpy as np
+import orjson
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request, Response
+
+from onnx_engine import get_engine
+from scoring_graph import ID_COLUMNS, SCORING_MODEL_PATH, read_feature_columns
+
+MODEL_PATH = os.environ.get("SCORING_MODEL", SCORING_MODEL_PATH)
+# Микро-батч: не больше MAX_BATCH_ROWS строк и не дольше MAX_WAIT_MS ожидания попутчиков
+MAX_BATCH_ROWS = int(os.environ.get("MAX_BATCH_ROWS", 4096))
+MAX_WAIT_MS = float(os.environ.get("MAX_WAIT_MS", 5))
+
+
+class MicroBatcher:
+    """Склеивает строки параллельных запросов в один прогон модели.
+
+    Первый запрос в очереди ждёт попутчиков не дольше max_wait_ms или пока не
+    наберётся max_rows строк; затем общий массив прогоняется одним run
+    (в отдельном потоке, чтобы не блокировать event loop), и каждый запрос
+    получает свой срез recon_error.
+    """
+
+    def __init__(self, engine, max_rows: int = MAX_BATCH_ROWS, max_wait_ms: float = MAX_WAIT_MS):
+        self.engine = engine
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.requests = 0
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def score(self, X: np.ndarray) -> np.ndarray:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((X, future))
+        return await future
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            rows = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            while rows < self.max_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                rows += len(item[0])
+
+            try:
+                X = np.concatenate([x for x, _ in pending])
+                result = await asyncio.to_thread(self.engine.run, X, ["recon_error"])
+                scores = result["recon_error"]
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.requests += len(pending)
+            offset = 0
+            for x, future in pending:
+                if not future.done():
+                    future.set_result(scores[offset:offset + len(x)])
+                offset += len(x)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Одна прогретая сессия на процесс; размер батча движка = предел микро-батча,
+    # а меньшие батчи движок прогоняет по фактическому числу строк, без дополнения нулями
+    engine = get_engine(MODEL_PATH, MAX_BATCH_ROWS)
+    app.state.feature_columns = read_feature_columns(engine.session)
+    app.state.batcher = MicroBatcher(engine)
+    app.state.batcher.start()
+    print(f"✓ Модель {MODEL_PATH} загружена, признаков: {len(app.state.feature_columns)}")
+    yield
+    await app.state.batcher.stop()
+
+
+app = FastAPI(title="Скоринг смен (ONNX)", lifespan=lifespan)
+
+
+def count_matrix(records: list, feature_columns: list):
+    """То же, что pivot_error_counts + align_features, но без pandas — для запросов из десятков записей.
+
+    Смены отсортированы по (export_time, machine_id, operator_id), как в pivot_table;
+    записи без value не считаются, коды вне обучения отбрасываются.
+    """
+    column = {code: i for i, code in enumerate(feature_columns)}
+    counts = {}
+    for record in records:
+        if record.get("value") is None:
+            continue
+        key = tuple(str(record[c]) for c in ID_COLUMNS)
+        row = counts.setdefault(key, [0] * len(feature_columns))
+        i = column.get(str(record["error_code"]))
+        if i is not None:
+            row[i] += 1
+    keys = sorted(counts)
+    return keys, np.array([counts[k] for k in keys], dtype=np.float32).reshape(len(keys), len(feature_columns))
+
+
+def json_response(content, status_code: int = 200) -> Response:
+    return Response(orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY), status_code=status_code,
+                    media_type="application/json")
+
+
+@app.post("/score")
+async def score(request: Request):
+    """Записи выгрузки ошибок -> recon_error по каждой смене (export_time, machine_id, operator_id)"""
+    try:
+        body = orjson.loads(await request.body())
+        keys, X = count_matrix(body["records"], request.app.state.feature_columns)
+    except (orjson.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=422, detail=f"Ожидается {{'records': [...]}}: {e!r}")
+    if not keys:
+        return json_response({"shifts": []})
+
+    recon_error = await request.app.state.batcher.score(X)
+    shifts = [dict(zip(ID_COLUMNS, key), recon_error=float(error)) for key, error in zip(keys, recon_error)]
+    return json_response({"shifts": shifts})
+
+
+@app.get("/health")
+async def health(request: Request):
+    batcher = request.app.state.batcher
+    return json_response({
+        "model": MODEL_PATH,
+        "batches": batcher.batches,
+        "requests": batcher.requests,
+        "requests_per_batch": batcher.requests / batcher.batches if batcher.batches else 0.0,
+        "time": time.time(),
+    })
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host=os.environ.get("HOST", "127.0.0.1"), port=int(os.environ.get("PORT", 8000)),
+                access_log=False)
@@ -0,0 +1,136 @@
+import os
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from torch.utils.data import DataLoader, TensorDataset
+from PySide6.QtCore import QObject, Signal, Slot
+
+
+@dataclass
+class TrainConfig:
+    """Параметры обучения автоэнкодера"""
+    max_epochs: int = 200
+    batch_size: int = 256
+    lr: float = 0.01
+    val_share: float = 0.2
+    # Ранняя остановка: сколько эпох ждать улучшения val loss хотя бы на min_delta
+    patience: int = 10
+    min_delta: float = 1e-4
+    # Не забираем все ядра — окну и остальным процессам тоже нужен CPU
+    num_threads: int = max(1, min(4, (os.cpu_count() or 2) - 1))
+    checkpoint_path: str = "autoencoder_best.pt"
+    seed: int = 0
+
+
+class TrainingCancelled(Exception):
+    pass
+
+
+def split_loaders(X: np.ndarray, config: TrainConfig):
+    """Мини-батчи для обучения и валидации (валидация — случайная доля val_share строк)"""
+    X_tensor = torch.tensor(X, dtype=torch.float32)
+    generator = torch.Generator().manual_seed(config.seed)
+    order = torch.randperm(len(X_tensor), generator=generator)
+    n_val = int(len(X_tensor) * config.val_share)
+    if n_val == 0 or n_val == len(X_tensor):
+        # Слишком мало строк для отдельной выборки — проверяем на обучающих
+        train_idx, val_idx = order, order
+    else:
+        train_idx, val_idx = order[n_val:], order[:n_val]
+
+    train = DataLoader(TensorDataset(X_tensor[train_idx]), batch_size=config.batch_size,
+                       shuffle=True, generator=generator)
+    val = DataLoader(TensorDataset(X_tensor[val_idx]), batch_size=config.batch_size * 4)
+    return train, val
+
+
+def train_autoencoder(model: nn.Module, X: np.ndarray, config: TrainConfig = None,
+                      on_epoch=None, cancel_event: threading.Event = None) -> dict:
+    """Обучает model на X мини-батчами с ранней остановкой по val loss.
+
+    Лучшие веса сохраняются в config.checkpoint_path и загружаются в модель в конце.
+    on_epoch(epoch, train_loss, val_loss) вызывается после каждой эпохи;
+    установленный cancel_event прерывает обучение (TrainingCancelled) между батчами.
+    """
+    config = config or TrainConfig()
+    torch.manual_seed(config.seed)
+    torch.set_num_threads(config.num_threads)
+    train_loader, val_loader = split_loaders(X, config)
+
+    optimizer = optim.Adam(model.parameters(), lr=config.lr)
+    loss_fn = nn.MSELoss()
+    best_loss, best_epoch, history = float("inf"), 0, []
+
+    for epoch in range(1, config.max_epochs + 1):
+        model.train()
+        train_sum = 0.0
+        for (batch,) in train_loader:
+            if cancel_event is not None and cancel_event.is_set():
+                raise TrainingCancelled()
+            optimizer.zero_grad()
+            out, _ = model(batch)
+            loss = loss_fn(out, batch)
+            loss.backward()
+            optimizer.step()
+            train_sum += loss.item() * len(batch)
+        train_loss = train_sum / len(train_loader.dataset)
+
+        model.eval()
+        with torch.no_grad():
+            val_sum = sum(loss_fn(model(batch)[0], batch).item() * len(batch) for (batch,) in val_loader)
+        val_loss = val_sum / len(val_loader.dataset)
+        history.append((train_loss, val_loss))
+
+        if val_loss < best_loss - config.min_delta:
+            best_loss, best_epoch = val_loss, epoch
+            torch.save(model.state_dict(), config.checkpoint_path)
+        if on_epoch is not None:
+            on_epoch(epoch, train_loss, val_loss)
+        if epoch - best_epoch >= config.patience:
+            break
+
+    if best_epoch:
+        model.load_state_dict(torch.load(config.checkpoint_path))
+    model.eval()
+    return {"best_epoch": best_epoch, "best_val_loss": best_loss, "epochs": len(history), "history": history}
+
+
+class TrainingWorker(QObject):
+    """Обучение и скоринг в отдельном QThread; окно получает только сигналы"""
+
+    progress = Signal(int, float, float)
+    finished = Signal(object)
+    failed = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, model: nn.Module, X: np.ndarray, config: TrainConfig = None):
+        super().__init__()
+        self.model = model
+        self.X = X
+        self.config = config or TrainConfig()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        # Вызывается из потока окна — флаг проверяется между батчами
+        self._cancel.set()
+
+    @Slot()
+    def run(self):
+        try:
+            summary = train_autoencoder(self.model, self.X, self.config,
+                                        on_epoch=self.progress.emit, cancel_event=self._cancel)
+            # Ошибка восстановления и латентные координаты на лучших весах
+            X_tensor = torch.tensor(self.X, dtype=torch.float32)
+            with torch.no_grad():
+                recon, Z = self.model(X_tensor)
+                summary["recon_error"] = torch.mean((recon - X_tensor) ** 2, dim=1).numpy()
+                summary["latent"] = Z.numpy()
+            self.finished.emit(summary)
+        except TrainingCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
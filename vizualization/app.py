@@ -3,6 +3,8 @@ import pandas as pd
 import plotly.graph_objects as go
 from nicegui import ui
 
+from core.lazy_tabs import LazyTabPanels
+
 
 class ChartCard:
     """Универсальный класс для отображения графика с подписью и легендой"""
@@ -92,8 +94,8 @@ class Footer:
 class DashboardTab:
     """Вкладка с общей статистикой и кластеризацией"""
     
-    def __init__(self):
-        self.df_clusters = DataGenerator.generate_clusters_data()
+    def __init__(self, df_clusters: pd.DataFrame):
+        self.df_clusters = df_clusters
         self.render()
     
     def render(self):
@@ -154,8 +156,8 @@ class DashboardTab:
 class TrendsTab:
     """Вкладка для временных рядов и прогнозов"""
     
-    def __init__(self):
-        self.df_ts = DataGenerator.generate_timeseries_data()
+    def __init__(self, df_ts: pd.DataFrame):
+        self.df_ts = df_ts
         self.render()
     
     def render(self):
@@ -209,8 +211,8 @@ class TrendsTab:
 class AnomaliesTab:
     """Вкладка для визуализации отклонений и аномалий"""
     
-    def __init__(self):
-        self.df_anom = DataGenerator.generate_anomalies_data()
+    def __init__(self, df_anom: pd.DataFrame):
+        self.df_anom = df_anom
         self.render()
     
     def render(self):
@@ -283,13 +285,12 @@ class MainTabs:
             ui.tab('Тренды')
             ui.tab('Аномалии')
         
-        with ui.tab_panels(tabs, value='Обзор').classes('w-full'):
-            with ui.tab_panel('Обзор').classes('p-4 flex flex-col items-center gap-6'):
-                DashboardTab()
-            with ui.tab_panel('Тренды').classes('p-4 flex flex-col items-center gap-6'):
-                TrendsTab()
-            with ui.tab_panel('Аномалии').classes('p-4 flex flex-col items-center gap-6'):
-                AnomaliesTab()
+        # Вкладка строится при первом открытии, данные для неё готовятся в фоне
+        panels = LazyTabPanels(tabs, value='Обзор', classes='w-full',
+                               panel_classes='p-4 flex flex-col items-center gap-6')
+        panels.tab('Обзор', DashboardTab, compute=DataGenerator.generate_clusters_data)
+        panels.tab('Тренды', TrendsTab, compute=DataGenerator.generate_timeseries_data)
+        panels.tab('Аномалии', AnomaliesTab, compute=DataGenerator.generate_anomalies_data)
 
 
 class AppLayout:
@@ -1,3 +1,5 @@
+import threading
+
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
@@ -6,6 +8,11 @@ from nicegui import ui
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 
+from core.dataset_registry import Dataset
+from core.figure_cache import figure_cache
+from core.model_registry import data_fingerprint
+from core.scatter import scatter_class
+
 
 class ChartCard:
     """Универсальный класс для отображения графика с подписью и легендой"""
@@ -19,6 +26,8 @@ class ChartCard:
 
 class DataGenerator:
     """Генератор тестовых данных"""
+    _shared = None
+    _shared_lock = threading.Lock()
     
     @staticmethod
     def generate_error_data():
@@ -38,19 +47,39 @@ class DataGenerator:
                 })
         
         return pd.DataFrame(data)
+    
+    @classmethod
+    def shared_dataset(cls) -> Dataset:
+        """Один набор данных на процесс для всех графиков; версия — отпечаток содержимого"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                data = cls.generate_error_data()
+                cls._shared = Dataset(path='generated', version=data_fingerprint(data), data=data)
+            return cls._shared
+
+
+def cached_figure(chart: str, build, **params) -> dict:
+    """Фигура графика из figure_cache; build(df, **params) вызывается только при промахе"""
+    dataset = DataGenerator.shared_dataset()
+    # build получает поверхностную копию: добавленные колонки не попадут в общий датасет
+    return figure_cache.get_or_build(chart, dataset.version, params, lambda: build(dataset.view(), **params))
 
 
 class ScatterPlotChart:
     """Scatter Plot - каждая точка - ошибка, размер - кол-во повторов"""
     
     def __init__(self):
-        df = DataGenerator.generate_error_data()
-        
+        figure = cached_figure(type(self).__name__, self.build)
+        ChartCard('📍 Scatter Plot', 'Каждая точка - ошибка, размер - количество повторов', figure)
+    
+    @staticmethod
+    def build(df: pd.DataFrame) -> go.Figure:
         fig = go.Figure()
+        trace_class = scatter_class(len(df))
         
         for code in df['Код ошибки'].unique():
             code_data = df[df['Код ошибки'] == code]
-            fig.add_trace(go.Scatter(
+            fig.add_trace(trace_class(
                 x=code_data['Дата выгрузки'],
                 y=code_data['Значение параметра'],
                 mode='markers',
@@ -60,11 +89,8 @@ class ScatterPlotChart:
                     opacity=0.7,
                     line=dict(width=2)
                 ),
-                text=[f"Ошибка: {c}<br>Значение: {v:.2f}<br>Повторов: {r}" 
-                      for c, v, r in zip(code_data['Код ошибки'], 
-                                        code_data['Значение параметра'],
-                                        code_data['Кол-во повторов'])],
-                hovertemplate='%{text}<extra></extra>'
+                customdata=code_data['Кол-во повторов'],
+                hovertemplate=f'Ошибка: {code}<br>Значение: %{{y:.2f}}<br>Повторов: %{{customdata}}<extra></extra>'
             ))
         
         fig.update_layout(
@@ -76,15 +102,18 @@ class ScatterPlotChart:
             template='plotly_white'
         )
         
-        ChartCard('📍 Scatter Plot', 'Каждая точка - ошибка, размер - количество повторов', fig)
+        return fig
 
 
 class BarChartByError:
     """Bar Chart - распределение ошибок по кодам"""
     
     def __init__(self):
-        df = DataGenerator.generate_error_data()
-        
+        figure = cached_figure(type(self).__name__, self.build)
+        ChartCard('📊 Bar Chart', 'Распределение количества повторов по кодам ошибок', figure)
+    
+    @staticmethod
+    def build(df: pd.DataFrame) -> go.Figure:
         error_stats = df.groupby('Код ошибки').agg({
             'Кол-во повторов': 'sum',
             'Значение параметра': 'mean'
@@ -109,14 +138,18 @@ class BarChartByError:
             template='plotly_white'
         )
         
-        ChartCard('📊 Bar Chart', 'Распределение количества повторов по кодам ошибок', fig)
+        return fig
 
 
 class BarChartByDate:
     """Bar Chart - распределение ошибок по датам"""
     
     def __init__(self):
-        df = DataGenerator.generate_error_data()
+        figure = cached_figure(type(self).__name__, self.build)
+        ChartCard('📈 Bar Chart by Date', 'Количество ошибок, зафиксированных в каждый день', figure)
+    
+    @staticmethod
+    def build(df: pd.DataFrame) -> go.Figure:
         df['Дата'] = df['Дата выгрузки'].dt.strftime('%Y-%m-%d')
         
         date_stats = df.groupby('Дата')['Кол-во повторов'].sum().reset_index()
@@ -141,15 +174,18 @@ class BarChartByDate:
             xaxis={'tickangle': -45}
         )
         
-        ChartCard('📈 Bar Chart by Date', 'Количество ошибок, зафиксированных в каждый день', fig)
+        return fig
 
 
 class PieChart:
     """Pie Chart - доля каждого кода ошибки"""
     
     def __init__(self):
-        df = DataGenerator.generate_error_data()
-        
+        figure = cached_figure(type(self).__name__, self.build)
+        ChartCard('🥧 Pie Chart', 'Процентное распределение типов ошибок', figure)
+    
+    @staticmethod
+    def build(df: pd.DataFrame) -> go.Figure:
         error_dist = df.groupby('Код ошибки')['Кол-во повторов'].sum().reset_index()
         
         colors = ['#2563eb', '#16a34a', '#f59e0b', '#ef4444', '#8b5cf6']
@@ -170,15 +206,18 @@ class PieChart:
             template='plotly_white'
         )
         
-        ChartCard('🥧 Pie Chart', 'Процентное распределение типов ошибок', fig)
+        return fig
 
 
 class LineChart:
     """Line Chart - тренд параметра во времени"""
     
     def __init__(self):
-        df = DataGenerator.generate_error_data()
-        
+        figure = cached_figure(type(self).__name__, self.build)
+        ChartCard('📉 Line Chart', 'Динамика среднего значения параметра ошибок', figure)
+    
+    @staticmethod
+    def build(df: pd.DataFrame) -> go.Figure:
         daily_avg = df.groupby('Дата выгрузки')['Значение параметра'].mean().reset_index()
         
         fig = go.Figure()
@@ -203,15 +242,18 @@ class LineChart:
             hovermode='x unified'
         )
         
-        ChartCard('📉 Line Chart', 'Динамика среднего значения параметра ошибок', fig)
+        return fig
 
 
 class HeatmapChart:
     """Heatmap - матрица: ошибки vs значения параметров"""
     
     def __init__(self):
-        df = DataGenerator.generate_error_data()
-        
+        figure = cached_figure(type(self).__name__, self.build)
+        ChartCard('🔥 Heatmap', 'Интенсивность ошибок по кодам и датам (тепловая карта)', figure)
+    
+    @staticmethod
+    def build(df: pd.DataFrame) -> go.Figure:
         # Создаём матрицу ошибка x дата
         heatmap_data = df.pivot_table(
             index='Код ошибки',
@@ -240,15 +282,18 @@ class HeatmapChart:
             xaxis={'tickangle': -45}
         )
         
-        ChartCard('🔥 Heatmap', 'Интенсивность ошибок по кодам и датам (тепловая карта)', fig)
+        return fig
 
 
 class BoxPlotChart:
     """Box Plot - распределение параметров по ошибкам"""
     
     def __init__(self):
-        df = DataGenerator.generate_error_data()
-        
+        figure = cached_figure(type(self).__name__, self.build)
+        ChartCard('📦 Box Plot', 'Статистическое распределение параметров для каждой ошибки', figure)
+    
+    @staticmethod
+    def build(df: pd.DataFrame) -> go.Figure:
         fig = go.Figure()
         
         for code in sorted(df['Код ошибки'].unique()):
@@ -266,15 +311,18 @@ class BoxPlotChart:
             template='plotly_white'
         )
         
-        ChartCard('📦 Box Plot', 'Статистическое распределение параметров для каждой ошибки', fig)
+        return fig
 
 
 class HistogramChart:
     """Histogram - распределение значений параметров"""
     
     def __init__(self):
-        df = DataGenerator.generate_error_data()
-        
+        figure = cached_figure(type(self).__name__, self.build)
+        ChartCard('📊 Histogram', 'Частота значений параметров по разным кодам ошибок', figure)
+    
+    @staticmethod
+    def build(df: pd.DataFrame) -> go.Figure:
         fig = go.Figure()
         
         for code in sorted(df['Код ошибки'].unique()):
@@ -295,15 +343,18 @@ class HistogramChart:
             template='plotly_white'
         )
         
-        ChartCard('📊 Histogram', 'Частота значений параметров по разным кодам ошибок', fig)
+        return fig
 
 
 class ClusterScatterPlot:
     """Scatter Plot с кластеризацией K-means"""
     
     def __init__(self):
-        df = DataGenerator.generate_error_data()
-        
+        figure = cached_figure(type(self).__name__, self.build)
+        ChartCard('🎯 K-Means Clustering', 'Автоматическая группировка ошибок на 3 кластера', figure)
+    
+    @staticmethod
+    def build(df: pd.DataFrame) -> go.Figure:
         # Подготовка данных для кластеризации
         X = df[['Значение параметра', 'Кол-во повторов']].values
         scaler = StandardScaler()
@@ -314,27 +365,25 @@ class ClusterScatterPlot:
         df['Cluster'] = kmeans.fit_predict(X_scaled)
         
         fig = go.Figure()
+        trace_class = scatter_class(len(df))
         
         colors = ['#2563eb', '#16a34a', '#f59e0b']
         for i in range(3):
             cluster_data = df[df['Cluster'] == i]
-            fig.add_trace(go.Scatter(
+            fig.add_trace(trace_class(
                 x=cluster_data['Значение параметра'],
                 y=cluster_data['Кол-во повторов'],
                 mode='markers',
                 name=f'Cluster {i}',
                 marker=dict(size=10, color=colors[i], opacity=0.7, line=dict(width=2)),
-                text=[f"Ошибка: {c}<br>Значение: {v:.2f}<br>Повторов: {r}<br>Кластер: {cl}" 
-                      for c, v, r, cl in zip(cluster_data['Код ошибки'],
-                                            cluster_data['Значение параметра'],
-                                            cluster_data['Кол-во повторов'],
-                                            cluster_data['Cluster'])],
-                hovertemplate='%{text}<extra></extra>'
+                customdata=cluster_data['Код ошибки'],
+                hovertemplate=(f'Ошибка: %{{customdata}}<br>Значение: %{{x:.2f}}<br>'
+                               f'Повторов: %{{y}}<br>Кластер: {i}<extra></extra>')
             ))
         
         # Добавляем центроиды
         centers = scaler.inverse_transform(kmeans.cluster_centers_)
-        fig.add_trace(go.Scatter(
+        fig.add_trace(trace_class(
             x=centers[:, 0],
             y=centers[:, 1],
             mode='markers',
@@ -352,25 +401,29 @@ class ClusterScatterPlot:
             hovermode='closest'
         )
         
-        ChartCard('🎯 K-Means Clustering', 'Автоматическая группировка ошибок на 3 кластера', fig)
+        return fig
 
 
 class BubbleChart:
     """Bubble Chart - 3D представление: дата, параметр, кол-во повторов"""
     
     def __init__(self):
-        df = DataGenerator.generate_error_data()
-        
+        figure = cached_figure(type(self).__name__, self.build)
+        ChartCard('🫧 Bubble Chart', 'Трёхмерное представление: дата, параметр, количество повторов', figure)
+    
+    @staticmethod
+    def build(df: pd.DataFrame) -> go.Figure:
         daily_error = df.groupby(['Дата выгрузки', 'Код ошибки']).agg({
             'Значение параметра': 'mean',
             'Кол-во повторов': 'sum'
         }).reset_index()
         
         fig = go.Figure()
+        trace_class = scatter_class(len(daily_error))
         
         for code in sorted(daily_error['Код ошибки'].unique()):
             code_data = daily_error[daily_error['Код ошибки'] == code]
-            fig.add_trace(go.Scatter(
+            fig.add_trace(trace_class(
                 x=code_data['Дата выгрузки'],
                 y=code_data['Значение параметра'],
                 mode='markers',
@@ -380,12 +433,9 @@ class BubbleChart:
                     opacity=0.6,
                     line=dict(width=2)
                 ),
-                text=[f"Ошибка: {c}<br>Дата: {d.strftime('%Y-%m-%d')}<br>Значение: {v:.2f}<br>Повторов: {r}" 
-                      for c, d, v, r in zip(code_data['Код ошибки'],
-                                           code_data['Дата выгрузки'],
-                                           code_data['Значение параметра'],
-                                           code_data['Кол-во повторов'])],
-                hovertemplate='%{text}<extra></extra>'
+                customdata=code_data['Кол-во повторов'],
+                hovertemplate=(f'Ошибка: {code}<br>Дата: %{{x|%Y-%m-%d}}<br>Значение: %{{y:.2f}}<br>'
+                               f'Повторов: %{{customdata}}<extra></extra>')
             ))
         
         fig.update_layout(
@@ -397,7 +447,7 @@ class BubbleChart:
             hovermode='closest'
         )
         
-        ChartCard('🫧 Bubble Chart', 'Трёхмерное представление: дата, параметр, количество повторов', fig)
+        return fig
 
 
 class Header:
@@ -1,12 +1,23 @@
 from nicegui import ui, app
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
+from datetime import datetime
 import plotly.graph_objects as go
 import plotly.express as px
 
+from core.clustering import cluster_sessions
+from core.compute import ComputeBusy, ComputeCancelled, offload
+from core.dataset_registry import DatasetRegistry
+from core.downsample import DEFAULT_WIDTH_PX, DownsampledFigure, downsampled_plot
+from core.event_generator import generate_event_chunks
+from core.events import bytes_per_event, event_times, to_compact
+from core.feature_store import FeatureSet, feature_store
+from core.lazy_tabs import LazyTabPanels
+from core.scatter import scatter_class
+from core.session_tail import SessionTracker, SignalTail
+from core.signal_cache import SignalCache
+from core.signal_stream import parse_signal_file
+
 
 class ThemeManager:
     """Управление темой приложения"""
@@ -66,143 +77,59 @@ class Footer:
                 color: #95a5a6;
                 font-size: 12px;
             ''')
+            stats = dataset_registry.stats()
+            ui.label(f'Dataset cache: {stats["hits"]} hits / {stats["misses"]} misses / {stats["reloads"]} reloads').style('''
+                color: #7f8c8d;
+                font-size: 11px;
+            ''')
 
 
 class DataLoader:
     """Загрузчик данных из файла"""
     @staticmethod
-    def load_from_file(filepath: str) -> pd.DataFrame:
-        """Загружает данные из TSV файла"""
-        try:
-            # Читаем файл с табуляцией как разделитель
-            df = pd.read_csv(filepath, sep=';', encoding='utf-8', on_bad_lines='skip')
-            
-            # Очищаем названия колонок от пробелов
-            df.columns = df.columns.str.strip()
-            
-            # Переименовываем колонки для удобства (если нужно)
-            columns_mapping = {
-                'Event time': 'Event_time',
-                'Value type': 'Value_type',
-            }
-            df = df.rename(columns=columns_mapping)
-            
-            # Преобразуем Event_time в datetime
-            df['Event_time'] = pd.to_datetime(df['Event_time'], format='%d.%m.%Y %H:%M', errors='coerce')
-            
-            # Преобразуем числовые колонки
-            df['Value_type'] = pd.to_numeric(df['Value_type'], errors='coerce')
-            df['Text'] = pd.to_numeric(df['Text'], errors='coerce')
-            df['Double'] = pd.to_numeric(df['Double'], errors='coerce')
-            
-            # Удаляем строки с NaT в Event_time
-            df = df.dropna(subset=['Event_time'])
-            
-            # Сортируем по времени
-            df = df.sort_values('Event_time').reset_index(drop=True)
-            
-            print(f"✓ Загружено {len(df)} записей из файла {filepath}")
-            print(f"✓ Дата начала: {df['Event_time'].min()}")
-            print(f"✓ Дата конца: {df['Event_time'].max()}")
-            
-            return df
-        
-        except FileNotFoundError:
-            print(f"✗ Файл {filepath} не найден!")
-            raise
-        except Exception as e:
-            print(f"✗ Ошибка при загрузке файла: {e}")
-            raise
+    def load_dataset(filepath: str):
+        """Загружает выгрузку в компактном представлении через колоночный кэш
+        и возвращает (DataFrame, версия, сколько байт файла разобрано)"""
+        cache = SignalCache(filepath, variant='compact')
+        df = cache.load(DataLoader.parse_compact)
+        print(f"✓ Загружено {len(df)} записей из файла {filepath} (версия {cache.version}, "
+              f"{bytes_per_event(df):.0f} байт/событие)")
+        return df, cache.version, cache.size
     
     @staticmethod
-    def generate_mock_data(days=30):
-        """Генерирует MOK данные для демонстрации"""
-        data = []
-        base_date = datetime.now() - timedelta(days=days)
-        
-        signals = ['A270', 'A268', 'A269', 'A257', 'A258', 'A272', 'A273', 'A274', 'A275']
-        uuid = 'BA24F253-FC3C-4B89-A069-2768EFC1FA1B'
-        
-        for day_offset in range(days):
-            current_date = base_date + timedelta(days=day_offset)
-            sessions_per_day = np.random.randint(3, 8)
-            
-            for session in range(sessions_per_day):
-                session_start = current_date + timedelta(hours=np.random.randint(6, 20), 
-                                                          minutes=np.random.randint(0, 60))
-                session_duration = np.random.randint(5, 120)
-                records_count = np.random.randint(15, 200)
-                
-                for record in range(records_count):
-                    record_time = session_start + timedelta(minutes=np.random.randint(0, session_duration))
-                    signal = np.random.choice(signals)
-                    value_type = np.random.choice([11, 17], p=[0.7, 0.3])
-                    
-                    if value_type == 11:
-                        text_val = np.random.randint(0, 2)
-                        double_val = None
-                    else:
-                        text_val = None
-                        double_val = np.random.uniform(-600, 600)
-                    
-                    data.append({
-                        'UUID': uuid,
-                        'Signal': signal,
-                        'Event_time': record_time,
-                        'Value_type': value_type,
-                        'Text': text_val,
-                        'Double': double_val,
-                    })
-        
-        print(f"✓ Сгенерировано {len(data)} MOK записей")
-        return pd.DataFrame(data)
-
-
-class DataProcessor:
-    """Обработка и анализ данных"""
+    def parse_file(filepath: str, size: int = None) -> pd.DataFrame:
+        """Парсит выгрузку сигналов (разделитель ';') в типизированный отсортированный DataFrame"""
+        return parse_signal_file(filepath, size)
+    
     @staticmethod
-    def extract_features(df):
-        """Извлечение признаков из сырых данных"""
-        df['date'] = df['Event_time'].dt.date
-        df['hour'] = df['Event_time'].dt.hour
-        df['session_id'] = df.groupby(['date', ((df['Event_time'].diff().dt.total_seconds() / 3600) > 2).cumsum()]).ngroup()
-        
-        sessions = []
-        for session_id, session_data in df.groupby('session_id'):
-            if len(session_data) < 2:
-                continue
-            
-            duration = (session_data['Event_time'].max() - session_data['Event_time'].min()).total_seconds() / 60 + 1
-            total_signals = len(session_data)
-            signals_per_min = total_signals / duration if duration > 0 else 0
-            
-            discrete = session_data[session_data['Value_type'] == 11]
-            analog = session_data[session_data['Value_type'] == 17]
-            
-            sessions.append({
-                'session_id': session_id,
-                'date': session_data['date'].iloc[0],
-                'duration_min': duration,
-                'total_signals': total_signals,
-                'signals_per_min': signals_per_min,
-                'discrete_ratio': len(discrete) / total_signals if total_signals > 0 else 0,
-                'analog_ratio': len(analog) / total_signals if total_signals > 0 else 0,
-                'avg_discrete_active': discrete['Text'].mean() if len(discrete) > 0 else 0,
-                'unique_discrete': discrete['Signal'].nunique() if len(discrete) > 0 else 0,
-                'avg_analog_abs': analog['Double'].abs().mean() if len(analog) > 0 else 0,
-                'max_analog': analog['Double'].abs().max() if len(analog) > 0 else 0,
-                'std_analog': analog['Double'].std() if len(analog) > 1 else 0,
-                'total_unique_signals': session_data['Signal'].nunique(),
-                'rare_signal_ratio': len(session_data[session_data['Signal'].isin(
-                    session_data['Signal'].value_counts()[session_data['Signal'].value_counts() == 1].index
-                )]) / total_signals if total_signals > 0 else 0,
-            })
+    def parse_compact(filepath: str, size: int = None) -> pd.DataFrame:
+        """Парсит выгрузку сразу в компактное представление (см. core.events)"""
+        return to_compact(DataLoader.parse_file(filepath, size))
+    
+    @staticmethod
+    def generate_mock_data(days=30, machines=1, seed=None):
+        """Генерирует MOK данные для демонстрации (векторизованно, см. core.event_generator)"""
+        df = pd.concat(generate_event_chunks(machines=machines, days=days, seed=seed), ignore_index=True)
         
-        return pd.DataFrame(sessions)
+        print(f"✓ Сгенерировано {len(df)} MOK записей")
+        return df
 
 
 class Charts:
     """Компоненты графиков"""
+    CLUSTER_NAMES = {0: 'Stable', 1: 'Noisy', 2: 'Anomalous'}
+    CLUSTER_COLORS = {0: '#27ae60', 1: '#f39c12', 2: '#e74c3c'}
+    
+    @staticmethod
+    def cluster_name(cluster_id):
+        return Charts.CLUSTER_NAMES.get(cluster_id, f'Cluster {cluster_id}')
+    
+    @staticmethod
+    def plot(fig, width_px: int = DEFAULT_WIDTH_PX):
+        """ui.plotly с прореживанием длинных линий под фактическую ширину графика и догрузкой точек при зуме
+        (fig может быть уже подготовленной DownsampledFigure, например, из расчёта вкладки)"""
+        return downsampled_plot(fig, width_px)
+    
     @staticmethod
     def daily_error_distribution(daily_stats):
         """График распределения ошибок по дням"""
@@ -232,28 +159,26 @@ class Charts:
         return fig
     
     @staticmethod
-    def cluster_scatter(sessions_features, clusters):
-        """Scatter plot кластеров"""
-        from sklearn.decomposition import PCA
-        
-        pca = PCA(n_components=2)
-        features = sessions_features[[col for col in sessions_features.columns 
-                                     if col not in ['session_id', 'date']]]
-        features_scaled = StandardScaler().fit_transform(features.fillna(0))
-        coords = pca.fit_transform(features_scaled)
-        
-        cluster_names = {0: 'Stable', 1: 'Noisy', 2: 'Anomalous'}
-        colors = {0: '#27ae60', 1: '#f39c12', 2: '#e74c3c'}
-        
+    def cluster_scatter(coords, clusters, session_ids=None):
+        """Scatter plot кластеров по готовой PCA-проекции (FeatureSpace.coords).
+
+        Для больших наборов сессий — WebGL (Scattergl); подсказки строятся в браузере
+        по customdata и hovertemplate, а не из строк на каждую точку.
+        """
         fig = go.Figure()
+        trace_class = scatter_class(len(clusters))
+        session_ids = np.arange(len(clusters)) if session_ids is None else np.asarray(session_ids)
         for cluster_id in sorted(np.unique(clusters)):
             mask = clusters == cluster_id
-            fig.add_trace(go.Scatter(
+            name = Charts.cluster_name(cluster_id)
+            fig.add_trace(trace_class(
                 x=coords[mask, 0],
                 y=coords[mask, 1],
                 mode='markers',
-                name=cluster_names.get(cluster_id, f'Cluster {cluster_id}'),
-                marker=dict(size=8, color=colors.get(cluster_id, '#3498db')),
+                name=name,
+                marker=dict(size=8, color=Charts.CLUSTER_COLORS.get(cluster_id, '#3498db')),
+                customdata=session_ids[mask],
+                hovertemplate=f'Сессия %{{customdata}}<br>{name}<br>PC1 %{{x:.2f}}, PC2 %{{y:.2f}}<extra></extra>',
             ))
         
         fig.update_layout(
@@ -274,10 +199,10 @@ class Charts:
         if 'stable_session_ratio' not in daily_stats.columns:
             # Автоматически создаём фейковые данные на основе средней активности
             if 'avg_signals_per_min_day' in daily_stats.columns:
-                daily_stats['stable_session_ratio'] = (
+                daily_stats = daily_stats.assign(stable_session_ratio=(
                     (daily_stats['avg_signals_per_min_day'] /
                     daily_stats['avg_signals_per_min_day'].max()) * 0.8
-                )
+                ))
             else:
                 # Если даже этой колонки нет — просто показываем сообщение
                 fig.add_annotation(
@@ -309,6 +234,31 @@ class Charts:
         )
         return fig
     
+    @staticmethod
+    def event_rate(data: pd.DataFrame):
+        """Число событий в каждую минуту выгрузки (с пустыми минутами) — длинный ряд по сырым событиям"""
+        fig = go.Figure()
+        minutes = event_times(data).to_numpy().astype('datetime64[m]')
+        if len(minutes):
+            start = minutes.min()
+            counts = np.bincount((minutes - start).astype(np.int64))
+            fig.add_trace(go.Scatter(
+                x=start + np.arange(len(counts)),
+                y=counts,
+                mode='lines',
+                name='Events per minute',
+                line=dict(color='#3498db', width=1),
+            ))
+        fig.update_layout(
+            title='Event Rate (per minute)',
+            xaxis_title='Time',
+            yaxis_title='Events',
+            hovermode='x',
+            template='plotly_white',
+            height=400,
+        )
+        return fig
+    
     @staticmethod
     def monthly_summary(monthly_stats):
         """Итоговая статистика по месяцам"""
@@ -354,73 +304,103 @@ class MetricCard:
 
 class OverviewTab:
     """Вкладка Overview"""
-    def __init__(self, data: pd.DataFrame):
-        self.data = data
+    def __init__(self, features: FeatureSet):
+        self.features = features
         self.render()
     
     def render(self):
-        features = DataProcessor.extract_features(self.data)
+        sessions = self.features.sessions
         
         with ui.row().style('gap: 16px; margin-bottom: 24px;'):
             MetricCard('Average Errors per Shift', '28%', '#3498db')
-            MetricCard('Total Sessions', str(len(features)), '#27ae60')
-            MetricCard('Avg Signals/Min', f"{features['signals_per_min'].mean():.2f}", '#f39c12')
-            MetricCard('Max Anomaly Score', f"{features['max_analog'].max():.1f}", '#e74c3c')
+            MetricCard('Total Sessions', str(len(sessions)), '#27ae60')
+            MetricCard('Avg Signals/Min', f"{sessions['signals_per_min'].mean():.2f}", '#f39c12')
+            MetricCard('Max Anomaly Score', f"{sessions['max_analog'].max():.1f}", '#e74c3c')
         
-        daily_stats = features.groupby('date').agg({
-            'total_signals': 'sum',
-            'signals_per_min': 'mean',
-            'duration_min': 'sum',
-        }).reset_index()
-        daily_stats.columns = ['date', 'total_signals_day', 'avg_signals_per_min_day', 'total_duration_day']
+        daily_stats = self.features.daily_stats
         
         with ui.row().style('gap: 16px;'):
-            ui.plotly(Charts.daily_error_distribution(daily_stats)).style('width: 50%;')
-            ui.plotly(Charts.stability_trend(daily_stats)).style('width: 50%;')
+            Charts.plot(Charts.daily_error_distribution(daily_stats), DEFAULT_WIDTH_PX // 2).style('width: 50%;')
+            Charts.plot(Charts.stability_trend(daily_stats), DEFAULT_WIDTH_PX // 2).style('width: 50%;')
 
 
 class ClusterAnalysisTab:
     """Вкладка Cluster Analysis"""
-    def __init__(self, data: pd.DataFrame):
-        self.data = data
+    def __init__(self, features: FeatureSet, clustering):
+        self.features = features
+        # (clusters, record) из cluster_sessions, посчитанные через core.compute
+        self.clustering = clustering
         self.render()
     
     def render(self):
-        features = DataProcessor.extract_features(self.data)
-        feature_cols = [col for col in features.columns 
-                       if col not in ['session_id', 'date']]
-        X = features[feature_cols].fillna(0)
-        X_scaled = StandardScaler().fit_transform(X)
-        
-        kmeans = KMeans(n_clusters=2, random_state=42, n_init=10)
-        clusters = kmeans.fit_predict(X_scaled)
+        self.content()
+    
+    async def refit(self):
+        """Явное переобучение модели по кнопке: в очереди расчётов, страница остаётся отзывчивой"""
+        self.refit_button.disable()
+        try:
+            with self.actions:
+                self.clustering = await offload(cluster_sessions, self.features, refit=True,
+                                                name='Переобучение модели', cancellable=True)
+        except ComputeBusy as e:
+            ui.notify(str(e), type='warning')
+            self.refit_button.enable()
+            return
+        except ComputeCancelled:
+            return
+        self.content.refresh()
+        ui.notify('Модель кластеризации переобучена')
+    
+    @ui.refreshable
+    def content(self):
+        # Обученная модель хранится в model_registry; здесь только отрисовка
+        clusters, record = self.clustering
+        if record is None:
+            # Сессий меньше, чем нужно для PCA-проекции, — модель не обучалась
+            with ui.row().style('gap: 16px; margin-bottom: 24px;'):
+                MetricCard('Sessions', str(len(clusters)), '#3498db')
+            ui.label('Not enough sessions for cluster analysis').style('color: #7f8c8d; font-size: 14px;')
+            return
         
+        n_clusters = record.metrics.get('n_clusters', record.params['n_clusters'])
         with ui.row().style('gap: 16px; margin-bottom: 24px;'):
-            MetricCard('Stable Sessions', f"{sum(clusters == 0)}", '#27ae60')
-            MetricCard('Noisy Sessions', f"{sum(clusters == 1)}", '#f39c12')
-            MetricCard('Anomalous Sessions', f"{sum(clusters == 2)}", '#e74c3c')
+            for cluster_id in range(n_clusters):
+                MetricCard(f'{Charts.cluster_name(cluster_id)} Sessions', f"{sum(clusters == cluster_id)}",
+                           Charts.CLUSTER_COLORS.get(cluster_id, '#3498db'))
         
         with ui.row().style('gap: 16px;'):
-            ui.plotly(Charts.cluster_scatter(features, clusters)).style('width: 100%;')
+            ui.plotly(Charts.cluster_scatter(self.features.space.coords, clusters,
+                                             self.features.sessions['session_id'])).style('width: 100%;')
+        
+        # Оценки подбора числа кластеров (n_clusters='auto') сохранены вместе с моделью
+        scores = record.metrics.get('k_selection')
+        if scores:
+            ui.label(f'Number of clusters: {n_clusters} (best silhouette)').style('font-weight: 600; margin-top: 16px;')
+            columns = [{'name': c, 'label': c, 'field': c} for c in ['k', 'silhouette', 'davies_bouldin', 'inertia']]
+            rows = pd.DataFrame(scores).round(3).to_dict('records')
+            ui.table(columns=columns, rows=rows, row_key='k').classes('w-full')
+        
+        with ui.row().style('gap: 16px; align-items: center;') as self.actions:
+            ui.label(f'Model v{record.version} · trained {record.created_at} on {record.n_samples} sessions') \
+                .style('color: #7f8c8d; font-size: 12px;')
+            self.refit_button = ui.button('Refit model', on_click=self.refit).props('flat dense')
 
 
 class ErrorTrendsTab:
     """Вкладка Error Trends"""
-    def __init__(self, data: pd.DataFrame):
-        self.data = data
+    def __init__(self, features: FeatureSet, event_rate: DownsampledFigure = None):
+        self.features = features
+        # График по сырым событиям готовится (и прореживается) в расчёте вкладки
+        self.event_rate = event_rate
         self.render()
     
     def render(self):
-        features = DataProcessor.extract_features(self.data)
-        daily_stats = features.groupby('date').agg({
-            'signals_per_min': 'mean',
-            'max_analog': 'max',
-        }).reset_index()
+        daily_stats = self.features.daily_stats
         
         fig = go.Figure()
         fig.add_trace(go.Scatter(
             x=daily_stats['date'].astype(str),
-            y=daily_stats['max_analog'],
+            y=daily_stats['max_analog_day'],
             mode='lines+markers',
             name='Max Anomaly',
             line=dict(color='#e74c3c', width=2),
@@ -433,24 +413,75 @@ class ErrorTrendsTab:
             height=400,
         )
         
-        ui.plotly(fig)
+        Charts.plot(fig)
+        if self.event_rate is not None:
+            Charts.plot(self.event_rate)
+
+
+class LiveSessionsTab:
+    """Вкладка Live Sessions: сессии из дописываемой выгрузки обновляются без перезагрузки страницы"""
+    TABLE_COLUMNS = ['session_id', 'date', 'duration_min', 'total_signals', 'signals_per_min', 'max_analog']
+    
+    def __init__(self, tracker: SessionTracker):
+        self.tracker = tracker
+        self.version = None
+        self.render()
+    
+    def render(self):
+        self.content()
+        # Клиент лишь сверяет версию трекера, перестраивается только при новых событиях
+        ui.timer(2.0, self.update)
+    
+    def update(self):
+        if self.tracker.version != self.version:
+            self.content.refresh()
+    
+    @ui.refreshable
+    def content(self):
+        self.version = self.tracker.version
+        stats = self.tracker.stats()
+        sessions = self.tracker.features()
+        
+        with ui.row().style('gap: 16px; margin-bottom: 24px;'):
+            MetricCard('Closed Sessions', str(stats['closed']), '#27ae60')
+            MetricCard('Open Session', 'yes' if stats['open'] else 'no', '#3498db')
+            MetricCard('Pending Rows', str(stats['pending_rows']), '#f39c12')
+            MetricCard('Late Rows Dropped', str(stats['late_dropped']), '#e74c3c')
+        
+        recent = sessions.tail(20).iloc[::-1][self.TABLE_COLUMNS].round(2)
+        recent['date'] = recent['date'].astype(str)
+        columns = [{'name': c, 'label': c, 'field': c} for c in self.TABLE_COLUMNS]
+        ui.table(columns=columns, rows=recent.to_dict('records')).classes('w-full')
 
 
 class TabsLayout:
-    """Макет с табами"""
-    def __init__(self, data: pd.DataFrame): 
+    """Макет с табами: вкладка строится при первом открытии, расчёты — в фоне"""
+    def __init__(self, data: pd.DataFrame, version: str = None, tracker: SessionTracker = None): 
+        # Признаки считаются один раз на версию датасета и общие для всех вкладок (и клиентов),
+        # поэтому их сборка отключением клиента не прерывается
+        def features():
+            return feature_store.get(data, version)
+        
+        def clustering(cancel_event=None):
+            feature_set = features()
+            return feature_set, cluster_sessions(feature_set, cancel_event=cancel_event)
+        
+        def trends():
+            return features(), DownsampledFigure(Charts.event_rate(data))
+        
         with ui.tabs().classes('w-full') as tabs: 
             ui.tab('Overview') 
             ui.tab('Cluster Analysis') 
             ui.tab('Error Trends') 
+            if tracker is not None:
+                ui.tab('Live Sessions')
 
-        with ui.tab_panels(tabs, value='Обзор'): 
-            with ui.tab_panel('Overview'): 
-                OverviewTab(data) 
-            with ui.tab_panel('Cluster Analysis'): 
-                ClusterAnalysisTab(data) 
-            with ui.tab_panel('Error Trends'): 
-                ErrorTrendsTab(data)
+        panels = LazyTabPanels(tabs, value='Overview')
+        panels.tab('Overview', OverviewTab, compute=features)
+        panels.tab('Cluster Analysis', lambda result: ClusterAnalysisTab(*result), compute=clustering, cancellable=True)
+        panels.tab('Error Trends', lambda result: ErrorTrendsTab(*result), compute=trends)
+        if tracker is not None:
+            panels.tab('Live Sessions', lambda: LiveSessionsTab(tracker))
 
 
 class MainPage:
@@ -458,10 +489,11 @@ class MainPage:
     def __init__(self, data_path: str = None):
         self.data_path = data_path
         self.data = None
-        self.render()
+        self.version = None
     
-    def render(self):
+    async def render(self):
         Header()
+        Footer()
         
         with ui.column().style(f'''
             max-width: 1920px;
@@ -469,33 +501,61 @@ class MainPage:
             padding: 24px;
             font-family: {ThemeManager.FONTS['family']};
         '''):
-            # Загружаем данные
-            if self.data_path:
-                try:
-                    self.data = DataLoader.load_from_file(self.data_path)
-                except Exception as e:
-                    ui.label(f'Ошибка загрузки файла: {e}').style('color: red; font-size: 16px;')
-                    ui.label('Используются MOK данные вместо этого...').style('color: orange; font-size: 14px;')
-                    self.data = DataLoader.generate_mock_data(days=30)
-            else:
-                ui.label('Файл данных не указан, используются MOK данные').style('color: orange; font-size: 14px; margin-bottom: 16px;')
-                self.data = DataLoader.generate_mock_data(days=30)
+            # Разбор файла и генерация MOK данных идут через очередь расчётов, а не в обработчике страницы
+            try:
+                await self.load_data()
+            except ComputeBusy as e:
+                ui.label(str(e)).style('color: red; font-size: 16px;')
+                return
+            except ComputeCancelled:
+                return
             
             # Создаем табы с контентом
             if self.data is not None and len(self.data) > 0:
-                TabsLayout(self.data)
+                TabsLayout(self.data, self.version, session_tail.tracker if self.data_path else None)
             else:
                 ui.label('Нет данных для анализа').style('color: red; font-size: 16px;')
-        
-        Footer()
+    
+    async def load_data(self):
+        # Загружаем данные (один раз на процесс, см. dataset_registry)
+        if self.data_path:
+            try:
+                dataset = await offload(dataset_registry.get, self.data_path, name='Загрузка данных')
+                self.data = dataset.view()
+                self.version = dataset.version
+                return
+            except (ComputeBusy, ComputeCancelled):
+                raise
+            except Exception as e:
+                ui.label(f'Ошибка загрузки файла: {e}').style('color: red; font-size: 16px;')
+                ui.label('Используются MOK данные вместо этого...').style('color: orange; font-size: 14px;')
+        else:
+            ui.label('Файл данных не указан, используются MOK данные').style('color: orange; font-size: 14px; margin-bottom: 16px;')
+        self.data = await offload(DataLoader.generate_mock_data, days=30, name='Генерация MOK данных')
 
 
 # Инициализация приложения
 app.add_static_files('/static', 'static')
 
+# Общий для всех клиентов реестр датасетов: файл парсится один раз и перечитывается при изменении
+dataset_registry = DatasetRegistry(
+    DataLoader.load_dataset,
+    on_reload=lambda old_version, new_version: feature_store.invalidate(old_version),
+)
+app.on_startup(dataset_registry.watch)
+
 # Укажите путь к вашему файлу здесь
 DATA_FILE_PATH = 'signals.csv'  # Измените на путь к вашему файлу
 
-ui.page('/')(lambda: MainPage(data_path=DATA_FILE_PATH))
+# Инкрементальная нарезка сессий по дописываемым в выгрузку строкам (вкладка Live Sessions):
+# стартует с датасета из dataset_registry и получает изменения файла от его наблюдения
+session_tail = SignalTail(DATA_FILE_PATH)
+app.on_startup(lambda: session_tail.follow(dataset_registry))
+
+
+@ui.page('/')
+async def index():
+    await MainPage(data_path=DATA_FILE_PATH).render()
+
 
 ui.run(host='0.0.0.0', port=8080, reload=False)
\ No newline at end of file
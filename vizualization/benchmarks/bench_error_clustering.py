@@ -0,0 +1,93 @@
+# benchmarks/bench_error_clustering.py
+"""Сравнение кластеризации ошибок ver_1: KMeans в памяти против потокового MiniBatchKMeans.
+
+Запуск из папки vizualization:
+    python benchmarks/bench_error_clustering.py [--rows 1000000 5000000] [--days 100] [--chunk-rows 500000]
+
+Для каждого объёма во временной папке создаются дневные файлы errors_YYYY_MM_DD.csv.
+Путь в памяти — load_all_error_data + clusterize_errors (get_dummies и KMeans по всей
+истории), потоковый — clusterize_errors_streaming. Печатаются время, пиковая память
+по tracemalloc и инерция (сумма квадратов расстояний до центров в масштабированном
+пространстве; у обоих путей оно совпадает, так как scaler.partial_fit даёт те же
+среднее и дисперсию).
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ver_1', 'app'))
+
+from core import data_loader  # noqa: E402
+from core.clustering import clusterize_errors, clusterize_errors_streaming  # noqa: E402
+from core.model_registry import model_registry  # noqa: E402
+
+ERROR_CODES = np.array(['E01', 'E02', 'E03', 'E04', 'E05'], dtype=object)
+CENTERS = np.array([25.0, 15.0, 45.0, 32.5, 60.0])
+
+
+def make_history(directory: str, n_rows: int, n_days: int, seed: int = 42):
+    """Дневные файлы в формате генератора ver_1: у каждого кода свой диапазон parameter_value"""
+    rng = np.random.default_rng(seed)
+    rows = n_rows // n_days
+    for day in pd.date_range(end='2025-10-12', periods=n_days, freq='D'):
+        code = rng.integers(0, len(ERROR_CODES), rows)
+        pd.DataFrame({
+            'export_time': day.strftime('%Y-%m-%d'),
+            'error_code': ERROR_CODES[code],
+            'parameter_value': (CENTERS[code] + rng.normal(0, 8, rows)).round(2),
+        }).to_csv(os.path.join(directory, f"errors_{day.strftime('%Y_%m_%d')}.csv"), index=False)
+
+
+def measured(fn):
+    """(время, пик памяти в МБ, результат) с подавленной печатью"""
+    data_loader._cache.clear()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 5_000_000])
+    parser.add_argument('--days', type=int, default=100)
+    parser.add_argument('--chunk-rows', type=int, default=500_000)
+    parser.add_argument('--clusters', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'mode':>10} {'time, s':>8} {'peak, MB':>9} {'inertia/row':>12}")
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as directory:
+            make_history(directory, n_rows, args.days)
+            model_registry.root = os.path.join(directory, 'models')
+
+            def in_memory():
+                df = data_loader.load_all_error_data(directory)
+                _, _, model = clusterize_errors(df, n_clusters=args.clusters, refit=True)
+                return model.inertia_
+
+            def streaming():
+                _, _, model = clusterize_errors_streaming(
+                    directory, n_clusters=args.clusters, chunk_rows=args.chunk_rows, refit=True,
+                    labels_path=os.path.join(directory, 'labels.npy'))
+                return model.inertia_
+
+            for mode, fn in (('in-memory', in_memory), ('streaming', streaming)):
+                elapsed, peak, inertia = measured(fn)
+                print(f'{n_rows:>9} {mode:>10} {elapsed:>8.2f} {peak:>9.0f} {inertia / n_rows:>12.4f}')
+
+
+if __name__ == '__main__':
+    main()
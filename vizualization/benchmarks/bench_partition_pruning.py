@@ -0,0 +1,79 @@
+# benchmarks/bench_partition_pruning.py
+"""Замер отсечения дневных партиций в ver_1 (query_error_data против полной загрузки).
+
+Запуск из папки vizualization:
+    python benchmarks/bench_partition_pruning.py [--history 30 365 1825] [--rows 500] [--days 30]
+
+Для каждой длины истории во временной папке создаются дневные файлы
+errors_YYYY_MM_DD.csv, после чего сравнивается «холодное» чтение последних
+--days дней: полная загрузка с фильтрацией по дате против query_error_data,
+которая открывает только файлы нужных дат. Время полной загрузки растёт
+с длиной истории, время запроса по партициям от неё почти не зависит.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ver_1', 'app'))
+
+from core import data_loader  # noqa: E402
+from core.data_loader import load_all_error_data, query_error_data  # noqa: E402
+
+ERROR_CODES = np.array(['E01', 'E02', 'E03', 'E04', 'E05'], dtype=object)
+
+
+def make_history(directory: str, n_days: int, rows: int, seed: int = 42):
+    """Дневные файлы в формате генератора ver_1 за n_days дней до 2025-10-12"""
+    rng = np.random.default_rng(seed)
+    for day in pd.date_range(end='2025-10-12', periods=n_days, freq='D'):
+        pd.DataFrame({
+            'export_time': day.strftime('%Y-%m-%d'),
+            'error_code': ERROR_CODES[rng.integers(0, len(ERROR_CODES), rows)],
+            'parameter_value': rng.uniform(5, 90, rows).round(2),
+        }).to_csv(os.path.join(directory, f"errors_{day.strftime('%Y_%m_%d')}.csv"), index=False)
+
+
+def cold(fn, *args, **kwargs):
+    """Время одного вызова с пустым кэшем загрузчика (печать загрузчика подавлена)"""
+    data_loader._cache.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--history', type=int, nargs='+', default=[30, 365, 1825])
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--days', type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'history':>8} {'files read':>11} {'full load, s':>13} {'pruned, s':>10} {'speedup':>8}")
+    for n_days in args.history:
+        with tempfile.TemporaryDirectory() as directory:
+            make_history(directory, n_days, args.rows)
+
+            def full_then_filter():
+                df = load_all_error_data(directory)
+                start = df['export_time'].max() - pd.Timedelta(days=args.days - 1)
+                return df[df['export_time'] >= start]
+
+            full_time, expected = cold(full_then_filter)
+            pruned_time, actual = cold(query_error_data, days=args.days, directory=directory)
+            assert len(expected) == len(actual), (len(expected), len(actual))
+
+            files_read = min(args.days, n_days)
+            print(f'{n_days:>8} {files_read:>5}/{n_days:<5} {full_time:>13.3f} {pruned_time:>10.3f} '
+                  f'{full_time / pruned_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
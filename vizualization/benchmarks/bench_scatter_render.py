@@ -0,0 +1,131 @@
+# benchmarks/bench_scatter_render.py
+"""Замер отрисовки больших scatter-графиков: SVG (go.Scatter) против WebGL (go.Scattergl).
+
+Запуск из папки vizualization:
+    python benchmarks/bench_scatter_render.py [--sizes 1000 10000 50000 200000] [--out scatter_render.html]
+
+На сервере для каждого размера сравниваются время сборки фигуры и объём JSON при
+подсказках строками на каждую точку (прежний вариант) и через customdata +
+hovertemplate. Браузерная часть — HTML-страница со встроенным plotly.js, которая
+по очереди рисует те же фигуры и меряет время от Plotly.newPlot до первого кадра
+после отрисовки; результаты выводятся таблицей на странице и в console.log.
+Если установлен playwright, страница открывается в headless Chromium и таблица
+печатается здесь же; иначе её нужно открыть в браузере вручную.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.scatter import WEBGL_THRESHOLD  # noqa: E402
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Scatter render benchmark</title>
+<script>{plotly}</script></head>
+<body>
+<table id="results" border="1" cellpadding="4"><tr><th>points</th><th>trace</th><th>render ms</th></tr></table>
+<div id="plot" style="width:1000px;height:500px"></div>
+<script>
+const cases = {cases};
+const results = [];
+const frame = () => new Promise(resolve => requestAnimationFrame(() => resolve()));
+(async () => {{
+  for (const c of cases) {{
+    const el = document.getElementById('plot');
+    Plotly.purge(el);
+    await frame();
+    const began = performance.now();
+    await Plotly.newPlot(el, c.figure.data, c.figure.layout);
+    await frame();
+    const ms = performance.now() - began;
+    results.push({{points: c.points, trace: c.trace, ms: ms}});
+    document.getElementById('results').insertAdjacentHTML('beforeend',
+      `<tr><td>${{c.points}}</td><td>${{c.trace}}</td><td>${{ms.toFixed(1)}}</td></tr>`);
+  }}
+  console.log(JSON.stringify(results));
+  window.benchmarkResults = results;
+}})();
+</script></body></html>
+"""
+
+
+def make_points(n: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    clusters = rng.integers(0, 3, n)
+    coords = rng.normal(size=(n, 2)) + clusters[:, None] * 2.5
+    return coords, clusters
+
+
+def build_figure(coords, clusters, trace_class, per_point_text: bool) -> go.Figure:
+    """Scatter кластеров как в Charts.cluster_scatter: подсказки строками или через customdata"""
+    fig = go.Figure()
+    session_ids = np.arange(len(clusters))
+    for cluster_id in range(3):
+        mask = clusters == cluster_id
+        if per_point_text:
+            hover = dict(text=[f'Сессия {s}<br>Cluster {cluster_id}<br>PC1 {x:.2f}, PC2 {y:.2f}'
+                               for s, x, y in zip(session_ids[mask], coords[mask, 0], coords[mask, 1])],
+                         hovertemplate='%{text}<extra></extra>')
+        else:
+            hover = dict(customdata=session_ids[mask],
+                         hovertemplate=f'Сессия %{{customdata}}<br>Cluster {cluster_id}<br>'
+                                       f'PC1 %{{x:.2f}}, PC2 %{{y:.2f}}<extra></extra>')
+        fig.add_trace(trace_class(x=coords[mask, 0], y=coords[mask, 1], mode='markers',
+                                  name=f'Cluster {cluster_id}', marker=dict(size=6), **hover))
+    fig.update_layout(template='plotly_white', height=500, showlegend=True)
+    return fig
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 50_000, 200_000])
+    parser.add_argument('--out', default='scatter_render.html')
+    args = parser.parse_args()
+
+    print(f'Порог перехода на WebGL: {WEBGL_THRESHOLD} точек')
+    print(f"{'точек':>8} {'подсказки':>10} {'сборка, мс':>11} {'JSON, КБ':>9}")
+    cases = []
+    for n in args.sizes:
+        coords, clusters = make_points(n)
+        for per_point_text in (True, False):
+            began = time.perf_counter()
+            fig = build_figure(coords, clusters, go.Scatter, per_point_text)
+            payload = fig.to_json()
+            ms = (time.perf_counter() - began) * 1000
+            print(f"{n:>8} {'строки' if per_point_text else 'customdata':>10} {ms:>11.1f} {len(payload) / 1024:>9.0f}")
+        for trace_class in (go.Scatter, go.Scattergl):
+            fig = build_figure(coords, clusters, trace_class, per_point_text=False)
+            cases.append({'points': n, 'trace': trace_class.__name__, 'figure': json.loads(fig.to_json())})
+
+    page = PAGE.format(plotly=get_plotlyjs(), cases=json.dumps(cases))
+    with open(args.out, 'w', encoding='utf-8') as f:
+        f.write(page)
+    print(f'✓ Страница браузерного замера: {os.path.abspath(args.out)}')
+
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        print('playwright не установлен — откройте страницу в браузере, результаты появятся в таблице')
+        return
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        page = browser.new_page()
+        page.goto('file://' + os.path.abspath(args.out))
+        page.wait_for_function('window.benchmarkResults !== undefined', timeout=600_000)
+        results = page.evaluate('window.benchmarkResults')
+        browser.close()
+    print(f"{'точек':>8} {'trace':>10} {'отрисовка, мс':>14}")
+    for row in results:
+        print(f"{row['points']:>8} {row['trace']:>10} {row['ms']:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# benchmarks/bench_session_features.py
+"""Сверка и замер векторизованного извлечения признаков сессий.
+
+Запуск из папки vizualization:
+    python benchmarks/bench_session_features.py [--sizes 10000 100000 1000000 10000000] [--legacy-max 100000]
+
+Для каждого размера строится синтетический поток событий, векторизованный движок
+сверяется с прежней реализацией (цикл по groupby) и печатается время обоих вариантов.
+Прежняя реализация медленная, поэтому запускается только до --legacy-max событий.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.features import extract_session_features, session_ids  # noqa: E402
+from tests.legacy_features import check_parity, legacy_extract_features, make_events  # noqa: E402
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--legacy-max', type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'events':>10} {'sessions':>9} {'vectorized, s':>14} {'legacy, s':>10} {'speedup':>8}")
+    for size in args.sizes:
+        events = make_events(size)
+        features, vector_time = timed(lambda df: extract_session_features(df, session_ids(df['Event_time'])), events)
+
+        legacy_time = None
+        if size <= args.legacy_max:
+            expected, legacy_time = timed(legacy_extract_features, events.copy())
+            check_parity(expected, features)
+
+        legacy = f'{legacy_time:10.3f}' if legacy_time is not None else f"{'—':>10}"
+        speedup = f'{legacy_time / vector_time:7.1f}x' if legacy_time is not None else f"{'—':>8}"
+        print(f'{size:>10} {len(features):>9} {vector_time:>14.3f} {legacy} {speedup}')
+
+
+if __name__ == '__main__':
+    main()
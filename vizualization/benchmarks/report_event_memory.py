@@ -0,0 +1,76 @@
+# benchmarks/report_event_memory.py
+"""Отчёт о памяти на событие: обычный фрейм выгрузки против компактного (core.events).
+
+Запуск из папки vizualization:
+    python benchmarks/report_event_memory.py [--file signals.csv] [--sizes 1000000]
+
+Для выгрузки и для синтетических потоков заданных размеров печатается число байт
+на событие по колонкам в трёх вариантах: обычный фрейм (как после parse_signal_file),
+компактный с float64 и компактный с float32. Заодно проверяется, что признаки сессий
+по компактному фрейму совпадают с признаками по обычному.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.events import memory_report, to_compact  # noqa: E402
+from core.features import extract_session_features  # noqa: E402
+from core.signal_stream import parse_signal_file  # noqa: E402
+
+SIGNALS = np.array(['A270', 'A268', 'A269', 'A257', 'A258', 'A272', 'A273', 'A274', 'A275'], dtype=object)
+UUID = 'BA24F253-FC3C-4B89-A069-2768EFC1FA1B'
+
+
+def make_wide(n_events: int, seed: int = 42) -> pd.DataFrame:
+    """Синтетический фрейм в колонках выгрузки (строковые UUID/Signal, разреженные Text/BigInt/Double)"""
+    rng = np.random.default_rng(seed)
+    value_type = np.where(rng.random(n_events) < 0.6, 11, 17)
+    discrete = value_type == 11
+    text = np.where(discrete, rng.integers(0, 2, n_events), np.nan)
+    times = np.datetime64('2025-10-01T06:00') + np.sort(rng.integers(0, 60 * 24 * 30, n_events)).astype('timedelta64[m]')
+    return pd.DataFrame({
+        '#': np.arange(n_events, dtype=np.float64),
+        'UUID': np.full(n_events, UUID, dtype=object),
+        'Signal': SIGNALS[rng.integers(0, len(SIGNALS), n_events)],
+        'Event_time': pd.to_datetime(times),
+        'Value_type': value_type.astype(np.float64),
+        'Text': text,
+        'BigInt': text,
+        'Timestamp': np.full(n_events, np.nan),
+        'Double': np.where(discrete, np.nan, rng.uniform(-600, 600, n_events)),
+    })
+
+
+def check_parity(wide: pd.DataFrame):
+    expected = extract_session_features(wide)
+    actual = extract_session_features(to_compact(wide))
+    pd.testing.assert_frame_equal(expected, actual, check_exact=False, rtol=1e-12)
+
+
+def report(title: str, wide: pd.DataFrame):
+    check_parity(wide)
+    table = memory_report(wide)
+    ratio = table.loc['total', 'wide'] / table.loc['total', 'compact']
+    print(f'\n{title}: {len(wide)} событий, признаки совпадают, сжатие {ratio:.1f}x (float64)')
+    print(table.fillna('-').to_string())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--file', default='signals.csv')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000_000])
+    args = parser.parse_args()
+
+    if os.path.exists(args.file):
+        report(args.file, parse_signal_file(args.file))
+    for size in args.sizes:
+        report('synthetic', make_wide(size))
+
+
+if __name__ == '__main__':
+    main()
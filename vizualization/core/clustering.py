@@ -0,0 +1,107 @@
+# core/clustering.py
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans
+from sklearn.metrics import davies_bouldin_score, silhouette_score
+from sklearn.pipeline import make_pipeline
+
+from .compute import raise_if_cancelled
+from .feature_store import FeatureSet
+from .model_registry import model_registry
+
+SESSION_MODEL = 'session_kmeans'
+# 'auto' — число кластеров подбирается select_n_clusters
+SESSION_CLUSTERS = 'auto'
+FALLBACK_CLUSTERS = 2
+K_RANGE = range(2, 9)
+# Сколько сессий берётся для оценки одного k — стоимость подбора не растёт с размером таблицы
+SELECTION_SAMPLE = 2000
+
+
+def build_kmeans_pipeline(n_clusters: int = FALLBACK_CLUSTERS, random_state: int = 42, n_init: int = 10,
+                          space_version: int = None):
+    """Кластеризация в общем пространстве признаков (вход уже масштабирован FeatureSpace).
+
+    space_version не влияет на модель — он входит в параметры, чтобы смена
+    пространства признаков приводила к переобучению.
+    """
+    return make_pipeline(KMeans(n_clusters=n_clusters, random_state=random_state, n_init=n_init))
+
+
+def _score_k(X: np.ndarray, k: int, random_state: int) -> dict:
+    labels = KMeans(n_clusters=k, random_state=random_state, n_init=10).fit(X)
+    return {
+        'k': k,
+        'inertia': float(labels.inertia_),
+        'silhouette': float(silhouette_score(X, labels.labels_)),
+        'davies_bouldin': float(davies_bouldin_score(X, labels.labels_)),
+    }
+
+
+def select_n_clusters(X: np.ndarray, k_range=K_RANGE, sample_size: int = SELECTION_SAMPLE,
+                      n_jobs: int = -1, random_state: int = 42, cancel_event=None):
+    """Подбор числа кластеров: каждое k оценивается в отдельном процессе (joblib).
+
+    KMeans обучается и оценивается на случайной выборке из sample_size строк;
+    лучшее k — с максимальным silhouette, при равенстве — с меньшим Davies–Bouldin.
+    Возвращает (k, таблица оценок). Если строк слишком мало для оценки, возвращается
+    FALLBACK_CLUSTERS (или число строк) и пустая таблица. cancel_event (core.compute)
+    проверяется после каждой оценки — оставшиеся k при отмене не считаются.
+    """
+    X = np.asarray(X)
+    if len(X) > sample_size:
+        rng = np.random.default_rng(random_state)
+        X = X[rng.choice(len(X), sample_size, replace=False)]
+
+    # silhouette определён только для 2 <= k <= n - 1
+    candidates = [k for k in k_range if 2 <= k < len(X)]
+    if not candidates:
+        return min(FALLBACK_CLUSTERS, len(X)), pd.DataFrame(columns=['k', 'inertia', 'silhouette', 'davies_bouldin'])
+
+    results = Parallel(n_jobs=min(n_jobs, len(candidates)) if n_jobs > 0 else n_jobs, return_as='generator')(
+        delayed(_score_k)(X, k, random_state) for k in candidates
+    )
+    scores = []
+    for score in results:
+        raise_if_cancelled(cancel_event)
+        scores.append(score)
+    scores = pd.DataFrame(scores)
+    best = scores.sort_values(['silhouette', 'davies_bouldin'], ascending=[False, True]).iloc[0]
+    return int(best['k']), scores
+
+
+def cluster_sessions(features: FeatureSet, n_clusters=SESSION_CLUSTERS, refit: bool = False, cancel_event=None):
+    """Метки кластеров сессий по сохранённой модели (обучается только при необходимости).
+
+    При n_clusters='auto' число кластеров подбирается один раз на версию модели;
+    выбранное k и таблица оценок сохраняются в metrics записи модели. Если пространства
+    признаков нет (сессий меньше PROJECTION_COMPONENTS), все сессии попадают в кластер 0,
+    а вместо записи модели возвращается None. cancel_event прерывает подбор числа кластеров.
+    """
+    if features.space is None:
+        return np.zeros(len(features.sessions), dtype=np.int64), None
+
+    X = features.space.scaled_frame()
+    if n_clusters != 'auto':
+        # KMeans требует не меньше строк, чем кластеров
+        n_clusters = min(n_clusters, len(X))
+    params = {'n_clusters': n_clusters, 'space_version': features.space.version}
+
+    if n_clusters != 'auto':
+        pipeline, record = model_registry.get_or_fit(SESSION_MODEL, X, build_kmeans_pipeline, params, refit=refit)
+        return pipeline.predict(X[record.feature_columns]), record
+
+    with model_registry.fitting(SESSION_MODEL):
+        current = None if refit else model_registry.latest(SESSION_MODEL)
+        if current is not None and model_registry.is_usable(current[1], X, params):
+            pipeline, record = current
+        else:
+            best_k, scores = select_n_clusters(X.to_numpy(), cancel_event=cancel_event)
+            pipeline, record = model_registry.fit(
+                SESSION_MODEL, X,
+                lambda **_: build_kmeans_pipeline(n_clusters=best_k),
+                params,
+                metrics={'n_clusters': best_k, 'k_selection': scores.to_dict('records')},
+            )
+    return pipeline.predict(X[record.feature_columns]), record
@@ -0,0 +1,187 @@
+# core/compute.py
+import asyncio
+import threading
+import time
+
+from nicegui import run, ui
+
+# Одновременно выполняемых задач и сколько ещё может ждать в очереди
+MAX_RUNNING = 2
+MAX_QUEUED = 8
+
+
+class ComputeBusy(RuntimeError):
+    """Очередь тяжёлых расчётов заполнена — задача не принята"""
+
+
+class ComputeCancelled(RuntimeError):
+    """Задача отменена: клиент, для которого она считалась, отключился"""
+
+
+def raise_if_cancelled(cancel_event: threading.Event = None):
+    """Точка отмены в длинном расчёте: ComputeCancelled, если клиент задачи отключился"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise ComputeCancelled('Расчёт отменён')
+
+
+class Job:
+    """Задача в очереди расчётов: состояние для индикатора прогресса и флаг отмены"""
+
+    STATES = {'done': 'готово', 'failed': 'ошибка', 'cancelled': 'отменено'}
+
+    def __init__(self, name: str):
+        self.name = name
+        self.client_id = None
+        self.state = 'queued'
+        self.position = 0
+        self.started = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def status(self) -> str:
+        if self.state == 'queued':
+            return f'{self.name}: в очереди' + (f' ({self.position}-я)' if self.position else '')
+        if self.state == 'running':
+            return f'{self.name}: выполняется {time.monotonic() - self.started:.0f} с'
+        return f'{self.name}: {self.STATES[self.state]}'
+
+
+class ComputePool:
+    """Общая на процесс очередь тяжёлой аналитики (pandas, scikit-learn).
+
+    Функции выполняются вне event loop: по умолчанию в пуле потоков NiceGUI
+    (run.io_bound — numpy и scikit-learn отпускают GIL, а кэши признаков и
+    моделей остаются общими), с process=True — в пуле процессов (run.cpu_bound,
+    только для чистых функций с picklable-аргументами). Одновременно выполняется
+    не больше max_running задач, ждать может не больше max_queued — сверх этого
+    run() сразу бросает ComputeBusy. Задачи удалённого клиента (отключился и не
+    вернулся за reconnect_timeout) снимаются из очереди.
+
+    Поток пула снаружи не остановить: запущенную задачу прерывает только сама
+    функция. С cancellable=True ей передаётся cancel_event, и она проверяет его
+    между чанками (raise_if_cancelled) — место освобождается сразу после отключения
+    клиента. Остальные задачи занимают место до конца расчёта, а их результат
+    отбрасывается. В процесс (process=True) cancel_event не передать.
+    """
+
+    def __init__(self, max_running: int = MAX_RUNNING, max_queued: int = MAX_QUEUED):
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self._queue = []
+        self._running = set()
+        self._wakeup = None
+        self._watched_clients = set()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def stats(self) -> dict:
+        return {'running': len(self._running), 'queued': len(self._queue), 'completed': self.completed,
+                'rejected': self.rejected, 'cancelled': self.cancelled}
+
+    async def run(self, fn, *args, name: str = 'Расчёт', client=None, process: bool = False, job: Job = None,
+                  cancellable: bool = False, **kwargs):
+        """Выполняет fn(*args, **kwargs) через очередь и возвращает результат
+        (cancellable — fn принимает cancel_event задачи)"""
+        if cancellable and process:
+            raise ValueError('cancel_event нельзя передать в процесс: используйте process=False')
+        if len(self._running) >= self.max_running and len(self._queue) >= self.max_queued:
+            self.rejected += 1
+            raise ComputeBusy(f'Сервер занят: в очереди {len(self._queue)} расчётов, попробуйте позже')
+        if self._wakeup is None:
+            self._wakeup = asyncio.Condition()
+
+        job = job or Job(name)
+        if cancellable:
+            kwargs['cancel_event'] = job.cancel_event
+        job.client_id = client.id if client is not None else None
+        if client is not None and client.id not in self._watched_clients:
+            self._watched_clients.add(client.id)
+            client.on_delete(lambda: self.cancel_client(client.id))
+
+        self._queue.append(job)
+        self._update_positions()
+        try:
+            async with self._wakeup:
+                await self._wakeup.wait_for(lambda: job.cancelled or (
+                    len(self._running) < self.max_running and self._queue[0] is job))
+                self._queue.remove(job)
+                if job.cancelled:
+                    raise ComputeCancelled(job.name)
+                self._running.add(job)
+                self._update_positions()
+
+            job.state = 'running'
+            job.started = time.monotonic()
+            if process:
+                result = await run.cpu_bound(fn, *args, **kwargs)
+            else:
+                result = await run.io_bound(fn, *args, **kwargs)
+        except ComputeCancelled:
+            self.cancelled += 1
+            job.state = 'cancelled'
+            raise
+        except BaseException:
+            job.state = 'failed'
+            raise
+        finally:
+            if job in self._queue:
+                self._queue.remove(job)
+            self._running.discard(job)
+            await self._notify()
+
+        if job.cancelled:
+            self.cancelled += 1
+            job.state = 'cancelled'
+            raise ComputeCancelled(job.name)
+        self.completed += 1
+        job.state = 'done'
+        return result
+
+    async def cancel_client(self, client_id: str):
+        """Отменяет все задачи клиента: ожидающие не запустятся, результат запущенных не нужен"""
+        self._watched_clients.discard(client_id)
+        for job in [*self._queue, *self._running]:
+            if job.client_id == client_id:
+                job.cancel_event.set()
+        if self._wakeup is not None:
+            await self._notify()
+
+    async def _notify(self):
+        self._update_positions()
+        async with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _update_positions(self):
+        for position, job in enumerate(self._queue, start=1):
+            job.position = position
+
+
+compute_pool = ComputePool()
+
+
+async def offload(fn, *args, name: str = 'Расчёт', process: bool = False, cancellable: bool = False, **kwargs):
+    """Выполняет fn через compute_pool, показывая прогресс в текущем контейнере страницы.
+
+    Задача привязывается к клиенту страницы и отменяется, если он ушёл (запущенная —
+    только при cancellable=True, см. ComputePool); ComputeBusy и ComputeCancelled
+    пробрасываются вызывающему.
+    """
+    job = Job(name)
+    with ui.row().classes('items-center gap-2') as progress:
+        ui.spinner(size='sm')
+        status = ui.label(job.status()).classes('text-sm text-gray-600')
+        ui.timer(0.5, lambda: status.set_text(job.status()))
+    try:
+        return await compute_pool.run(fn, *args, name=name, client=ui.context.client, process=process, job=job,
+                                      cancellable=cancellable, **kwargs)
+    finally:
+        if not progress.is_deleted:
+            progress.delete()
@@ -0,0 +1,187 @@
+# core/dataset_registry.py
+import asyncio
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import pandas as pd
+from watchfiles import Change, awatch
+
+# Дописанный источник (файл только вырос) перечитывается целиком не чаще раза в столько секунд
+APPEND_RELOAD_INTERVAL = 60.0
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """Загруженная версия источника; общая для всех клиентов и не изменяется"""
+    path: str
+    version: str
+    data: pd.DataFrame
+    # Сколько байт источника разобрано в data (префикс из целых строк)
+    size: int = 0
+    loaded_at: datetime = field(default_factory=datetime.now)
+
+    def view(self) -> pd.DataFrame:
+        """Поверхностная копия для клиента: добавленные колонки не попадут в общий фрейм,
+        а колонки из mmap-кэша доступны только на чтение"""
+        return self.data.copy(deep=False)
+
+
+class DatasetRegistry:
+    """Процессный реестр датасетов: каждый источник загружается один раз на версию.
+
+    loader(path) -> (DataFrame, version, разобрано байт). Фоновая задача watch() следит
+    за файлами через watchfiles и атомарно подменяет датасет после успешной перезагрузки;
+    on_reload(old_version, new_version) вызывается после подмены. Через subscribe()
+    к тому же наблюдению подключаются другие читатели файла (например, SignalTail).
+    Если файл только вырос (дописаны строки), полная перезагрузка откладывается и
+    выполняется не чаще append_reload_interval — дописанное сразу получают подписчики.
+    """
+
+    def __init__(self, loader, on_reload=None, append_reload_interval: float = APPEND_RELOAD_INTERVAL):
+        self.loader = loader
+        self.on_reload = on_reload
+        self.append_reload_interval = append_reload_interval
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.errors = 0
+        self.appends = 0
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._dirs_changed = None
+        self._watched = set()
+        self._listeners = {}
+        self._deferred = {}
+
+    def get(self, path: str) -> Dataset:
+        """Возвращает датасет источника, загружая его только при первом обращении"""
+        path = os.path.abspath(path)
+        dataset = self._entries.get(path)
+        if dataset is not None:
+            self.hits += 1
+            return dataset
+
+        with self._path_lock(path):
+            # Пока ждали блокировку, источник мог загрузить другой клиент
+            dataset = self._entries.get(path)
+            if dataset is not None:
+                self.hits += 1
+                return dataset
+            self.misses += 1
+            dataset = self._load(path)
+            self._entries[path] = dataset
+
+        if os.path.dirname(path) not in self._watched:
+            self._watch_directory_changed()
+        return dataset
+
+    def stats(self) -> dict:
+        """Счётчики попаданий/промахов и перезагрузок"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+            'errors': self.errors,
+            'appends': self.appends,
+            'sources': len(self._entries),
+        }
+
+    def subscribe(self, path: str, callback):
+        """callback() вызывается в пуле потоков при каждом изменении файла path (до перезагрузки датасета)"""
+        path = os.path.abspath(path)
+        with self._lock:
+            self._listeners.setdefault(path, []).append(callback)
+        if os.path.dirname(path) not in self._watched:
+            self._watch_directory_changed()
+
+    def invalidate(self, path: str = None):
+        """Забывает датасет источника (или все), следующий get() загрузит его заново"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+    async def watch(self):
+        """Фоновая задача: перезагружает изменившиеся источники (запускать через app.on_startup)"""
+        self._loop = asyncio.get_running_loop()
+        while True:
+            self._dirs_changed = asyncio.Event()
+            directories = sorted({os.path.dirname(path) for path in [*self._entries, *self._listeners]})
+            self._watched = set(directories)
+            if not directories:
+                await self._dirs_changed.wait()
+                continue
+
+            # Появление источника в новой папке прерывает awatch и перезапускает его с новым набором папок
+            async for changes in awatch(*directories, stop_event=self._dirs_changed, recursive=False):
+                changed = {os.path.abspath(path) for change, path in changes if change != Change.deleted}
+                for path in sorted(changed & set(self._listeners)):
+                    await self._notify_listeners(path)
+                for path in sorted(changed & set(self._entries)):
+                    if self._appended(path):
+                        self._defer_reload(path)
+                    else:
+                        await self._reload(path)
+
+    def _appended(self, path: str) -> bool:
+        try:
+            return os.path.getsize(path) > self._entries[path].size
+        except OSError:
+            return False
+
+    def _defer_reload(self, path: str):
+        self.appends += 1
+        if path not in self._deferred:
+            self._deferred[path] = asyncio.create_task(self._reload_later(path))
+
+    async def _reload_later(self, path: str):
+        await asyncio.sleep(self.append_reload_interval)
+        # Дописанное во время перезагрузки запланирует следующую
+        self._deferred.pop(path, None)
+        await self._reload(path)
+
+    async def _notify_listeners(self, path: str):
+        for callback in list(self._listeners[path]):
+            try:
+                await asyncio.to_thread(callback)
+            except Exception as e:
+                print(f"✗ Ошибка обработки изменения {path}: {e}")
+
+    async def _reload(self, path: str):
+        # Перезагрузка сейчас заменяет отложенную
+        deferred = self._deferred.pop(path, None)
+        if deferred is not None:
+            deferred.cancel()
+        old = self._entries.get(path)
+        try:
+            dataset = await asyncio.to_thread(self._load, path)
+        except Exception as e:
+            # Файл мог быть дописан не полностью — оставляем прежнюю версию до следующего изменения
+            self.errors += 1
+            print(f"✗ Не удалось перезагрузить {path}: {e}")
+            return
+
+        if old is not None and old.version == dataset.version:
+            return
+        self._entries[path] = dataset
+        self.reloads += 1
+        print(f"✓ Датасет {path} обновлён до версии {dataset.version}")
+        if self.on_reload is not None and old is not None:
+            self.on_reload(old.version, dataset.version)
+
+    def _load(self, path: str) -> Dataset:
+        data, version, size = self.loader(path)
+        return Dataset(path=path, version=version, data=data, size=size)
+
+    def _path_lock(self, path: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def _watch_directory_changed(self):
+        if self._loop is not None and self._dirs_changed is not None:
+            self._loop.call_soon_threadsafe(self._dirs_changed.set)
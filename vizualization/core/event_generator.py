@@ -0,0 +1,158 @@
+# core/event_generator.py
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .events import ANALOG_TYPE, DISCRETE_TYPE
+
+SIGNALS = np.array(['A270', 'A268', 'A269', 'A257', 'A258', 'A272', 'A273', 'A274', 'A275'], dtype=object)
+CSV_COLUMNS = ['#', 'UUID', 'Signal', 'Event time', 'Value type', 'Text', 'BigInt', 'Timestamp', 'Double']
+TIME_FORMAT = '%d.%m.%Y %H:%M'
+
+# Параметры те же, что и у прежнего DataLoader.generate_mock_data
+SESSIONS_PER_DAY = (3, 8)
+SESSION_START_HOUR = (6, 20)
+SESSION_DURATION_MIN = (5, 120)
+RECORDS_PER_SESSION = (15, 200)
+DISCRETE_SHARE = 0.7
+ANALOG_RANGE = (-600, 600)
+# Среднее число событий на станок в день — для подбора числа дней в чанке
+EVENTS_PER_MACHINE_DAY = 5 * 107
+
+
+def machine_uuids(machines: int, seed: int = None) -> np.ndarray:
+    """Воспроизводимые UUID станков (в верхнем регистре, как в выгрузке)"""
+    rng = np.random.default_rng(seed)
+    return np.array([str(uuid.UUID(bytes=rng.bytes(16), version=4)).upper() for _ in range(machines)], dtype=object)
+
+
+def generate_event_chunks(machines: int = 1, days: int = 30, seed: int = None, start=None,
+                          chunk_events: int = 1_000_000):
+    """Генератор типизированных чанков синтетических событий (как после DataLoader.parse_file).
+
+    Сессии, сигналы и значения строятся массивами (цикл только по дням). Чанк
+    покрывает целое число дней для всех станков и отсортирован по времени, так что
+    чанки идут по возрастанию Event_time; размер чанка — около chunk_events, но
+    не меньше одного дня. При заданном seed и start результат воспроизводим
+    (start по умолчанию — полночь days дней назад).
+    """
+    # У каждого дня свой поток случайных чисел — результат не зависит от chunk_events
+    day_seeds = np.random.SeedSequence(seed).spawn(days)
+    if start is None:
+        start = datetime.now() - timedelta(days=days)
+    start = np.datetime64(pd.Timestamp(start).normalize().to_datetime64(), 'm')
+    uuids = pd.Categorical(machine_uuids(machines, seed))
+    signals = pd.Categorical(SIGNALS)
+
+    days_per_chunk = max(1, chunk_events // max(machines * EVENTS_PER_MACHINE_DAY, 1))
+    for first_day in range(0, days, days_per_chunk):
+        last_day = min(first_day + days_per_chunk, days)
+        yield pd.concat([
+            _generate_day(np.random.default_rng(day_seeds[day]), start, day, machines, uuids, signals)
+            for day in range(first_day, last_day)
+        ], ignore_index=True)
+
+
+def _generate_day(rng, start, day, machines, uuids, signals) -> pd.DataFrame:
+    # Сессии: по каждому станку случайное число сессий, у каждой сессии начало, длительность и число записей
+    sessions = rng.integers(*SESSIONS_PER_DAY, size=machines)
+    session_machine = np.repeat(np.arange(machines), sessions)
+    n_sessions = len(session_machine)
+
+    start_min = (day * 1440
+                 + rng.integers(*SESSION_START_HOUR, size=n_sessions) * 60
+                 + rng.integers(0, 60, size=n_sessions))
+    duration = rng.integers(*SESSION_DURATION_MIN, size=n_sessions)
+    records = rng.integers(*RECORDS_PER_SESSION, size=n_sessions)
+
+    # События: записи сессии разбрасываются внутри её длительности
+    event_session = np.repeat(np.arange(n_sessions), records)
+    n_events = len(event_session)
+    offset = np.floor(rng.random(n_events) * duration[event_session]).astype(np.int64)
+    minutes = start_min[event_session] + offset
+
+    discrete = rng.random(n_events) < DISCRETE_SHARE
+    analog_value = np.round(rng.uniform(*ANALOG_RANGE, size=n_events), 2)
+    text = np.where(discrete, rng.integers(0, 2, size=n_events), analog_value)
+    signal = rng.integers(0, len(signals.categories), size=n_events)
+
+    order = np.argsort(minutes, kind='stable')
+    return pd.DataFrame({
+        'UUID': pd.Categorical.from_codes(session_machine[event_session][order], dtype=uuids.dtype),
+        'Signal': pd.Categorical.from_codes(signal[order], dtype=signals.dtype),
+        'Event_time': start + minutes[order].astype('timedelta64[m]'),
+        'Value_type': np.where(discrete, DISCRETE_TYPE, ANALOG_TYPE)[order],
+        'Text': text[order],
+        'Double': np.where(discrete, np.nan, analog_value)[order],
+    })
+
+
+def _value_strings() -> np.ndarray:
+    # Аналоговые значения округлены до сотых и лежат в ANALOG_RANGE — строки для всех значений считаются один раз
+    low, high = ANALOG_RANGE
+    return np.array([str(cents / 100) for cents in range(low * 100, high * 100 + 1)], dtype=object)
+
+
+VALUE_STRINGS = _value_strings()
+
+
+def to_csv_text(chunk: pd.DataFrame, first_row: int = 0) -> str:
+    """Строки signals.csv для чанка (без заголовка, с завершающим переводом строки).
+
+    Все колонки форматируются через таблицы готовых строк (время — по уникальным
+    минутам, значения — по сотым), поэтому в Python остаётся только склейка строк.
+    """
+    n = len(chunk)
+    # Время с точностью до минуты — форматируем только уникальные значения
+    minutes, inverse = np.unique(chunk['Event_time'].to_numpy(), return_inverse=True)
+    time_text = pd.to_datetime(minutes).strftime(TIME_FORMAT).to_numpy(dtype=object)[inverse]
+
+    value_type = chunk['Value_type'].to_numpy()
+    discrete = value_type == DISCRETE_TYPE
+    text = chunk['Text'].to_numpy()
+    bigint = np.where(discrete, np.where(text > 0, '1', '0'), '').astype(object)
+    cents = np.rint(np.where(discrete, 0, text) * 100).astype(np.int64) - ANALOG_RANGE[0] * 100
+    analog = np.where(discrete, '', VALUE_STRINGS[cents]).astype(object)
+
+    lines = zip(
+        map(str, range(first_row, first_row + n)),
+        _category_strings(chunk['UUID']),
+        _category_strings(chunk['Signal']),
+        time_text,
+        np.where(discrete, str(DISCRETE_TYPE), str(ANALOG_TYPE)).astype(object),
+        np.where(discrete, bigint, analog),
+        bigint,
+        [''] * n,
+        analog,
+    )
+    return '\n'.join(map(';'.join, lines)) + '\n' if n else ''
+
+
+def _category_strings(values: pd.Series) -> np.ndarray:
+    return np.asarray(values.cat.categories, dtype=object)[values.cat.codes.to_numpy()]
+
+
+def write_signals_csv(filepath: str, machines: int = 1, days: int = 30, seed: int = None, start=None,
+                      chunk_events: int = 1_000_000) -> int:
+    """Пишет синтетическую выгрузку в формате signals.csv по чанкам; возвращает число событий.
+
+    Память ограничена одним чанком, поэтому так можно получить выгрузку на десятки
+    миллионов событий. Файл пишется во временный и переименовывается в конце.
+    """
+    tmp_path = f'{filepath}.tmp'
+    written = 0
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(';'.join(CSV_COLUMNS) + '\n')
+            for chunk in generate_event_chunks(machines, days, seed, start, chunk_events):
+                f.write(to_csv_text(chunk, written))
+                written += len(chunk)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
@@ -0,0 +1,104 @@
+# core/events.py
+import numpy as np
+import pandas as pd
+
+DISCRETE_TYPE = 11
+ANALOG_TYPE = 17
+
+# Компактное представление: словарные UUID/Signal, int8 тип значения, одна колонка значения, время в нс от эпохи
+COMPACT_COLUMNS = ['UUID', 'Signal', 'Event_ns', 'Value_type', 'Value']
+UNKNOWN_TYPE = 0
+
+
+def is_compact(df: pd.DataFrame) -> bool:
+    """Фрейм уже в компактном представлении"""
+    return 'Event_ns' in df.columns and 'Value' in df.columns
+
+
+def to_compact(df: pd.DataFrame, value_dtype=np.float64) -> pd.DataFrame:
+    """Сжимает типизированный фрейм выгрузки (после coerce_signal_frame) в компактный.
+
+    Значение берётся из Text для дискретных сигналов и из Double для аналоговых
+    (для прочих типов — первое непустое из Double, Text, BigInt). Колонки '#',
+    BigInt и Timestamp не переносятся. float32 вдвое уменьшает колонку значения,
+    но признаки по ней будут отличаться от float64 в младших разрядах.
+    """
+    if is_compact(df):
+        return df
+
+    value_type = df['Value_type'].to_numpy(dtype=np.float64, na_value=np.nan)
+    value = df['Double'] if 'Double' in df.columns else pd.Series(np.nan, index=df.index)
+    for column in ('Text', 'BigInt'):
+        if column in df.columns:
+            value = value.combine_first(df[column])
+    if 'Text' in df.columns:
+        value = value.mask(value_type == DISCRETE_TYPE, df['Text'])
+
+    return pd.DataFrame({
+        'UUID': _dictionary(df['UUID']) if 'UUID' in df.columns else pd.Categorical([None] * len(df)),
+        'Signal': _dictionary(df['Signal']),
+        'Event_ns': df['Event_time'].to_numpy(dtype='datetime64[ns]').view(np.int64),
+        'Value_type': np.nan_to_num(value_type, nan=UNKNOWN_TYPE).astype(np.int8),
+        'Value': value.to_numpy(dtype=value_dtype, na_value=np.nan),
+    }, columns=COMPACT_COLUMNS)
+
+
+def to_signal_frame(events: pd.DataFrame) -> pd.DataFrame:
+    """Обратное преобразование в привычные колонки Event_time/Value_type/Text/Double"""
+    if not is_compact(events):
+        return events
+
+    value_type = events['Value_type'].to_numpy()
+    value = events['Value'].astype(np.float64)
+    return pd.DataFrame({
+        'UUID': events['UUID'],
+        'Signal': events['Signal'],
+        'Event_time': event_times(events),
+        'Value_type': value_type.astype(np.int64),
+        'Text': value.where(value_type == DISCRETE_TYPE),
+        'Double': value.where(value_type != DISCRETE_TYPE),
+    })
+
+
+def event_times(events: pd.DataFrame) -> pd.Series:
+    """Время событий как datetime64 (без копирования для компактного фрейма)"""
+    if 'Event_time' in events.columns:
+        return events['Event_time']
+    return pd.Series(events['Event_ns'].to_numpy().view('datetime64[ns]'), index=events.index, name='Event_time')
+
+
+def event_values(events: pd.DataFrame):
+    """Колонки значений (дискретные, аналоговые) для расчёта признаков в любом представлении"""
+    if 'Value' in events.columns:
+        return events['Value'], events['Value']
+    return events['Text'], events['Double']
+
+
+def bytes_per_event(df: pd.DataFrame) -> float:
+    """Сколько байт занимает одно событие (с учётом строк и словарей)"""
+    return df.memory_usage(deep=True, index=False).sum() / max(len(df), 1)
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Байт на событие по колонкам: исходный фрейм против компактного (float64 и float32)"""
+    variants = {
+        'wide': df,
+        'compact': to_compact(df),
+        'compact_f32': to_compact(df, value_dtype=np.float32),
+    }
+    columns = {}
+    for name, frame in variants.items():
+        columns[name] = frame.memory_usage(deep=True, index=False) / max(len(frame), 1)
+    table = pd.DataFrame(columns)
+    order = list(df.columns) + [c for c in COMPACT_COLUMNS if c not in df.columns]
+    table = table.reindex(order)
+    table.loc['total'] = table.sum()
+    return table.round(2)
+
+
+def _dictionary(values: pd.Series) -> pd.Categorical:
+    # Уже категориальные колонки (например, из колоночного кэша) переиспользуют свой словарь
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.remove_unused_categories().array
+    return pd.Categorical(values)
+
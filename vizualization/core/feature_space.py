@@ -0,0 +1,59 @@
+# core/feature_space.py
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from .model_registry import model_registry
+
+SESSION_SPACE = 'session_space'
+PROJECTION_COMPONENTS = 2
+
+
+def build_space_pipeline(n_components: int = PROJECTION_COMPONENTS):
+    """Пространство признаков сессий: масштабирование + PCA-проекция"""
+    return make_pipeline(StandardScaler(), PCA(n_components=n_components))
+
+
+class FeatureSpace:
+    """Общее масштабированное пространство признаков сессий.
+
+    Владеет обученными scaler и PCA (версия хранится в model_registry), матрицей
+    X_scaled и 2D-координатами coords для своих сессий. Кластеризация, scatter
+    и любые другие встраивания берут X_scaled/coords отсюда, а новые сессии
+    переводятся в то же пространство через transform()/project() без переобучения.
+    """
+
+    def __init__(self, pipeline, record, X: pd.DataFrame):
+        self.pipeline = pipeline
+        self.record = record
+        self.feature_columns = record.feature_columns
+        self.scaler = pipeline[0]
+        self.pca = pipeline[-1]
+        self.X_scaled = self.transform(X)
+        self.coords = self.pca.transform(self.X_scaled)
+
+    @classmethod
+    def fit(cls, X: pd.DataFrame, n_components: int = PROJECTION_COMPONENTS, refit: bool = False):
+        """Пространство для матрицы признаков X (обучается, только если подходящей версии нет)"""
+        pipeline, record = model_registry.get_or_fit(
+            SESSION_SPACE, X, build_space_pipeline, {'n_components': n_components}, refit=refit,
+        )
+        return cls(pipeline, record, X)
+
+    @property
+    def version(self) -> int:
+        return self.record.version
+
+    def transform(self, X: pd.DataFrame) -> np.ndarray:
+        """Масштабированные признаки новых сессий"""
+        return self.scaler.transform(X[self.feature_columns])
+
+    def project(self, X: pd.DataFrame) -> np.ndarray:
+        """2D-координаты новых сессий в той же PCA-проекции"""
+        return self.pca.transform(self.transform(X))
+
+    def scaled_frame(self) -> pd.DataFrame:
+        """X_scaled с именами признаков (вход для моделей поверх пространства)"""
+        return pd.DataFrame(self.X_scaled, columns=self.feature_columns)
@@ -0,0 +1,110 @@
+# core/feature_store.py
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pandas as pd
+
+from .feature_space import PROJECTION_COMPONENTS, FeatureSpace
+from .features import extract_session_features
+
+NON_FEATURE_COLUMNS = ['session_id', 'date']
+
+
+@dataclass
+class FeatureSet:
+    """Всё, что вкладкам нужно от одной версии датасета"""
+    version: str
+    sessions: pd.DataFrame
+    daily_stats: pd.DataFrame
+    feature_columns: list
+    space: FeatureSpace
+
+
+def dataset_version(df: pd.DataFrame) -> str:
+    """Версия датасета по содержимому, если загрузчик не передал её явно"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(','.join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def build_daily_stats(sessions: pd.DataFrame) -> pd.DataFrame:
+    """Дневная статистика по сессиям (общая для Overview и Error Trends)"""
+    return sessions.groupby('date').agg(
+        total_signals_day=('total_signals', 'sum'),
+        avg_signals_per_min_day=('signals_per_min', 'mean'),
+        total_duration_day=('duration_min', 'sum'),
+        max_analog_day=('max_analog', 'max'),
+    ).reset_index()
+
+
+def build_feature_set(data: pd.DataFrame, version: str) -> FeatureSet:
+    """Считает признаки сессий, дневную статистику и общее пространство признаков"""
+    sessions = extract_session_features(data)
+    feature_columns = [col for col in sessions.columns if col not in NON_FEATURE_COLUMNS]
+    X = sessions[feature_columns].fillna(0)
+
+    # PCA-проекции нужно хотя бы столько сессий, сколько компонент
+    space = FeatureSpace.fit(X) if len(X) >= PROJECTION_COMPONENTS else None
+
+    return FeatureSet(
+        version=version,
+        sessions=sessions,
+        daily_stats=build_daily_stats(sessions),
+        feature_columns=feature_columns,
+        space=space,
+    )
+
+
+class FeatureStore:
+    """Мемоизация FeatureSet по версии датасета: признаки считаются один раз на версию.
+
+    Общая блокировка держится только на поиск и вставку записи; сами признаки
+    версии строит один поток под её собственной блокировкой, остальные ждут
+    его результата — как в FigureCache. Чтение готовой версии не ждёт чужих сборок.
+    """
+
+    def __init__(self, max_entries: int = 4):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def get(self, data: pd.DataFrame, version: str = None) -> FeatureSet:
+        """Возвращает FeatureSet для данных, вычисляя его только при первом обращении к версии"""
+        if version is None:
+            version = dataset_version(data)
+
+        with self._lock:
+            entry = self._entries.get(version)
+            if entry is not None:
+                self._entries.move_to_end(version)
+                return entry
+            version_lock = self._building.setdefault(version, threading.Lock())
+
+        with version_lock:
+            with self._lock:
+                # Пока ждали, версию мог собрать другой клиент
+                entry = self._entries.get(version)
+                if entry is not None:
+                    return entry
+            entry = build_feature_set(data, version)
+            with self._lock:
+                self._entries[version] = entry
+                self._building.pop(version, None)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, version: str = None):
+        """Сбрасывает закэшированные признаки версии (или все, если version=None)"""
+        with self._lock:
+            if version is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(version, None)
+
+
+feature_store = FeatureStore()
@@ -0,0 +1,96 @@
+# core/features.py
+import numpy as np
+import pandas as pd
+
+from .events import ANALOG_TYPE, DISCRETE_TYPE, event_times, event_values
+
+SESSION_GAP_HOURS = 2
+
+FEATURE_COLUMNS = [
+    'session_id', 'date', 'duration_min', 'total_signals', 'signals_per_min',
+    'discrete_ratio', 'analog_ratio', 'avg_discrete_active', 'unique_discrete',
+    'avg_analog_abs', 'max_analog', 'std_analog', 'total_unique_signals', 'rare_signal_ratio',
+]
+
+
+def session_ids(event_time: pd.Series) -> np.ndarray:
+    """Номер сессии для каждого события: новая сессия при смене дня или паузе больше 2 часов"""
+    gap = (event_time.diff().dt.total_seconds() / 3600) > SESSION_GAP_HOURS
+    keys = pd.DataFrame({'day': event_time.dt.normalize().to_numpy(), 'gap': gap.cumsum().to_numpy()})
+    return keys.groupby(['day', 'gap']).ngroup().to_numpy()
+
+
+def extract_session_features(df: pd.DataFrame, session_id: np.ndarray = None) -> pd.DataFrame:
+    """Признаки сессий одним набором групповых агрегаций (без цикла по сессиям).
+
+    Ожидает колонки Event_time, Value_type, Signal, Text, Double или компактное
+    представление (core.events); df не изменяется. Сессии из одного события отбрасываются.
+    """
+    event_time = event_times(df)
+    if session_id is None:
+        session_id = session_ids(event_time)
+
+    value_type = df['Value_type'].to_numpy()
+    is_discrete = value_type == DISCRETE_TYPE
+    is_analog = value_type == ANALOG_TYPE
+    discrete_value, analog_value = event_values(df)
+    analog_value = analog_value.where(is_analog).astype(np.float64)
+
+    # Значения вне своего типа заменяются на NaN, чтобы агрегаты считались только по нужным строкам
+    frame = pd.DataFrame({
+        'session_id': session_id,
+        'time': event_time.to_numpy(),
+        'is_discrete': is_discrete,
+        'is_analog': is_analog,
+        'discrete_value': discrete_value.where(is_discrete).to_numpy(dtype=np.float64),
+        'discrete_signal': df['Signal'].where(is_discrete),
+        'analog_value': analog_value.to_numpy(),
+        'analog_abs': analog_value.abs().to_numpy(),
+        'signal': df['Signal'],
+    })
+
+    grouped = frame.groupby('session_id', sort=True)
+    agg = grouped.agg(
+        total_signals=('time', 'size'),
+        first_time=('time', 'first'),
+        min_time=('time', 'min'),
+        max_time=('time', 'max'),
+        n_discrete=('is_discrete', 'sum'),
+        n_analog=('is_analog', 'sum'),
+        avg_discrete_active=('discrete_value', 'mean'),
+        unique_discrete=('discrete_signal', 'nunique'),
+        avg_analog_abs=('analog_abs', 'mean'),
+        max_analog=('analog_abs', 'max'),
+        std_analog=('analog_value', 'std'),
+        total_unique_signals=('signal', 'nunique'),
+    )
+
+    # Редкие сигналы — встречающиеся в сессии ровно один раз
+    pair_counts = frame.groupby(['session_id', 'signal'], sort=False, observed=True).size()
+    rare = (pair_counts == 1).groupby(level=0).sum()
+    agg['rare_rows'] = rare.reindex(agg.index, fill_value=0)
+
+    agg = agg[agg['total_signals'] >= 2]
+
+    total = agg['total_signals']
+    duration = (agg['max_time'] - agg['min_time']).dt.total_seconds() / 60 + 1
+    has_discrete = agg['n_discrete'] > 0
+    has_analog = agg['n_analog'] > 0
+
+    features = pd.DataFrame({
+        'session_id': agg.index.to_numpy(dtype=np.int64),
+        'date': agg['first_time'].dt.date.to_numpy(),
+        'duration_min': duration.to_numpy(),
+        'total_signals': total.to_numpy(dtype=np.int64),
+        'signals_per_min': (total / duration).to_numpy(),
+        'discrete_ratio': (agg['n_discrete'] / total).to_numpy(),
+        'analog_ratio': (agg['n_analog'] / total).to_numpy(),
+        'avg_discrete_active': agg['avg_discrete_active'].where(has_discrete, 0).to_numpy(),
+        'unique_discrete': agg['unique_discrete'].to_numpy(dtype=np.int64),
+        'avg_analog_abs': agg['avg_analog_abs'].where(has_analog, 0).to_numpy(),
+        'max_analog': agg['max_analog'].where(has_analog, 0).to_numpy(),
+        'std_analog': agg['std_analog'].where(agg['n_analog'] > 1, 0).to_numpy(),
+        'total_unique_signals': agg['total_unique_signals'].to_numpy(dtype=np.int64),
+        'rare_signal_ratio': (agg['rare_rows'] / total).to_numpy(),
+    }, columns=FEATURE_COLUMNS)
+    return features
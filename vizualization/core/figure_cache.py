@@ -0,0 +1,67 @@
+# core/figure_cache.py
+import threading
+from collections import OrderedDict
+
+import orjson
+
+
+def _params_key(params: dict) -> bytes:
+    # Параметры графика -> стабильный ключ (порядок аргументов не важен)
+    return orjson.dumps(params or {}, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class FigureCache:
+    """Процессный LRU-кэш готовых фигур plotly.
+
+    Ключ — (тип графика, версия датасета, параметры); значение — JSON-готовый
+    dict фигуры (fig.to_plotly_json()), который ui.plotly отдаёт клиенту без
+    повторной сборки. Одну и ту же фигуру строит только один поток, остальные
+    ждут его результата. Новая версия датасета даёт новые ключи, а старые
+    вытесняются по LRU.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def get_or_build(self, chart: str, version: str, params: dict, build) -> dict:
+        """Фигура из кэша или build() -> go.Figure, сохранённая под ключом"""
+        key = (chart, version, _params_key(params))
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            key_lock = self._building.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                # Пока ждали, фигуру мог собрать другой клиент
+                if key in self._entries:
+                    self.hits += 1
+                    return self._entries[key]
+            figure = build().to_plotly_json()
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = figure
+                self._building.pop(key, None)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return figure
+
+    def invalidate(self, version: str = None):
+        """Сбрасывает фигуры указанной версии датасета (или все)"""
+        with self._lock:
+            for key in [k for k in self._entries if version is None or k[1] == version]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+figure_cache = FigureCache()
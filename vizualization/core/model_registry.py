@@ -0,0 +1,214 @@
+# core/model_registry.py
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Порог дрейфа: насколько (в стандартных отклонениях обучающих данных) сместилось среднее признака
+DRIFT_THRESHOLD = 0.5
+# Сколько последних версий каждой модели хранится на диске
+MAX_VERSIONS = 5
+
+
+@dataclass
+class ModelRecord:
+    """Метаданные сохранённой версии модели"""
+    name: str
+    version: int
+    feature_columns: list
+    fingerprint: str
+    n_samples: int
+    params: dict = field(default_factory=dict)
+    metrics: dict = field(default_factory=dict)
+    # Среднее и std признаков обучающих данных — точка отсчёта для дрейфа
+    baseline: dict = None
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec='seconds'))
+
+    @property
+    def filename(self) -> str:
+        return f'{self.name}_v{self.version}.joblib'
+
+
+def data_fingerprint(X: pd.DataFrame) -> str:
+    """Отпечаток обучающих данных: схема и содержимое"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(','.join(map(str, X.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def feature_baseline(X: pd.DataFrame) -> dict:
+    """Среднее и стандартное отклонение признаков (сохраняются вместе с версией модели)"""
+    values = X.to_numpy(dtype=np.float64)
+    return {'mean': np.nanmean(values, axis=0).tolist(), 'std': np.nanstd(values, axis=0).tolist()}
+
+
+def feature_drift(baseline: dict, X: pd.DataFrame) -> float:
+    """Дрейф новых данных относительно обучающих: максимальный |сдвиг среднего| в единицах std.
+
+    Признаки, постоянные в обучающих данных (std = 0), сравниваются без нормировки.
+    """
+    if len(X) == 0:
+        return 0.0
+    mean = np.nanmean(X.to_numpy(dtype=np.float64), axis=0)
+    std = np.asarray(baseline['std'])
+    shift = np.abs(mean - np.asarray(baseline['mean'])) / np.where(std > 0, std, 1.0)
+    return float(np.nanmax(shift))
+
+
+class ModelRegistry:
+    """Версионированное хранилище обученных конвейеров sklearn на диске.
+
+    Для каждого имени хранится manifest.json со списком версий (схема признаков,
+    отпечаток обучающих данных, параметры и метрики) и по файлу joblib на версию.
+    Дашборды вызывают только predict(); переобучение происходит по явному запросу
+    (refit=True) или когда дрейф новых данных превышает drift_threshold. Проверка
+    и обучение в get_or_fit идут под блокировкой имени модели (fitting), так что
+    параллельные клиенты не обучают одну модель дважды. Хранятся только
+    max_versions последних версий, более старые удаляются при сохранении новой.
+    """
+
+    def __init__(self, root: str = 'models', drift_threshold: float = DRIFT_THRESHOLD,
+                 max_versions: int = MAX_VERSIONS):
+        self.root = root
+        self.drift_threshold = drift_threshold
+        self.max_versions = max_versions
+        self._loaded = {}
+        self._fitting = {}
+        self._lock = threading.Lock()
+
+    def fitting(self, name: str) -> threading.RLock:
+        """Блокировка обучения модели name: проверка latest/is_usable и fit под ней не дублируются"""
+        with self._lock:
+            return self._fitting.setdefault(name, threading.RLock())
+
+    def records(self, name: str) -> list:
+        """Все версии модели (старые первыми)"""
+        known = {f.name for f in fields(ModelRecord)}
+        # Поля записей из старых манифестов, которых нет в ModelRecord, пропускаются
+        return [ModelRecord(**{'name': name, **{k: v for k, v in record.items() if k in known}})
+                for record in self._read_manifest(name)['versions']]
+
+    def latest(self, name: str):
+        """Последняя версия: (конвейер, ModelRecord) или None, если модель ещё не обучалась"""
+        records = self.records(name)
+        if not records:
+            return None
+        record = records[-1]
+        return self._load(record), record
+
+    def fit(self, name: str, X: pd.DataFrame, build, params: dict = None, metrics: dict = None):
+        """Обучает новый конвейер build(**params) на X и сохраняет его следующей версией
+        (metrics — дополнительные метрики для манифеста)"""
+        params = params or {}
+        pipeline = build(**params)
+        pipeline.fit(X)
+        return self.save(name, pipeline, list(map(str, X.columns)), data_fingerprint(X), len(X), params,
+                         metrics=metrics, baseline=feature_baseline(X))
+
+    def save(self, name: str, pipeline, feature_columns: list, fingerprint: str, n_samples: int,
+             params: dict = None, metrics: dict = None, baseline: dict = None):
+        """Сохраняет уже обученный конвейер следующей версией (например, обученный по частям);
+        baseline — среднее и std обучающих признаков для оценки дрейфа"""
+        metrics = dict(metrics or {})
+        if hasattr(pipeline[-1], 'inertia_'):
+            metrics['inertia'] = float(pipeline[-1].inertia_)
+        if hasattr(pipeline[-1], 'explained_variance_ratio_'):
+            metrics['explained_variance'] = pipeline[-1].explained_variance_ratio_.tolist()
+
+        with self._lock:
+            manifest = self._read_manifest(name)
+            version = manifest['versions'][-1]['version'] + 1 if manifest['versions'] else 1
+            record = ModelRecord(
+                name=name,
+                version=version,
+                feature_columns=feature_columns,
+                fingerprint=fingerprint,
+                n_samples=n_samples,
+                params=params or {},
+                metrics=metrics,
+                baseline=baseline,
+            )
+            directory = self._model_dir(name)
+            os.makedirs(directory, exist_ok=True)
+            joblib.dump(pipeline, os.path.join(directory, record.filename))
+            manifest['versions'].append(asdict(record))
+            stale = manifest['versions'][:-self.max_versions]
+            manifest['versions'] = manifest['versions'][-self.max_versions:]
+            self._write_manifest(name, manifest)
+            self._loaded[(name, version)] = pipeline
+            # Старые версии удаляются после записи манифеста, который на них уже не ссылается
+            for old in stale:
+                self._loaded.pop((name, old['version']), None)
+                with contextlib.suppress(OSError):
+                    os.remove(os.path.join(directory, f"{name}_v{old['version']}.joblib"))
+
+        print(f"✓ Модель {name} v{version} обучена на {n_samples} строках")
+        return pipeline, record
+
+    def get_or_fit(self, name: str, X: pd.DataFrame, build, params: dict = None, refit: bool = False):
+        """Последняя подходящая версия модели; обучает новую, только если её нет,
+        сменились схема признаков или параметры, превышен порог дрейфа или refit=True"""
+        params = params or {}
+        with self.fitting(name):
+            current = None if refit else self.latest(name)
+            if current is not None:
+                pipeline, record = current
+                if self.is_usable(record, X, params):
+                    return pipeline, record
+            return self.fit(name, X, build, params)
+
+    def predict(self, name: str, X: pd.DataFrame, build, params: dict = None, refit: bool = False) -> np.ndarray:
+        """Метки для X по последней подходящей версии модели"""
+        pipeline, record = self.get_or_fit(name, X, build, params, refit)
+        return pipeline.predict(X[record.feature_columns])
+
+    def is_usable(self, record: ModelRecord, X: pd.DataFrame, params: dict, fingerprint: str = None) -> bool:
+        """Подходит ли версия для X: та же схема и параметры, а данные те же или без сильного дрейфа
+        (fingerprint — отпечаток обучающих данных, если он считается не по X)"""
+        if record.feature_columns != list(map(str, X.columns)) or record.params != params:
+            return False
+        if record.fingerprint == (fingerprint or data_fingerprint(X)):
+            return True
+        if record.baseline is None:
+            return False
+        drift = feature_drift(record.baseline, X)
+        if drift > self.drift_threshold:
+            print(f"✗ Дрейф признаков {drift:.2f} > {self.drift_threshold} — модель {record.name} будет переобучена")
+            return False
+        return True
+
+    def _load(self, record: ModelRecord):
+        key = (record.name, record.version)
+        with self._lock:
+            if key not in self._loaded:
+                self._loaded[key] = joblib.load(os.path.join(self._model_dir(record.name), record.filename))
+            return self._loaded[key]
+
+    def _model_dir(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _read_manifest(self, name: str) -> dict:
+        try:
+            with open(os.path.join(self._model_dir(name), 'manifest.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'name': name, 'versions': []}
+
+    def _write_manifest(self, name: str, manifest: dict):
+        directory = self._model_dir(name)
+        fd, tmp_path = tempfile.mkstemp(prefix='.manifest_', dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, os.path.join(directory, 'manifest.json'))
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,14 @@
+# core/scatter.py
+import plotly.graph_objects as go
+
+# Выше этого числа точек на графике SVG-отрисовка начинает тормозить — переходим на WebGL
+WEBGL_THRESHOLD = 10_000
+
+
+def scatter_class(n_points: int, threshold: int = WEBGL_THRESHOLD):
+    """go.Scattergl для больших графиков, go.Scatter (SVG) для остальных.
+
+    n_points — число точек на всём графике, а не в одном ряду: один
+    класс для всех рядов графика, чтобы слои не перекрывали друг друга.
+    """
+    return go.Scattergl if n_points > threshold else go.Scatter
@@ -0,0 +1,355 @@
+# core/session_tail.py
+import asyncio
+import io
+import math
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .events import to_signal_frame
+from .features import ANALOG_TYPE, DISCRETE_TYPE, FEATURE_COLUMNS, SESSION_GAP_HOURS
+from .signal_stream import READ_OPTIONS, coerce_signal_frame
+
+SESSION_GAP = np.timedelta64(SESSION_GAP_HOURS, 'h')
+# Сколько байт дописанного SignalTail разбирает за раз
+READ_BLOCK_BYTES = 16 << 20
+
+
+class _Session:
+    """Накопитель агрегатов одной сессии; части сливаются без хранения самих событий"""
+
+    def __init__(self, session_id: int):
+        self.session_id = session_id
+        self.count = 0
+        self.start = None
+        self.end = None
+        self.n_discrete = 0
+        self.n_analog = 0
+        self.text_sum = 0.0
+        self.text_n = 0
+        self.abs_sum = 0.0
+        self.abs_n = 0
+        self.abs_max = math.nan
+        # Welford: количество, среднее и сумма квадратов отклонений аналоговых значений
+        self.analog_n = 0
+        self.analog_mean = 0.0
+        self.analog_m2 = 0.0
+        self.signals = Counter()
+        self.discrete_signals = set()
+
+    def merge(self, part, signals: dict, discrete_signals):
+        """Добавляет агрегаты части сессии (строка из _segment_parts)"""
+        self.count += int(part.count)
+        self.start = part.start if self.start is None else min(self.start, part.start)
+        self.end = part.end if self.end is None else max(self.end, part.end)
+        self.n_discrete += int(part.n_discrete)
+        self.n_analog += int(part.n_analog)
+        self.text_sum += part.text_sum
+        self.text_n += int(part.text_n)
+        self.abs_sum += part.abs_sum
+        self.abs_n += int(part.abs_n)
+        if part.abs_n:
+            self.abs_max = part.abs_max if math.isnan(self.abs_max) else max(self.abs_max, part.abs_max)
+
+        n = int(part.analog_n)
+        if n:
+            total = self.analog_n + n
+            delta = part.analog_mean - self.analog_mean
+            self.analog_m2 += part.analog_m2 + delta * delta * self.analog_n * n / total
+            self.analog_mean += delta * n / total
+            self.analog_n = total
+
+        self.signals.update(signals)
+        self.discrete_signals.update(discrete_signals)
+
+    def features(self) -> dict:
+        """Строка признаков в том же виде, что и extract_session_features"""
+        duration = (self.end - self.start) / np.timedelta64(1, 'm') + 1
+        if self.n_analog > 1:
+            std = math.sqrt(self.analog_m2 / (self.analog_n - 1)) if self.analog_n > 1 else math.nan
+        else:
+            std = 0
+        return {
+            'session_id': self.session_id,
+            'date': pd.Timestamp(self.start).date(),
+            'duration_min': duration,
+            'total_signals': self.count,
+            'signals_per_min': self.count / duration,
+            'discrete_ratio': self.n_discrete / self.count,
+            'analog_ratio': self.n_analog / self.count,
+            'avg_discrete_active': _mean_or_default(self.text_sum, self.text_n, self.n_discrete),
+            'unique_discrete': len(self.discrete_signals),
+            'avg_analog_abs': _mean_or_default(self.abs_sum, self.abs_n, self.n_analog),
+            'max_analog': self.abs_max if self.n_analog else 0,
+            'std_analog': std,
+            'total_unique_signals': len(self.signals),
+            'rare_signal_ratio': sum(1 for c in self.signals.values() if c == 1) / self.count,
+        }
+
+
+def _mean_or_default(total: float, n: int, rows: int) -> float:
+    # Как в пакетном варианте: нет строк нужного типа -> 0, строки есть, но все значения NaN -> NaN
+    if not rows:
+        return 0
+    return total / n if n else math.nan
+
+
+class SessionTracker:
+    """Инкрементальная нарезка событий на сессии по правилу «смена дня или пауза > 2 ч».
+
+    Новые строки сначала попадают в буфер и выпускаются в обработку, когда отстают от
+    максимального увиденного времени больше чем на watermark — так строки, пришедшие
+    с опозданием в пределах watermark, встают на своё место. Более поздние строки
+    (старше уже обработанной границы) отбрасываются и считаются в late_dropped.
+    Стоимость push() — O(новых строк).
+    """
+
+    def __init__(self, watermark: pd.Timedelta = pd.Timedelta(minutes=5)):
+        self.watermark = np.timedelta64(pd.Timedelta(watermark).value, 'ns')
+        self.version = 0
+        self.late_dropped = 0
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Забывает все сессии (например, если файл выгрузки был перезаписан)"""
+        with self._lock:
+            self._pending = None
+            self._max_seen = None
+            self._frontier = None
+            self._last_time = None
+            self._open = None
+            self._closed = []
+            self._next_id = 0
+            self.version += 1
+
+    def push(self, events: pd.DataFrame) -> int:
+        """Принимает типизированные события; возвращает число обработанных строк"""
+        if events.empty:
+            return 0
+        with self._lock:
+            events = events[['Signal', 'Event_time', 'Value_type', 'Text', 'Double']]
+            if self._frontier is not None:
+                late = events['Event_time'].to_numpy() < self._frontier
+                if late.any():
+                    self.late_dropped += int(late.sum())
+                    events = events[~late]
+
+            pending = events if self._pending is None else pd.concat([self._pending, events])
+            pending = pending.sort_values('Event_time', kind='stable')
+            times = pending['Event_time'].to_numpy()
+            if len(times) == 0:
+                return 0
+            self._max_seen = times[-1] if self._max_seen is None else max(self._max_seen, times[-1])
+
+            # Выпускаем строки, которые уже не может обогнать опоздавшая строка
+            frontier = self._max_seen - self.watermark
+            n_ready = int(np.searchsorted(times, frontier, side='right'))
+            ready, self._pending = pending.iloc[:n_ready], pending.iloc[n_ready:]
+            if n_ready:
+                self._frontier = frontier
+                self._sessionize(ready)
+                self._close_expired()
+                self.version += 1
+            return n_ready
+
+    def flush(self):
+        """Выпускает весь буфер (например, при остановке наблюдения)"""
+        with self._lock:
+            if self._pending is not None and len(self._pending):
+                ready, self._pending = self._pending, None
+                self._frontier = ready['Event_time'].to_numpy()[-1]
+                self._sessionize(ready)
+                self.version += 1
+
+    def features(self, include_open: bool = True) -> pd.DataFrame:
+        """Признаки сессий (из двух и более событий) в формате extract_session_features"""
+        with self._lock:
+            rows = list(self._closed)
+            if include_open and self._open is not None:
+                rows.append(self._open.features())
+        rows = [row for row in rows if row['total_signals'] >= 2]
+        return pd.DataFrame(rows, columns=FEATURE_COLUMNS)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'closed': len(self._closed),
+                'open': int(self._open is not None),
+                'pending_rows': 0 if self._pending is None else len(self._pending),
+                'late_dropped': self.late_dropped,
+                'version': self.version,
+            }
+
+    def _sessionize(self, batch: pd.DataFrame):
+        times = batch['Event_time'].to_numpy()
+        days = times.astype('datetime64[D]')
+
+        # Граница сессии: первая строка без открытой сессии, пауза > 2 ч или смена дня
+        new_session = np.empty(len(times), dtype=bool)
+        new_session[1:] = (times[1:] - times[:-1] > SESSION_GAP) | (days[1:] != days[:-1])
+        if self._open is None:
+            new_session[0] = True
+        else:
+            new_session[0] = (times[0] - self._last_time > SESSION_GAP) or \
+                (days[0] != self._last_time.astype('datetime64[D]'))
+        segment = np.cumsum(new_session)
+
+        parts, signals, discrete_signals = _segment_parts(batch, segment)
+        for seg, part in zip(parts.index, parts.itertuples()):
+            if seg > 0 or self._open is None:
+                self._close_open()
+                self._open = _Session(self._next_id)
+                self._next_id += 1
+            self._open.merge(part, signals.get(seg, {}), discrete_signals.get(seg, ()))
+        self._last_time = times[-1]
+
+    def _close_open(self):
+        # Закрытая сессия больше не меняется — храним только её готовую строку признаков
+        if self._open is not None:
+            self._closed.append(self._open.features())
+            self._open = None
+
+    def _close_expired(self):
+        # К открытой сессии больше ничего не присоединится, если граница ушла дальше паузы или в другой день
+        if self._open is None:
+            return
+        last_day = self._last_time.astype('datetime64[D]')
+        if self._frontier - self._last_time > SESSION_GAP or self._frontier.astype('datetime64[D]') != last_day:
+            self._close_open()
+
+
+def _segment_parts(batch: pd.DataFrame, segment: np.ndarray):
+    """Векторизованные агрегаты по участкам пакета (участок = кусок одной сессии)"""
+    value_type = batch['Value_type'].to_numpy()
+    is_discrete = value_type == DISCRETE_TYPE
+    is_analog = value_type == ANALOG_TYPE
+    analog_value = batch['Double'].where(is_analog).to_numpy()
+
+    frame = pd.DataFrame({
+        'segment': segment,
+        'time': batch['Event_time'].to_numpy(),
+        'is_discrete': is_discrete,
+        'is_analog': is_analog,
+        'text': batch['Text'].where(is_discrete).to_numpy(),
+        'abs': np.abs(analog_value),
+        'analog': analog_value,
+        'signal': batch['Signal'].to_numpy(),
+    })
+    parts = frame.groupby('segment', sort=True).agg(
+        count=('time', 'size'),
+        start=('time', 'min'),
+        end=('time', 'max'),
+        n_discrete=('is_discrete', 'sum'),
+        n_analog=('is_analog', 'sum'),
+        text_sum=('text', 'sum'),
+        text_n=('text', 'count'),
+        abs_sum=('abs', 'sum'),
+        abs_n=('abs', 'count'),
+        abs_max=('abs', 'max'),
+        analog_n=('analog', 'count'),
+        analog_mean=('analog', 'mean'),
+        analog_var=('analog', 'var'),
+    )
+    parts['analog_m2'] = (parts['analog_var'] * (parts['analog_n'] - 1)).fillna(0)
+    parts['analog_mean'] = parts['analog_mean'].fillna(0)
+
+    signals = {}
+    for (seg, signal), count in frame.groupby(['segment', 'signal']).size().items():
+        signals.setdefault(seg, {})[signal] = count
+    discrete_signals = {}
+    for seg, signal in frame[is_discrete].groupby(['segment', 'signal']).size().index:
+        discrete_signals.setdefault(seg, set()).add(signal)
+    return parts, signals, discrete_signals
+
+
+class SignalTail:
+    """Передаёт дописанные в выгрузку строки в SessionTracker.
+
+    Начальное состояние берётся из датасета DatasetRegistry (seed), поэтому файл
+    не разбирается второй раз, а изменения приходят от наблюдения реестра (follow).
+    Дописанное читается блоками не больше READ_BLOCK_BYTES.
+    """
+
+    def __init__(self, filepath: str, tracker: SessionTracker = None):
+        self.filepath = os.path.abspath(filepath)
+        self.tracker = tracker or SessionTracker()
+        # Сколько событий передано в tracker (начальный датасет и дочитанное)
+        self.rows = 0
+        self._offset = 0
+        self._header = None
+        self._lock = threading.Lock()
+
+    def seed(self, dataset) -> int:
+        """Сессии по уже загруженному датасету; чтение продолжится с конца его части файла"""
+        with self._lock:
+            with open(self.filepath, 'rb') as f:
+                header = f.readline()
+            if not header.endswith(b'\n'):
+                return 0
+
+            self.tracker.reset()
+            self.tracker.push(to_signal_frame(dataset.data))
+            self._header = header.decode('utf-8', errors='replace').rstrip('\r\n')
+            # dataset.size — ровно разобранный префикс из целых строк, дальше читает read_new
+            self._offset = max(dataset.size, len(header))
+            self.rows = len(dataset.data)
+            return self.rows
+
+    def read_new(self) -> int:
+        """Дочитывает завершённые строки после последней позиции; возвращает их количество"""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.filepath)
+            except FileNotFoundError:
+                return 0
+            if size < self._offset:
+                # Файл перезаписан или усечён — начинаем заново
+                self._offset = 0
+                self._header = None
+                self.rows = 0
+                self.tracker.reset()
+
+            # Блоки разбираются по отдельности (без строки на всё дописанное), а в tracker
+            # передаются одним пакетом, чтобы порядок событий между блоками не терялся
+            frames = []
+            with open(self.filepath, 'rb') as f:
+                while self._offset < size:
+                    f.seek(self._offset)
+                    data = f.read(min(size - self._offset, READ_BLOCK_BYTES))
+                    # Последняя строка может быть дописана не до конца — оставляем её до следующего раза
+                    cut = data.rfind(b'\n')
+                    if cut < 0:
+                        break
+                    self._offset += cut + 1
+                    frames.append(self._parse(data[:cut + 1].decode('utf-8', errors='replace')))
+            frames = [frame for frame in frames if frame is not None]
+            if not frames:
+                return 0
+            events = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+            self.tracker.push(events)
+            self.rows += len(events)
+            return len(events)
+
+    def _parse(self, text: str):
+        if self._header is None:
+            self._header, _, text = text.partition('\n')
+        if not text.strip():
+            return None
+        events = pd.read_csv(io.StringIO(self._header + '\n' + text), **READ_OPTIONS)
+        return coerce_signal_frame(events)
+
+    async def follow(self, registry):
+        """Стартовая задача: датасет из registry как начальное состояние, дальше — изменения
+        файла от наблюдения registry (своего awatch нет)"""
+        try:
+            dataset = await asyncio.to_thread(registry.get, self.filepath)
+            await asyncio.to_thread(self.seed, dataset)
+        except Exception as e:
+            print(f"✗ Не удалось загрузить {self.filepath} для живых сессий: {e}")
+        registry.subscribe(self.filepath, self.read_new)
+        # Строки, дописанные между загрузкой и подпиской
+        await asyncio.to_thread(self.read_new)
@@ -0,0 +1,170 @@
+# core/signal_cache.py
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .signal_stream import complete_size
+
+CACHE_VERSION = 1
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def content_hash(filepath: str, size: int = None) -> str:
+    """Хэш содержимого файла или его первых size байт (blake2b, читается блоками)"""
+    digest = hashlib.blake2b(digest_size=16)
+    left = os.path.getsize(filepath) if size is None else size
+    with open(filepath, 'rb') as f:
+        while left > 0:
+            block = f.read(min(HASH_BLOCK_SIZE, left))
+            if not block:
+                break
+            digest.update(block)
+            left -= len(block)
+    return digest.hexdigest()
+
+
+def file_key(filepath: str) -> dict:
+    """Ключ кэша без хэша: путь, размер префикса из целых строк и mtime"""
+    st = os.stat(filepath)
+    return {
+        'path': os.path.abspath(filepath),
+        'size': complete_size(filepath, st.st_size),
+        'mtime_ns': st.st_mtime_ns,
+    }
+
+
+class SignalCache:
+    """Колоночный кэш распарсенной выгрузки: по одному .npy на колонку рядом с исходным файлом.
+
+    Кэш хранит уже типизированные и отсортированные колонки, поэтому загрузка
+    сводится к np.load(mmap_mode='r') без повторного парсинга CSV. Кэшируется префикс
+    файла из целых строк: после load() в self.size — его длина в байтах (дописанное
+    после неё в данные не вошло), в self.version — его хэш (версия датасета). variant разделяет
+    кэши разных представлений одного файла (например, 'compact').
+    """
+
+    def __init__(self, filepath: str, variant: str = None):
+        self.filepath = filepath
+        directory, name = os.path.split(os.path.abspath(filepath))
+        self.directory = directory
+        suffix = f'.{variant}' if variant else ''
+        self.cache_dir = os.path.join(directory, f'.{name}{suffix}.cache')
+        self.manifest_path = os.path.join(self.cache_dir, 'manifest.json')
+        self.version = None
+        self.size = None
+
+    def load(self, parse) -> pd.DataFrame:
+        """Читает кэш, если выгрузка не менялась, иначе вызывает parse(filepath, size) и пересобирает кэш"""
+        key = file_key(self.filepath)
+        manifest = self._read_manifest()
+
+        if manifest is not None and self._is_fresh(manifest, key):
+            df = self._read_columns(manifest)
+            self.version = manifest['key']['hash']
+            self.size = key['size']
+            print(f"✓ Кэш {self.cache_dir} актуален, парсинг пропущен")
+            return df
+
+        # Хэш и разбор — по одному и тому же префиксу: строки, дописанные тем временем, не войдут ни в один
+        key['hash'] = content_hash(self.filepath, key['size'])
+        df = parse(self.filepath, key['size'])
+        self.version = key['hash']
+        self.size = key['size']
+        try:
+            self.save(df, key)
+        except OSError as e:
+            print(f"✗ Не удалось записать кэш {self.cache_dir}: {e}")
+        return df
+
+    def invalidate(self):
+        """Удаляет кэш"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def save(self, df: pd.DataFrame, key: dict):
+        """Записывает колонки во временную папку и атомарно подменяет ею старый кэш"""
+        tmp_dir = tempfile.mkdtemp(prefix='.signal_cache_', dir=self.directory)
+        try:
+            columns = []
+            for i, name in enumerate(df.columns):
+                columns.append(_write_column(tmp_dir, i, name, df[name]))
+
+            manifest = {
+                'version': CACHE_VERSION,
+                'key': key,
+                'rows': len(df),
+                'columns': columns,
+            }
+            with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+
+            self.invalidate()
+            os.replace(tmp_dir, self.cache_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _is_fresh(self, manifest: dict, key: dict) -> bool:
+        cached = manifest.get('key', {})
+        if manifest.get('version') != CACHE_VERSION or cached.get('path') != key['path']:
+            return False
+        if cached.get('size') != key['size']:
+            return False
+        if cached.get('mtime_ns') == key['mtime_ns']:
+            return True
+
+        # mtime поменялся (например, файл перезаписан тем же содержимым) — сверяем хэш
+        if cached.get('hash') != content_hash(self.filepath, key['size']):
+            return False
+        cached['mtime_ns'] = key['mtime_ns']
+        try:
+            with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+        except OSError:
+            pass
+        return True
+
+    def _read_columns(self, manifest: dict) -> pd.DataFrame:
+        # np.load не умеет mmap для пустого файла данных
+        mmap_mode = 'r' if manifest['rows'] > 0 else None
+        data = {}
+        for column in manifest['columns']:
+            values = np.load(os.path.join(self.cache_dir, column['file']), mmap_mode=mmap_mode)
+            if column['kind'] == 'category':
+                categories = np.load(os.path.join(self.cache_dir, column['categories']), allow_pickle=False)
+                values = pd.Categorical.from_codes(values, categories=categories)
+            data[column['name']] = values
+        return pd.DataFrame(data, copy=False)
+
+
+def _write_column(directory: str, index: int, name: str, series: pd.Series) -> dict:
+    """Сохраняет одну колонку; строки кодируются словарём (коды + категории)"""
+    filename = f'col_{index}.npy'
+    column = {'name': name, 'file': filename}
+
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        column['kind'] = 'datetime'
+        values = series.to_numpy(dtype='datetime64[ns]')
+    elif pd.api.types.is_numeric_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype):
+        column['kind'] = 'numeric'
+        values = series.to_numpy()
+    else:
+        column['kind'] = 'category'
+        codes, categories = pd.factorize(series.astype(str).where(series.notna()), use_na_sentinel=True)
+        values = codes.astype(np.min_scalar_type(-max(len(categories), 1)))
+        column['categories'] = f'col_{index}_categories.npy'
+        np.save(os.path.join(directory, column['categories']), np.asarray(categories, dtype=str))
+
+    np.save(os.path.join(directory, filename), values, allow_pickle=False)
+    return column
@@ -0,0 +1,204 @@
+# core/signal_stream.py
+import io
+import os
+import tempfile
+
+import pandas as pd
+
+READ_OPTIONS = {'sep': ';', 'encoding': 'utf-8', 'on_bad_lines': 'skip'}
+COLUMNS_MAPPING = {
+    'Event time': 'Event_time',
+    'Value type': 'Value_type',
+}
+NUMERIC_COLUMNS = ['Value_type', 'Text', 'Double']
+
+# Во сколько раз рабочий набор больше одного сырого чанка (сам чанк + приведённая копия + потребитель)
+WORKING_SET_FACTOR = 3
+MIN_CHUNK_ROWS = 1000
+# Сколько прогонов сливается за один проход внешней сортировки
+MERGE_FAN_IN = 16
+# Каким блоком complete_size ищет последний перевод строки с конца файла
+TAIL_BLOCK_BYTES = 64 << 10
+
+
+def coerce_signal_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Приводит сырой фрейм выгрузки к типам: Event_time -> datetime, числовые колонки -> float/int"""
+    # Очищаем названия колонок от пробелов и переименовываем для удобства
+    df.columns = df.columns.str.strip()
+    df = df.rename(columns=COLUMNS_MAPPING)
+
+    df['Event_time'] = pd.to_datetime(df['Event_time'], format='%d.%m.%Y %H:%M', errors='coerce')
+    for column in NUMERIC_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+
+    # Удаляем строки с NaT в Event_time
+    return df.dropna(subset=['Event_time'])
+
+
+def complete_size(filepath: str, size: int = None) -> int:
+    """Длина префикса файла из целых строк: до последнего перевода строки в первых size байтах"""
+    if size is None:
+        size = os.path.getsize(filepath)
+    with open(filepath, 'rb') as f:
+        end = size
+        while end > 0:
+            start = max(end - TAIL_BLOCK_BYTES, 0)
+            f.seek(start)
+            cut = f.read(end - start).rfind(b'\n')
+            if cut >= 0:
+                return start + cut + 1
+            end = start
+    return 0
+
+
+class _Prefix(io.RawIOBase):
+    """Файл, который читается только до заданного байта"""
+
+    def __init__(self, filepath: str, size: int):
+        self._file = open(filepath, 'rb')
+        self._left = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = self._file.readinto(memoryview(buffer)[:min(len(buffer), self._left)]) if self._left > 0 else 0
+        self._left -= n
+        return n
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def parse_signal_file(filepath: str, size: int = None) -> pd.DataFrame:
+    """Разбор выгрузки: типизированный DataFrame, отсортированный по времени.
+
+    size — сколько первых байт разбирать (например, complete_size, чтобы строки,
+    дописанные во время разбора, не попали в результат); None — весь файл.
+    """
+    if size is None:
+        df = pd.read_csv(filepath, **READ_OPTIONS)
+    else:
+        with io.BufferedReader(_Prefix(filepath, size)) as f:
+            df = pd.read_csv(f, **READ_OPTIONS)
+    df = coerce_signal_frame(df)
+    return df.sort_values('Event_time').reset_index(drop=True)
+
+
+def estimate_chunk_rows(filepath: str, memory_budget_mb: float, sample_rows: int = 1000) -> int:
+    """Подбирает размер чанка в строках под бюджет памяти по выборке из начала файла"""
+    sample = pd.read_csv(filepath, nrows=sample_rows, **READ_OPTIONS)
+    row_bytes = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+    rows = int(memory_budget_mb * 1024 * 1024 / (max(row_bytes, 1) * WORKING_SET_FACTOR))
+    return max(rows, MIN_CHUNK_ROWS)
+
+
+def is_time_ordered(filepath: str, chunk_rows: int) -> bool:
+    """Проверяет, что выгрузка уже упорядочена по времени (читается только колонка времени)"""
+    header = pd.read_csv(filepath, nrows=0, **READ_OPTIONS).columns
+    time_column = next((c for c in header if c.strip() in ('Event time', 'Event_time')), None)
+    if time_column is None:
+        raise ValueError(f'В файле {filepath} нет колонки Event time')
+
+    last = None
+    reader = pd.read_csv(filepath, usecols=[time_column], chunksize=chunk_rows, **READ_OPTIONS)
+    for chunk in reader:
+        times = pd.to_datetime(chunk[time_column], format='%d.%m.%Y %H:%M', errors='coerce').dropna()
+        if times.empty:
+            continue
+        if not times.is_monotonic_increasing or (last is not None and times.iloc[0] < last):
+            return False
+        last = times.iloc[-1]
+    return True
+
+
+def iter_signal_chunks(filepath: str, memory_budget_mb: float = 256, chunk_rows: int = None,
+                       ordered: bool = None, spill_dir: str = None):
+    """Генератор типизированных чанков выгрузки, упорядоченных по Event_time.
+
+    Пиковая память ограничена memory_budget_mb (или явным chunk_rows). Если файл не
+    упорядочен по времени (ordered=None — проверяется заранее), чанки сортируются,
+    сбрасываются на диск и сливаются внешней k-путевой сортировкой.
+    """
+    if chunk_rows is None:
+        chunk_rows = estimate_chunk_rows(filepath, memory_budget_mb)
+    if ordered is None:
+        ordered = is_time_ordered(filepath, chunk_rows)
+
+    reader = pd.read_csv(filepath, chunksize=chunk_rows, **READ_OPTIONS)
+    if ordered:
+        for chunk in reader:
+            chunk = coerce_signal_frame(chunk)
+            if len(chunk):
+                yield chunk
+        return
+
+    with tempfile.TemporaryDirectory(prefix='signal_runs_', dir=spill_dir) as tmp_dir:
+        spill = _RunWriter(tmp_dir, max(chunk_rows // (MERGE_FAN_IN + 1), 1))
+
+        # Первый проход: каждый чанк сортируется и сбрасывается на диск отдельным прогоном
+        runs = []
+        for chunk in reader:
+            chunk = coerce_signal_frame(chunk)
+            if len(chunk):
+                runs.append(spill.write([chunk.sort_values('Event_time', kind='stable')]))
+
+        # Если прогонов больше, чем можно слить за раз, сливаем их группами в более длинные
+        while len(runs) > MERGE_FAN_IN:
+            runs = [spill.write(_merge_runs(runs[i:i + MERGE_FAN_IN]))
+                    for i in range(0, len(runs), MERGE_FAN_IN)]
+
+        yield from _merge_runs(runs)
+
+
+class _RunWriter:
+    """Пишет отсортированный прогон на диск блоками фиксированного размера"""
+
+    def __init__(self, directory: str, block_rows: int):
+        self.directory = directory
+        self.block_rows = block_rows
+        self.counter = 0
+
+    def write(self, frames) -> list:
+        blocks = []
+        for frame in frames:
+            for start in range(0, len(frame), self.block_rows):
+                path = os.path.join(self.directory, f'block_{self.counter}.pkl')
+                self.counter += 1
+                frame.iloc[start:start + self.block_rows].to_pickle(path)
+                blocks.append(path)
+        return blocks
+
+
+def _merge_runs(runs: list):
+    """Пакетное k-путевое слияние прогонов: за шаг выдаются все строки не позже
+    минимального «последнего» времени среди текущих блоков."""
+    pending = [list(reversed(run)) for run in runs]
+    heads = {}
+    for i in range(len(pending)):
+        _load_next_block(heads, pending, i)
+
+    while heads:
+        bound = min(block['Event_time'].iloc[-1] for block in heads.values())
+        parts = []
+        for i in list(heads):
+            block = heads[i]
+            n = block['Event_time'].searchsorted(bound, side='right')
+            parts.append(block.iloc[:n])
+            if n < len(block):
+                heads[i] = block.iloc[n:]
+            else:
+                del heads[i]
+                _load_next_block(heads, pending, i)
+
+        merged = pd.concat(parts).sort_values('Event_time', kind='stable')
+        if len(merged):
+            yield merged
+
+
+def _load_next_block(heads: dict, pending: list, i: int):
+    if pending[i]:
+        path = pending[i].pop()
+        heads[i] = pd.read_pickle(path)
+        os.remove(path)
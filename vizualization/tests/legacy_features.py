@@ -0,0 +1,83 @@
+# tests/legacy_features.py
+"""Эталон для сверки признаков сессий: прежняя реализация на цикле по groupby и синтетические события.
+
+Используется тестами и benchmarks/bench_session_features.py.
+"""
+import numpy as np
+import pandas as pd
+
+from core.features import FEATURE_COLUMNS
+
+SIGNALS = np.array(['A270', 'A268', 'A269', 'A257', 'A258', 'A272', 'A273', 'A274', 'A275'], dtype=object)
+
+
+def make_events(n_events: int, seed: int = 42) -> pd.DataFrame:
+    """Синтетические события: сессии по ~100 событий с паузами больше 2 часов между ними"""
+    rng = np.random.default_rng(seed)
+    session = np.sort(rng.integers(0, max(n_events // 100, 1), n_events))
+    start = np.datetime64('2025-10-01T06:00') + (session * 300).astype('timedelta64[m]')
+    offset = rng.integers(0, 90, n_events).astype('timedelta64[m]')
+    times = np.sort(start + offset)
+
+    value_type = np.where(rng.random(n_events) < 0.7, 11, 17)
+    discrete = value_type == 11
+    return pd.DataFrame({
+        'Signal': SIGNALS[rng.integers(0, len(SIGNALS), n_events)],
+        'Event_time': pd.to_datetime(times),
+        'Value_type': value_type,
+        'Text': np.where(discrete, rng.integers(0, 2, n_events), np.nan),
+        'Double': np.where(discrete, np.nan, rng.uniform(-600, 600, n_events)),
+    })
+
+
+def legacy_extract_features(df):
+    """Прежний DataProcessor.extract_features из app2.py (эталон для сверки)"""
+    df['date'] = df['Event_time'].dt.date
+    df['hour'] = df['Event_time'].dt.hour
+    df['session_id'] = df.groupby(['date', ((df['Event_time'].diff().dt.total_seconds() / 3600) > 2).cumsum()]).ngroup()
+
+    sessions = []
+    for session_id, session_data in df.groupby('session_id'):
+        if len(session_data) < 2:
+            continue
+
+        duration = (session_data['Event_time'].max() - session_data['Event_time'].min()).total_seconds() / 60 + 1
+        total_signals = len(session_data)
+        signals_per_min = total_signals / duration if duration > 0 else 0
+
+        discrete = session_data[session_data['Value_type'] == 11]
+        analog = session_data[session_data['Value_type'] == 17]
+
+        sessions.append({
+            'session_id': session_id,
+            'date': session_data['date'].iloc[0],
+            'duration_min': duration,
+            'total_signals': total_signals,
+            'signals_per_min': signals_per_min,
+            'discrete_ratio': len(discrete) / total_signals if total_signals > 0 else 0,
+            'analog_ratio': len(analog) / total_signals if total_signals > 0 else 0,
+            'avg_discrete_active': discrete['Text'].mean() if len(discrete) > 0 else 0,
+            'unique_discrete': discrete['Signal'].nunique() if len(discrete) > 0 else 0,
+            'avg_analog_abs': analog['Double'].abs().mean() if len(analog) > 0 else 0,
+            'max_analog': analog['Double'].abs().max() if len(analog) > 0 else 0,
+            'std_analog': analog['Double'].std() if len(analog) > 1 else 0,
+            'total_unique_signals': session_data['Signal'].nunique(),
+            'rare_signal_ratio': len(session_data[session_data['Signal'].isin(
+                session_data['Signal'].value_counts()[session_data['Signal'].value_counts() == 1].index
+            )]) / total_signals if total_signals > 0 else 0,
+        })
+
+    return pd.DataFrame(sessions)
+
+
+def check_parity(expected: pd.DataFrame, actual: pd.DataFrame):
+    """Сверяет результат с эталоном: те же сессии, колонки и значения (с точностью до float)"""
+    assert list(actual.columns) == FEATURE_COLUMNS, list(actual.columns)
+    assert len(expected) == len(actual), (len(expected), len(actual))
+    for column in FEATURE_COLUMNS:
+        left, right = expected[column].to_numpy(), actual[column].to_numpy()
+        if column == 'date':
+            assert (left == right).all(), column
+        else:
+            np.testing.assert_allclose(left.astype(float), right.astype(float), rtol=1e-9, atol=1e-9,
+                                       equal_nan=True, err_msg=column)
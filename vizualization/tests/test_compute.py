@@ -0,0 +1,59 @@
+# tests/test_compute.py
+"""Очередь расчётов: отключение клиента прерывает запущенную задачу с cancel_event.
+
+Запуск из папки vizualization:
+    python -m pytest tests
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.compute import ComputeCancelled, ComputePool, raise_if_cancelled
+
+
+class Client:
+    """Минимальный клиент NiceGUI для ComputePool: id и подписка на удаление"""
+
+    def __init__(self, client_id: str):
+        self.id = client_id
+
+    def on_delete(self, handler):
+        pass
+
+
+def chunked(n_chunks: int, started: threading.Event, cancel_event=None):
+    """Длинный расчёт по чанкам с точкой отмены перед каждым"""
+    started.set()
+    for _ in range(n_chunks):
+        raise_if_cancelled(cancel_event)
+        time.sleep(0.01)
+    return n_chunks
+
+
+def test_cancelled_client_frees_running_slot():
+    async def scenario():
+        pool = ComputePool(max_running=1)
+        started = threading.Event()
+        gone = asyncio.create_task(pool.run(chunked, 1000, started, client=Client('gone'), cancellable=True))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+
+        began = time.monotonic()
+        await pool.cancel_client('gone')
+        with pytest.raises(ComputeCancelled):
+            await gone
+        # Место освободилось сразу, а не через 1000 чанков
+        result = await pool.run(chunked, 3, threading.Event(), client=Client('next'), cancellable=True)
+        return result, time.monotonic() - began, pool.stats()
+
+    result, elapsed, stats = asyncio.run(scenario())
+    assert result == 3
+    assert elapsed < 2
+    assert stats['cancelled'] == 1 and stats['completed'] == 1
+
+
+def test_cancellable_rejects_process():
+    with pytest.raises(ValueError):
+        asyncio.run(ComputePool().run(chunked, 1, threading.Event(), process=True, cancellable=True))
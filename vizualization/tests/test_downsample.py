@@ -0,0 +1,42 @@
+# tests/test_downsample.py
+"""Прореживание графиков: бюджет точек следует за шириной, зум догружает точки.
+
+Запуск из папки vizualization:
+    python -m pytest tests
+"""
+import numpy as np
+import plotly.graph_objects as go
+
+from core.downsample import DownsampledFigure, point_budget
+
+
+def make_figure(n: int = 50_000) -> go.Figure:
+    x = np.arange(n, dtype=float)
+    return go.Figure(go.Scatter(x=x, y=np.sin(x / 500) + np.random.default_rng(0).normal(0, 0.1, n), mode='lines'))
+
+
+def test_resize_recomputes_budget():
+    downsampled = DownsampledFigure(make_figure(), 1200)
+    wide = len(downsampled.fig.data[0].x)
+
+    assert downsampled.resize(400)
+    assert downsampled.budget == point_budget(400)
+    assert len(downsampled.fig.data[0].x) < wide
+    # Мелкие изменения ширины округляются и ряды не пересчитывают
+    assert not downsampled.resize(420)
+
+
+def test_resize_keeps_zoom_window():
+    downsampled = DownsampledFigure(make_figure(), 1200)
+    assert downsampled.relayout({'xaxis.range': [1000, 2000]})
+    downsampled.resize(600)
+    x = np.asarray(downsampled.fig.data[0].x, dtype=float)
+    # Окно плюс по соседней точке с краёв, чтобы линия не обрывалась у границы
+    assert x.min() == 999 and x.max() == 2001
+
+
+def test_relayout_range_forms():
+    downsampled = DownsampledFigure(make_figure(), 1200)
+    assert downsampled.relayout({'xaxis.range[0]': 100, 'xaxis.range[1]': 300})
+    assert len(downsampled.fig.data[0].x) == 203
+    assert not downsampled.relayout({'yaxis.range': [0, 1]})
@@ -0,0 +1,42 @@
+# tests/test_session_features.py
+"""Векторизованные признаки сессий совпадают с прежней реализацией (tests/legacy_features.py).
+
+Запуск из папки vizualization:
+    python -m pytest tests
+"""
+import os
+import shutil
+
+import pytest
+
+from core.events import to_compact
+from core.features import extract_session_features, session_ids
+from core.signal_cache import SignalCache
+from core.signal_stream import parse_signal_file
+from tests.legacy_features import check_parity, legacy_extract_features, make_events
+
+SIGNALS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'signals.csv')
+
+
+def test_synthetic_events():
+    events = make_events(10_000)
+    features = extract_session_features(events, session_ids(events['Event_time']))
+    check_parity(legacy_extract_features(events.copy()), features)
+
+
+@pytest.mark.parametrize('representation', ['raw', 'compact', 'cached'])
+def test_signals_export(representation, tmp_path):
+    if not os.path.exists(SIGNALS_PATH):
+        pytest.skip('signals.csv не найден')
+    raw = parse_signal_file(SIGNALS_PATH)
+    if representation == 'raw':
+        data = raw
+    elif representation == 'compact':
+        data = to_compact(raw)
+    else:
+        # Колонки из mmap-кэша, как их отдаёт DatasetRegistry в app2.py
+        filepath = shutil.copy(SIGNALS_PATH, tmp_path)
+        SignalCache(filepath, variant='compact').load(lambda path, size: to_compact(parse_signal_file(path, size)))
+        data = SignalCache(filepath, variant='compact').load(pytest.fail)
+
+    check_parity(legacy_extract_features(raw.copy()), extract_session_features(data))
@@ -0,0 +1,116 @@
+# tests/test_session_tail.py
+"""Инкрементальные сессии (SessionTracker, SignalTail) совпадают с пакетным extract_session_features.
+
+Запуск из папки vizualization:
+    python -m pytest tests
+"""
+import asyncio
+import os
+
+import pandas as pd
+import pytest
+
+from core.dataset_registry import DatasetRegistry
+from core.features import extract_session_features, session_ids
+from core.session_tail import SessionTracker, SignalTail
+from core.signal_cache import SignalCache
+from core.signal_stream import parse_signal_file
+from tests.legacy_features import check_parity, make_events
+
+SIGNALS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'signals.csv')
+
+
+def load(path: str):
+    """Загрузчик для DatasetRegistry, как DataLoader.load_dataset в app2.py (без компактного вида)"""
+    cache = SignalCache(path)
+    df = cache.load(parse_signal_file)
+    return df, cache.version, cache.size
+
+
+def export_lines():
+    """Заголовок и строки signals.csv, упорядоченные по времени (в файле два неупорядоченных блока)"""
+    if not os.path.exists(SIGNALS_PATH):
+        pytest.skip('signals.csv не найден')
+    with open(SIGNALS_PATH, encoding='utf-8') as f:
+        header, *rows = f.read().splitlines()
+    # Строки с временем не в формате выгрузки разбор отбрасывает — они уходят в конец
+    times = pd.to_datetime(pd.Series([row.split(';')[3] for row in rows]), format='%d.%m.%Y %H:%M', errors='coerce')
+    return header, [rows[i] for i in times.sort_values(kind='stable').index]
+
+
+def write_lines(path, lines, mode='w'):
+    with open(path, mode, encoding='utf-8') as f:
+        f.write(''.join(f'{line}\n' for line in lines))
+
+
+@pytest.mark.parametrize('chunk_rows', [97, 1000, 5000])
+def test_tracker_chunks_match_batch(chunk_rows):
+    events = make_events(5000)
+    tracker = SessionTracker()
+    for start in range(0, len(events), chunk_rows):
+        tracker.push(events.iloc[start:start + chunk_rows])
+    tracker.flush()
+
+    expected = extract_session_features(events, session_ids(events['Event_time']))
+    check_parity(expected.reset_index(drop=True), tracker.features())
+
+
+def test_tail_continues_after_seed(tmp_path):
+    header, rows = export_lines()
+    path = tmp_path / 'signals.csv'
+    split = len(rows) // 2
+    # Последняя строка дописана не до конца: в датасет она не входит и дочитывается хвостом
+    write_lines(path, [header, *rows[:split]])
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(rows[split][:20])
+
+    dataset = DatasetRegistry(load).get(str(path))
+    assert len(dataset.data) == split
+    assert dataset.size == len(''.join(f'{line}\n' for line in [header, *rows[:split]]).encode())
+
+    tail = SignalTail(str(path))
+    tail.seed(dataset)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(rows[split][20:] + '\n')
+    write_lines(path, rows[split + 1:], mode='a')
+    tail.read_new()
+    tail.tracker.flush()
+
+    # Каждая строка учтена ровно один раз: либо в датасете, либо хвостом
+    full = parse_signal_file(str(path))
+    assert tail.rows == len(full)
+    expected = extract_session_features(full, session_ids(full['Event_time']))
+    check_parity(expected.reset_index(drop=True), tail.tracker.features())
+
+
+def test_append_goes_to_subscribers_without_reload(tmp_path):
+    header, rows = export_lines()
+    path = str(tmp_path / 'signals.csv')
+    write_lines(path, [header, *rows[:1000]])
+    loads = []
+
+    def counting_load(filepath):
+        loads.append(filepath)
+        return load(filepath)
+
+    async def scenario():
+        registry = DatasetRegistry(counting_load, append_reload_interval=1.0)
+        watcher = asyncio.create_task(registry.watch())
+        tail = SignalTail(path)
+        await tail.follow(registry)
+        await asyncio.sleep(0.5)
+
+        write_lines(path, rows[1000:1100], mode='a')
+        await asyncio.sleep(0.8)
+        appended = (len(loads), tail.rows)
+
+        await asyncio.sleep(1.5)
+        watcher.cancel()
+        return appended, len(loads), len(registry.get(path).data)
+
+    (loads_after_append, tracked), loads_total, rows_total = asyncio.run(scenario())
+    # Дописанное сразу у подписчика, полная перезагрузка — одна, после append_reload_interval
+    assert loads_after_append == 1
+    assert tracked == 1100
+    assert loads_total == 2
+    assert rows_total == 1100
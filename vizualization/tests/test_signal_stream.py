@@ -0,0 +1,55 @@
+# tests/test_signal_stream.py
+"""Потоковое чтение выгрузки (iter_signal_chunks): внешняя сортировка неупорядоченного файла.
+
+Запуск из папки vizualization:
+    python -m pytest tests
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import signal_stream
+from core.signal_stream import is_time_ordered, iter_signal_chunks, parse_signal_file
+
+SIGNALS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'signals.csv')
+
+
+@pytest.fixture
+def shuffled(tmp_path):
+    """signals.csv со строками в случайном порядке"""
+    if not os.path.exists(SIGNALS_PATH):
+        pytest.skip('signals.csv не найден')
+    with open(SIGNALS_PATH, encoding='utf-8') as f:
+        header, *rows = f.read().splitlines()
+    order = np.random.default_rng(0).permutation(len(rows))
+    path = tmp_path / 'shuffled.csv'
+    path.write_text('\n'.join([header, *(rows[i] for i in order)]) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def sorted_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Строки в однозначном порядке: у событий одной минуты порядок внутри минуты не задан"""
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def test_external_merge_sorts_shuffled_file(shuffled, monkeypatch):
+    # Малый fan-in, чтобы прогоны сливались в несколько проходов
+    monkeypatch.setattr(signal_stream, 'MERGE_FAN_IN', 4)
+    assert not is_time_ordered(shuffled, 500)
+
+    chunks = list(iter_signal_chunks(shuffled, chunk_rows=250))
+    assert len(chunks) > 1
+    merged = pd.concat(chunks, ignore_index=True)
+    assert merged['Event_time'].is_monotonic_increasing
+
+    expected = parse_signal_file(shuffled)
+    pd.testing.assert_frame_equal(sorted_rows(merged), sorted_rows(expected))
+
+
+def test_missing_time_column_names_file(tmp_path):
+    path = tmp_path / 'no_time.csv'
+    path.write_text('#;Signal\n1;A268\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='no_time.csv'):
+        is_time_ordered(str(path), 1000)
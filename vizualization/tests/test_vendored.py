@@ -0,0 +1,32 @@
+# tests/test_vendored.py
+"""Копии общих модулей в ver_* совпадают с оригиналом (отличается только первая строка-заголовок).
+
+ver_1 и ver_3 запускаются из своих папок app, где core — свой пакет (или его нет),
+поэтому общие модули не импортируются оттуда, а копируются целиком.
+
+Запуск из папки vizualization:
+    python -m pytest tests
+"""
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# копия -> оригинал; после правки оригинала копию обновляют целиком, сохранив её заголовок
+VENDORED = {
+    'ver_1/app/core/compute.py': 'core/compute.py',
+    'ver_1/app/core/lazy_tabs.py': 'core/lazy_tabs.py',
+    'ver_1/app/core/model_registry.py': 'core/model_registry.py',
+    'ver_3/app/charts/downsample.py': 'core/downsample.py',
+}
+
+
+def body(path: str) -> str:
+    with open(os.path.join(ROOT, path), encoding='utf-8') as f:
+        return f.read().split('\n', 1)[1]
+
+
+@pytest.mark.parametrize('copy, source', VENDORED.items())
+def test_copy_matches_source(copy, source):
+    assert body(copy) == body(source), f'{copy} разошёлся с {source}: скопируйте {source} заново'
@@ -1,21 +1,211 @@
 # app/core/clustering.py
+import hashlib
+
+import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
+from numpy.lib.format import open_memmap
 from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import davies_bouldin_score, silhouette_score
+from sklearn.pipeline import make_pipeline
 
-def clusterize_errors(df: pd.DataFrame, n_clusters: int = 3):
-    """Простая кластеризация ошибок по параметру value."""
-    # Код ошибки можно закодировать численно
-    df_encoded = pd.get_dummies(df, columns=["error_code"])
+from .compute import raise_if_cancelled
+from .data_loader import directory_manifest, iter_error_data
+from .model_registry import model_registry
+
+# Модели хранятся рядом с выгрузками (корень по умолчанию в общем model_registry — "models")
+MODELS_DIR = "app/data/models"
+model_registry.root = MODELS_DIR
+
+ERROR_MODEL = "error_kmeans"
+STREAMING_ERROR_MODEL = "error_minibatch_kmeans"
+# Подбор числа кластеров — тот же контракт, что у core/clustering.py в vizualization
+FALLBACK_CLUSTERS = 2
+K_RANGE = range(2, 9)
+# Сколько строк берётся для оценки одного k — стоимость подбора не растёт с размером выгрузки
+SELECTION_SAMPLE = 2000
+
+
+def encode_errors(df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
+    """Матрица признаков: parameter_value + one-hot кодов ошибок (по схеме columns, если задана)."""
+    dummies = pd.get_dummies(df["error_code"], prefix="error_code", dtype=float)
+    X = pd.concat([df[["parameter_value"]].astype(float), dummies], axis=1)
+    if columns is not None:
+        X = X.reindex(columns=columns, fill_value=0.0)
+    return X
+
+
+def build_error_pipeline(n_clusters: int = 3, random_state: int = 42):
+    """Конвейер кластеризации ошибок: масштабирование + KMeans."""
+    return make_pipeline(StandardScaler(), KMeans(n_clusters=n_clusters, random_state=random_state))
+
+
+def _score_k(X: np.ndarray, k: int, random_state: int) -> dict:
+    model = KMeans(n_clusters=k, random_state=random_state).fit(X)
+    return {
+        "k": k,
+        "inertia": float(model.inertia_),
+        "silhouette": float(silhouette_score(X, model.labels_)),
+        "davies_bouldin": float(davies_bouldin_score(X, model.labels_)),
+    }
+
+
+def select_n_clusters(X_scaled: np.ndarray, k_range=K_RANGE, sample_size: int = SELECTION_SAMPLE,
+                      n_jobs: int = -1, random_state: int = 42, cancel_event=None):
+    """Подбирает число кластеров: k оцениваются параллельно (joblib) на выборке из sample_size строк.
+
+    Лучшее k — максимальный silhouette (при равенстве — меньший Davies–Bouldin).
+    Возвращает (k, таблица оценок). Если строк слишком мало для оценки, возвращается
+    FALLBACK_CLUSTERS (или число строк) и пустая таблица. cancel_event (core.compute)
+    проверяется после каждой оценки — оставшиеся k при отмене не считаются.
+    """
+    X_scaled = np.asarray(X_scaled)
+    if len(X_scaled) > sample_size:
+        rng = np.random.default_rng(random_state)
+        X_scaled = X_scaled[rng.choice(len(X_scaled), sample_size, replace=False)]
+
+    # silhouette определён только для 2 <= k <= n - 1
+    candidates = [k for k in k_range if 2 <= k < len(X_scaled)]
+    if not candidates:
+        return min(FALLBACK_CLUSTERS, len(X_scaled)), pd.DataFrame(columns=["k", "inertia", "silhouette", "davies_bouldin"])
 
-    X = df_encoded[["parameter_value"] + [c for c in df_encoded.columns if "error_code_" in c]]
-    X_scaled = StandardScaler().fit_transform(X)
+    results = Parallel(n_jobs=min(n_jobs, len(candidates)) if n_jobs > 0 else n_jobs, return_as="generator")(
+        delayed(_score_k)(X_scaled, k, random_state) for k in candidates
+    )
+    scores = []
+    for score in results:
+        raise_if_cancelled(cancel_event)
+        scores.append(score)
+    scores = pd.DataFrame(scores)
+    best = scores.sort_values(["silhouette", "davies_bouldin"], ascending=[False, True]).iloc[0]
+    return int(best["k"]), scores
 
-    model = KMeans(n_clusters=n_clusters, random_state=42)
-    df["cluster"] = model.fit_predict(X_scaled)
+
+def clusterize_errors(df: pd.DataFrame, n_clusters=3, refit: bool = False, cancel_event=None):
+    """Простая кластеризация ошибок по параметру value.
+
+    Обученная модель берётся из model_registry; новая версия обучается только
+    по refit=True, при новых кодах ошибок или дрейфе данных. n_clusters="auto" —
+    число кластеров подбирается select_n_clusters, выбранное k и оценки
+    сохраняются в metrics записи модели (n_clusters и k_selection); cancel_event
+    прерывает подбор.
+    """
+    # Код ошибки можно закодировать численно
+    X = encode_errors(df)
+    params = {"n_clusters": n_clusters}
+    if n_clusters != "auto":
+        pipeline, record = model_registry.get_or_fit(ERROR_MODEL, X, build_error_pipeline, params, refit=refit)
+    else:
+        with model_registry.fitting(ERROR_MODEL):
+            current = None if refit else model_registry.latest(ERROR_MODEL)
+            if current is not None and model_registry.is_usable(current[1], X, params):
+                pipeline, record = current
+            else:
+                best_k, scores = select_n_clusters(StandardScaler().fit_transform(X), cancel_event=cancel_event)
+                pipeline, record = model_registry.fit(
+                    ERROR_MODEL, X,
+                    lambda **_: build_error_pipeline(n_clusters=best_k),
+                    params,
+                    metrics={"n_clusters": best_k, "k_selection": scores.to_dict("records")},
+                )
+                print(f"🔹 Выбрано число кластеров: {best_k}")
+    df["cluster"] = pipeline.predict(X[record.feature_columns])
 
     cluster_stats = df.groupby("cluster")["parameter_value"].agg(["count", "mean", "std"]).reset_index()
 
     print("🔹 Кластеры сформированы:")
     print(cluster_stats)
-    return df, cluster_stats, model
+    return df, cluster_stats, pipeline[-1]
+
+
+def clusterize_errors_streaming(
+    directory: str = "app/data/raw",
+    n_clusters: int = 3,
+    chunk_rows: int = 1_000_000,
+    epochs: int = 1,
+    labels_path: str = None,
+    refit: bool = False,
+    cancel_event=None,
+):
+    """Кластеризация всей истории ошибок без загрузки её в память (MiniBatchKMeans).
+
+    Чанки из iter_error_data проходят несколько раз: схема (коды ошибок и свежий чанк
+    для проверки дрейфа), scaler.partial_fit, epochs проходов MiniBatchKMeans.partial_fit
+    и, наконец, разметка. Обучение пропускается, если в model_registry есть подходящая версия. Метки (в порядке строк
+    load_all_error_data) пишутся в labels_path как .npy через memmap или возвращаются
+    массивом (тип — наименьший беззнаковый, обычно uint8). Возвращает (labels, cluster_stats, model).
+    cancel_event (core.compute) проверяется перед каждым чанком всех проходов.
+    """
+    manifest = directory_manifest(directory)
+    fingerprint = hashlib.blake2b(repr(sorted(manifest.items())).encode(), digest_size=16).hexdigest()
+
+    # Проход 1: схема признаков и число строк (читаются только столбцы признаков);
+    # последний, самый свежий чанк остаётся для оценки дрейфа
+    codes, n_rows, newest = set(), 0, None
+    for chunk in iter_error_data(directory, chunk_rows, usecols=["error_code", "parameter_value"]):
+        raise_if_cancelled(cancel_event)
+        codes.update(chunk["error_code"].dropna().unique())
+        n_rows += len(chunk)
+        newest = chunk
+    columns = ["parameter_value"] + [f"error_code_{code}" for code in sorted(codes)]
+    params = {"n_clusters": n_clusters, "epochs": epochs}
+
+    # Проверка, обучение и сохранение версии — под блокировкой модели, чтобы не обучать её дважды
+    with model_registry.fitting(STREAMING_ERROR_MODEL):
+        pipeline = None
+        current = None if refit else model_registry.latest(STREAMING_ERROR_MODEL)
+        if current is not None and newest is not None:
+            # Дрейф оцениваем по последнему (самому свежему) чанку из первого прохода
+            if model_registry.is_usable(current[1], encode_errors(newest, columns), params, fingerprint):
+                pipeline, record = current
+
+        if pipeline is None:
+            scaler = StandardScaler()
+            for chunk in iter_error_data(directory, chunk_rows):
+                raise_if_cancelled(cancel_event)
+                scaler.partial_fit(encode_errors(chunk, columns))
+            model = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3, batch_size=4096)
+            for _ in range(epochs):
+                for chunk in iter_error_data(directory, chunk_rows):
+                    raise_if_cancelled(cancel_event)
+                    model.partial_fit(scaler.transform(encode_errors(chunk, columns)))
+            pipeline = make_pipeline(scaler, model)
+
+        # Последний проход: метки, инерция и статистика кластеров по parameter_value
+        label_dtype = np.min_scalar_type(n_clusters)
+        if labels_path is not None:
+            labels = open_memmap(labels_path, mode="w+", dtype=label_dtype, shape=(n_rows,))
+        else:
+            labels = np.empty(n_rows, dtype=label_dtype)
+        count, total, total_sq = np.zeros(n_clusters), np.zeros(n_clusters), np.zeros(n_clusters)
+        inertia, pos = 0.0, 0
+        for chunk in iter_error_data(directory, chunk_rows):
+            raise_if_cancelled(cancel_event)
+            X = pipeline[0].transform(encode_errors(chunk, columns))
+            chunk_labels = pipeline[-1].predict(X)
+            labels[pos:pos + len(chunk)] = chunk_labels
+            pos += len(chunk)
+            inertia -= pipeline[-1].score(X)
+            values = chunk["parameter_value"].to_numpy()
+            count += np.bincount(chunk_labels, minlength=n_clusters)
+            total += np.bincount(chunk_labels, weights=values, minlength=n_clusters)
+            total_sq += np.bincount(chunk_labels, weights=values ** 2, minlength=n_clusters)
+        if labels_path is not None:
+            labels.flush()
+
+        if current is None or pipeline is not current[0]:
+            pipeline[-1].inertia_ = inertia
+            # Средние и дисперсии scaler.partial_fit — точка отсчёта для дрейфа следующих запусков
+            baseline = {"mean": pipeline[0].mean_.tolist(), "std": np.sqrt(pipeline[0].var_).tolist()}
+            model_registry.save(STREAMING_ERROR_MODEL, pipeline, columns, fingerprint, n_rows, params, baseline=baseline)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        std = np.sqrt((total_sq - count * mean ** 2) / (count - 1))
+    cluster_stats = pd.DataFrame({"cluster": np.arange(n_clusters), "count": count.astype(int), "mean": mean, "std": std})
+    cluster_stats = cluster_stats[cluster_stats["count"] > 0].reset_index(drop=True)
+
+    print(f"🔹 Кластеры сформированы потоково ({n_rows} строк, инерция {inertia:.1f}):")
+    print(cluster_stats)
+    return labels, cluster_stats, pipeline[-1]
@@ -1,19 +1,201 @@
 # app/core/data_loader.py
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
 import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Явные типы: без автоопределения и с кодом ошибки как категорией
+ERROR_DTYPES = {
+    "export_time": "string",
+    "error_code": "category",
+    "parameter_value": "float64",
+}
+
+# Дневные партиции: один файл на день выгрузки
+PARTITION_PATTERN = re.compile(r"^errors_(\d{4})_(\d{2})_(\d{2})\.csv$")
+
+# Кэш по папке: только прочитанные файлы (имя -> (размер и mtime, фрейм)); общий фрейм
+# собирается из них при каждом вызове, чтобы данные не хранились в памяти дважды
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def read_error_file(path: str) -> pd.DataFrame:
+    """Читает один дневной CSV с ошибками в явных типах."""
+    df = pd.read_csv(path, dtype=ERROR_DTYPES)
+    if "export_time" in df.columns:
+        # Внутри файла время выгрузки почти всегда одно — cache=True разбирает каждое значение один раз
+        df["export_time"] = pd.to_datetime(df["export_time"], format="ISO8601", cache=True)
+    return df
+
+
+def combine_error_frames(frames: list) -> pd.DataFrame:
+    """Склеивает фреймы файлов, сохраняя error_code категорией с общим набором категорий."""
+    frames = [f for f in frames if len(f.columns)]
+    if not frames:
+        return pd.DataFrame(columns=list(ERROR_DTYPES))
+    codes = [f["error_code"] for f in frames if "error_code" in f.columns]
+    if len(codes) == len(frames):
+        categories = union_categoricals([c.array for c in codes], ignore_order=True).categories
+        frames = [f.assign(error_code=f["error_code"].cat.set_categories(categories)) for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
 
-def load_all_error_data(directory: str = "app/data/raw") -> pd.DataFrame:
-    """Собирает все CSV из указанной папки в единый DataFrame."""
-    files = [f for f in os.listdir(directory) if f.endswith(".csv")]
+def partition_date(filename: str):
+    """Дата партиции из имени файла (errors_2025_10_08.csv) или None, если имя не по шаблону."""
+    match = PARTITION_PATTERN.match(filename)
+    if match is None:
+        return None
+    try:
+        return date(*map(int, match.groups()))
+    except ValueError:
+        return None
+
+
+def list_partitions(directory: str = "app/data/raw") -> dict:
+    """Файлы-партиции папки: {дата: имя файла}."""
+    partitions = {}
+    for file in os.listdir(directory):
+        day = partition_date(file)
+        if day is not None:
+            partitions[day] = file
+    return dict(sorted(partitions.items()))
+
+
+def _file_stamp(directory: str, file: str) -> tuple:
+    st = os.stat(os.path.join(directory, file))
+    return st.st_size, st.st_mtime_ns
+
+
+def directory_manifest(directory: str = "app/data/raw") -> dict:
+    """CSV-файлы папки в порядке загрузки: {имя: (размер, mtime)}."""
+    files = sorted(f for f in os.listdir(directory) if f.endswith(".csv"))
     if not files:
         raise FileNotFoundError("❌ В директории нет CSV файлов.")
+    return {file: _file_stamp(directory, file) for file in files}
+
+
+def iter_error_data(directory: str = "app/data/raw", chunk_rows: int = 1_000_000, usecols: list = None):
+    """Потоковое чтение тех же строк и в том же порядке, что и load_all_error_data.
+
+    Мелкие дневные файлы склеиваются до chunk_rows строк, крупные читаются по частям;
+    чанки не кэшируются — память ограничена примерно одним чанком. error_code в
+    чанке — категория только со встретившимися в нём кодами.
+    """
+    pending, rows = [], 0
+    for file in directory_manifest(directory):
+        reader = pd.read_csv(os.path.join(directory, file), dtype=ERROR_DTYPES, usecols=usecols, chunksize=chunk_rows)
+        for part in reader:
+            if "export_time" in part.columns:
+                part["export_time"] = pd.to_datetime(part["export_time"], format="ISO8601", cache=True)
+            if rows + len(part) > chunk_rows and pending:
+                yield combine_error_frames(pending)
+                pending, rows = [], 0
+            pending.append(part)
+            rows += len(part)
+    if pending:
+        yield combine_error_frames(pending)
+
+
+def _read_files(entry: dict, directory: str, files: list, manifest: dict, max_workers: int = None) -> tuple:
+    """Фреймы файлов: неизменённые берутся из кэша, новые и изменённые читаются параллельно."""
+    cached = entry["files"]
+    changed = [f for f in files if f not in cached or cached[f][0] != manifest[f]]
+    if changed:
+        paths = [os.path.join(directory, f) for f in changed]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for file, df in zip(changed, pool.map(read_error_file, paths)):
+                cached[file] = (manifest[file], df)
+    return [cached[f][1] for f in files], len(changed)
+
+
+def _cache_entry(directory: str, existing) -> dict:
+    """Запись кэша папки без файлов, которых в ней больше нет."""
+    entry = _cache.setdefault(os.path.abspath(directory), {"files": {}})
+    existing = set(existing)
+    for file in [f for f in entry["files"] if f not in existing]:
+        del entry["files"][file]
+    return entry
+
+
+def load_all_error_data(directory: str = "app/data/raw", max_workers: int = None) -> pd.DataFrame:
+    """Собирает все CSV из указанной папки в единый DataFrame.
+
+    Новые и изменённые файлы (по размеру и mtime) читаются параллельно в пуле потоков,
+    остальные берутся из кэша; общий фрейм каждый раз склеивается заново и с кэшем
+    данных не делит.
+    """
+    manifest = directory_manifest(directory)
+    files = list(manifest)
+
+    with _cache_lock:
+        frames, n_read = _read_files(_cache_entry(directory, files), directory, files, manifest, max_workers)
+
+    combined = combine_error_frames(frames)
+    source = f"{n_read} прочитано заново" if n_read else "кэш"
+    print(f"📦 Загружено {len(combined)} записей из {len(files)} файлов ({source}).")
+    return combined
+
+
+def query_error_data(
+    start=None,
+    end=None,
+    error_codes=None,
+    days: int = None,
+    directory: str = "app/data/raw",
+    max_workers: int = None,
+) -> pd.DataFrame:
+    """Ошибки за диапазон дат [start, end] (и, опционально, только указанных кодов).
+
+    Открываются только файлы-партиции, чья дата из имени попадает в диапазон, поэтому
+    «последние 30 дней» читают 30 файлов, а не всю историю. days=N без start берёт
+    N дней, заканчивая end (по умолчанию — последней доступной партицией). Файлы
+    не по шаблону errors_YYYY_MM_DD.csv отсечь по имени нельзя — они читаются
+    и фильтруются по export_time.
+    """
+    partitions = list_partitions(directory)
+    others = sorted(f for f in os.listdir(directory) if f.endswith(".csv") and partition_date(f) is None)
+    if not partitions and not others:
+        raise FileNotFoundError("❌ В директории нет CSV файлов.")
+
+    end = pd.Timestamp(end).date() if end is not None else None
+    start = pd.Timestamp(start).date() if start is not None else None
+    if days is not None and start is None:
+        last = end or (max(partitions) if partitions else date.today())
+        start = last - timedelta(days=days - 1)
+
+    selected = [
+        file for day, file in partitions.items()
+        if (start is None or day >= start) and (end is None or day <= end)
+    ]
+    files = selected + others
+    manifest = {file: _file_stamp(directory, file) for file in files}
+
+    with _cache_lock:
+        entry = _cache_entry(directory, list(partitions.values()) + others)
+        frames, n_read = _read_files(entry, directory, files, manifest, max_workers)
 
-    dataframes = []
-    for file in files:
-        path = os.path.join(directory, file)
-        df = pd.read_csv(path)
-        dataframes.append(df)
+    result = []
+    for file, df in zip(files, frames):
+        mask = None
+        if file in others and "export_time" in df.columns:
+            day = df["export_time"].dt.normalize()
+            mask = pd.Series(True, index=df.index)
+            if start is not None:
+                mask &= day >= pd.Timestamp(start)
+            if end is not None:
+                mask &= day <= pd.Timestamp(end)
+        if error_codes is not None and "error_code" in df.columns:
+            codes = df["error_code"].isin(list(error_codes))
+            mask = codes if mask is None else mask & codes
+        # Без фильтра по строкам тоже берём поверхностную копию, чтобы не отдавать наружу фрейм из кэша
+        result.append(df.copy(deep=False) if mask is None else df[mask])
 
-    combined = pd.concat(dataframes, ignore_index=True)
-    print(f"📦 Загружено {len(combined)} записей из {len(files)} файлов.")
+    combined = combine_error_frames(result)
+    print(f"📦 Загружено {len(combined)} записей из {len(files)} файлов "
+          f"(из {len(partitions) + len(others)}, {n_read} прочитано заново).")
     return combined
@@ -0,0 +1,88 @@
+# app/core/lazy_tabs.py — копия core/lazy_tabs.py из vizualization: правится только там, расхождение ловит tests/test_vendored.py
+from nicegui import background_tasks, ui
+
+from .compute import ComputeCancelled, offload
+
+
+class LazyTabPanels:
+    """Панели вкладок, содержимое которых строится при первом открытии.
+
+    Для каждой вкладки регистрируется build(result) и, при необходимости,
+    тяжёлый compute() — он выполняется через core.compute (вне event loop,
+    с очередью и прогрессом), пока в панели показан скелет, а результат
+    передаётся в build. С cancellable=True compute принимает cancel_event и
+    прерывается, если клиент ушёл (см. ComputePool). Неоткрытые вкладки ничего не считают, поэтому первая
+    отрисовка страницы включает только видимую вкладку. После ошибки вкладка
+    достраивается при следующем открытии.
+    """
+
+    def __init__(self, tabs: ui.tabs, value: ui.tab | str, classes: str = '', panel_classes: str = '',
+                 compute_name: str = 'Подготовка данных'):
+        self.panel_classes = panel_classes
+        self.compute_name = compute_name
+        self.initial = _tab_name(value)
+        self.panels = ui.tab_panels(tabs, value=value, on_change=self._on_change).classes(classes)
+        self._tabs = {}
+        self._built = set()
+        self._loading = set()
+
+    def tab(self, tab: ui.tab | str, build, compute=None, cancellable: bool = False) -> ui.tab_panel:
+        """Регистрирует вкладку; видимая вкладка начинает строиться сразу"""
+        name = _tab_name(tab)
+        with self.panels:
+            panel = ui.tab_panel(name).classes(self.panel_classes)
+        self._tabs[name] = (panel, build, compute, cancellable)
+        if name == self.initial:
+            background_tasks.create(self.activate(name), name=f'lazy tab {name}')
+        return panel
+
+    def _on_change(self, e):
+        name = _tab_name(e.value)
+        if name in self._tabs:
+            background_tasks.create(self.activate(name), name=f'lazy tab {name}')
+
+    async def activate(self, name: str):
+        """Строит содержимое вкладки, если оно ещё не построено"""
+        if name in self._built or name in self._loading:
+            return
+        self._loading.add(name)
+        panel, build, compute, cancellable = self._tabs[name]
+        try:
+            panel.clear()
+            if compute is None:
+                with panel:
+                    build()
+            else:
+                with panel:
+                    progress = ui.column().classes('w-full')
+                    self.skeleton()
+                # Расчёт идёт через общую очередь вне event loop, прогресс — над скелетом
+                with progress:
+                    result = await offload(compute, name=self.compute_name, cancellable=cancellable)
+                panel.clear()
+                with panel:
+                    build(result)
+            self._built.add(name)
+        except ComputeCancelled:
+            pass
+        except Exception as e:
+            panel.clear()
+            with panel:
+                ui.label(f'Ошибка построения вкладки: {e}').style('color: red; font-size: 16px;')
+        finally:
+            self._loading.discard(name)
+
+    @staticmethod
+    def skeleton() -> ui.column:
+        """Заглушка на время расчёта: строка метрик и два графика"""
+        with ui.column().classes('w-full gap-4') as placeholder:
+            with ui.row().classes('w-full gap-4'):
+                for _ in range(4):
+                    ui.skeleton(height='90px').classes('flex-1')
+            ui.skeleton(height='360px').classes('w-full')
+            ui.skeleton(height='360px').classes('w-full')
+        return placeholder
+
+
+def _tab_name(tab) -> str:
+    return tab._props['name'] if isinstance(tab, (ui.tab, ui.tab_panel)) else tab
@@ -1,8 +1,20 @@
 # app/main.py
 from nicegui import ui
+from core.compute import ComputeBusy, ComputeCancelled, offload
 from core.data_generator import generate_iot_error_data
 from visual.dashboard_full import create_dashboard_full
 
+async def generate_data():
+    # Генерация пишет файлы за 10 дней — через очередь расчётов, чтобы не блокировать других клиентов
+    try:
+        await offload(generate_iot_error_data, days=10, name='Генерация данных')
+    except ComputeBusy as e:
+        ui.notify(str(e), type='warning')
+        return
+    except ComputeCancelled:
+        return
+    ui.notify('Тестовые данные сгенерированы')
+
 @ui.page('/')
 def main_page():
     ui.page_title('IoT Monitoring — Dashboard')
@@ -11,7 +23,7 @@ def main_page():
     with ui.header().classes('bg-blue-600 text-white p-4 flex justify-between items-center'):
         ui.label("IoT Error Analyzer").classes('text-2xl font-semibold')
         with ui.row():
-            ui.button('Сгенерировать тестовые данные', on_click=lambda: generate_iot_error_data(days=10), color='white')
+            ui.button('Сгенерировать тестовые данные', on_click=generate_data, color='white')
             ui.button('Обновить', on_click=lambda: ui.notify('Обновлено'), color='white')
 
     # main content: create dashboard
@@ -1,7 +1,13 @@
 # app/visual/dashboard_full.py
+import functools
+import threading
+
 from nicegui import ui
-from core.data_loader import load_all_error_data
-from core.clustering import clusterize_errors
+from core.compute import ComputeCancelled
+from core.data_loader import load_all_error_data, query_error_data
+from core.clustering import ERROR_MODEL, clusterize_errors
+from core.model_registry import model_registry
+from core.lazy_tabs import LazyTabPanels
 from .charts import fig_errors_by_day, fig_error_code_distribution, fig_parameter_histogram, fig_scatter_clusters, fig_box_by_cluster
 import pandas as pd
 
@@ -17,71 +23,111 @@ def create_dashboard_full():
             tab_clusters = ui.tab('🧩 Clusters')
             tab_compare = ui.tab('🔍 Compare')
 
-        with ui.tab_panels(tabs, value=tab_overview).classes('w-full max-w-7xl'):
-
-            # ----------------- OVERVIEW -----------------
-            with ui.tab_panel(tab_overview):
-                df = safe_load()
-                # KPI cards
-                total_errors = len(df)
-                avg_param = df['parameter_value'].mean() if 'parameter_value' in df.columns else 0
-                cluster_count = df['cluster'].nunique() if 'cluster' in df.columns else 0
-
-                with ui.row().classes('w-full gap-6'):
-                    with ui.card().classes('p-4 flex-1'):
-                        ui.label('Всего ошибок').classes('text-sm text-gray-600')
-                        ui.label(f'{total_errors}').classes('text-3xl font-bold')
-                    with ui.card().classes('p-4 flex-1'):
-                        ui.label('Средний параметр').classes('text-sm text-gray-600')
-                        ui.label(f'{avg_param:.2f}').classes('text-3xl font-bold')
-                    with ui.card().classes('p-4 flex-1'):
-                        ui.label('Число кластеров').classes('text-sm text-gray-600')
-                        ui.label(f'{cluster_count}').classes('text-3xl font-bold')
-
-                # large chart errors by day
-                fig = fig_errors_by_day(df)
-                ui.plotly(fig).classes('w-full')
-
-                # small table latest entries
-                ui.label('Последние ошибки').classes('text-lg font-medium mt-4')
-                rows = df.tail(20).to_dict('records')
-                # columns deduced
-                cols = [{'name': c, 'label': c, 'field': c} for c in (['export_time','error_code','parameter_value','cluster'] if 'cluster' in df.columns else ['export_time','error_code','parameter_value'])]
-                ui.table(columns=cols, rows=rows).classes('w-full').props('pagination="10"')
-
-            # ----------------- TRENDS -----------------
-            with ui.tab_panel(tab_trends):
-                df = safe_load()
-                ui.label('Error trends').classes('text-xl font-semibold')
-                fig1 = fig_errors_by_day(df, days=30)
-                ui.plotly(fig1).classes('w-full')
-                fig2 = fig_error_code_distribution(df)
-                ui.plotly(fig2).classes('w-full')
-                fig3 = fig_parameter_histogram(df)
-                ui.plotly(fig3).classes('w-full')
-
-            # ----------------- CLUSTERS -----------------
-            with ui.tab_panel(tab_clusters):
-                df = safe_load()
-                ui.label('Cluster analysis').classes('text-xl font-semibold')
-                fig = fig_scatter_clusters(df)
-                ui.plotly(fig).classes('w-full')
-                figb = fig_box_by_cluster(df)
-                ui.plotly(figb).classes('w-full')
-                # cluster stats table if exists
-                if 'cluster' in df.columns:
-                    stats = df.groupby('cluster')['parameter_value'].agg(['count','mean','std']).reset_index()
-                    cols = [{'name': c, 'label': c, 'field': c} for c in stats.columns]
-                    rows = stats.to_dict('records')
-                    ui.table(columns=cols, rows=rows).classes('w-full')
-
-            # ----------------- COMPARE -----------------
-            with ui.tab_panel(tab_compare):
-                ui.label('Compare shifts — coming soon').classes('text-lg')
-
-def safe_load():
+        # Данные читаются и кластеризуются один раз на страницу и только при открытии первой вкладки;
+        # вкладки считаются в очереди core.compute параллельно, поэтому загрузка под блокировкой.
+        # Если клиент ушёл, подбор числа кластеров прерывается и в кэш ничего не попадает
+        cached = {}
+        lock = threading.Lock()
+
+        def load(cancel_event=None):
+            with lock:
+                if 'df' not in cached:
+                    cached['df'] = safe_load(cancel_event)
+                return cached['df']
+
+        panels = LazyTabPanels(tabs, value=tab_overview, classes='w-full max-w-7xl')
+        panels.tab(tab_overview, overview, compute=load, cancellable=True)
+        panels.tab(tab_trends, trends, compute=functools.partial(load_trends, load), cancellable=True)
+        panels.tab(tab_clusters, clusters, compute=functools.partial(load_clusters, load), cancellable=True)
+        panels.tab(tab_compare, lambda: ui.label('Compare shifts — coming soon').classes('text-lg'))
+
+
+# ----------------- OVERVIEW -----------------
+def overview(df):
+    # KPI cards
+    total_errors = len(df)
+    avg_param = df['parameter_value'].mean() if 'parameter_value' in df.columns else 0
+    cluster_count = df['cluster'].nunique() if 'cluster' in df.columns else 0
+
+    with ui.row().classes('w-full gap-6'):
+        with ui.card().classes('p-4 flex-1'):
+            ui.label('Всего ошибок').classes('text-sm text-gray-600')
+            ui.label(f'{total_errors}').classes('text-3xl font-bold')
+        with ui.card().classes('p-4 flex-1'):
+            ui.label('Средний параметр').classes('text-sm text-gray-600')
+            ui.label(f'{avg_param:.2f}').classes('text-3xl font-bold')
+        with ui.card().classes('p-4 flex-1'):
+            ui.label('Число кластеров').classes('text-sm text-gray-600')
+            ui.label(f'{cluster_count}').classes('text-3xl font-bold')
+
+    # large chart errors by day
+    fig = fig_errors_by_day(df)
+    ui.plotly(fig).classes('w-full')
+
+    # small table latest entries
+    ui.label('Последние ошибки').classes('text-lg font-medium mt-4')
+    # export_time теперь datetime — в таблицу отдаём строкой (orjson не сериализует Timestamp)
+    latest = df.tail(20)
+    rows = latest.assign(export_time=latest['export_time'].astype(str)).to_dict('records')
+    # columns deduced
+    cols = [{'name': c, 'label': c, 'field': c} for c in (['export_time','error_code','parameter_value','cluster'] if 'cluster' in df.columns else ['export_time','error_code','parameter_value'])]
+    ui.table(columns=cols, rows=rows).classes('w-full').props('pagination="10"')
+
+
+# ----------------- TRENDS -----------------
+def load_trends(load, cancel_event=None):
+    df = load(cancel_event)
+    # Для графика за 30 дней читаем только нужные дневные файлы
+    try:
+        recent = query_error_data(days=30)
+    except Exception:
+        recent = df
+    return df, recent
+
+
+def trends(data):
+    df, recent = data
+    ui.label('Error trends').classes('text-xl font-semibold')
+    fig1 = fig_errors_by_day(recent, days=30)
+    ui.plotly(fig1).classes('w-full')
+    fig2 = fig_error_code_distribution(df)
+    ui.plotly(fig2).classes('w-full')
+    fig3 = fig_parameter_histogram(df)
+    ui.plotly(fig3).classes('w-full')
+
+
+# ----------------- CLUSTERS -----------------
+def load_clusters(load, cancel_event=None):
+    df = load(cancel_event)
+    # Оценки подбора числа кластеров (n_clusters="auto") сохранены в записи модели
+    records = model_registry.records(ERROR_MODEL)
+    scores = records[-1].metrics.get('k_selection') if records else None
+    return df, scores
+
+
+def clusters(data):
+    df, scores = data
+    ui.label('Cluster analysis').classes('text-xl font-semibold')
+    fig = fig_scatter_clusters(df)
+    ui.plotly(fig).classes('w-full')
+    figb = fig_box_by_cluster(df)
+    ui.plotly(figb).classes('w-full')
+    # cluster stats table if exists
+    if 'cluster' in df.columns:
+        stats = df.groupby('cluster')['parameter_value'].agg(['count','mean','std']).reset_index()
+        cols = [{'name': c, 'label': c, 'field': c} for c in stats.columns]
+        rows = stats.to_dict('records')
+        ui.table(columns=cols, rows=rows).classes('w-full')
+    if scores:
+        ui.label(f"Число кластеров: {df['cluster'].nunique()} (лучший silhouette)").classes('text-lg font-medium mt-4')
+        cols = [{'name': c, 'label': c, 'field': c} for c in ['k', 'silhouette', 'davies_bouldin', 'inertia']]
+        rows = pd.DataFrame(scores).round(3).to_dict('records')
+        ui.table(columns=cols, rows=rows, row_key='k').classes('w-full')
+
+
+def safe_load(cancel_event=None):
     """Helper: loads data and ensures it has reasonable columns.
-    Also runs clustering if clusters absent."""
+    Also runs clustering if clusters absent (cancel_event stops it, see core.compute)."""
     try:
         df = load_all_error_data()
     except Exception:
@@ -98,7 +144,9 @@ def safe_load():
     # if no cluster column — try to cluster quickly
     if 'cluster' not in df.columns or df['cluster'].isna().all():
         try:
-            df, _, _ = clusterize_errors(df, n_clusters=3)
+            df, _, _ = clusterize_errors(df, n_clusters="auto", cancel_event=cancel_event)
+        except ComputeCancelled:
+            raise
         except Exception:
             # fallback: put all zeros
             df['cluster'] = 0
@@ -0,0 +1,211 @@
+# charts/downsample.py — копия core/downsample.py: правится только там, расхождение ловит tests/test_vendored.py
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from nicegui import ui
+
+# Ширина графика до первого замера в браузере и сколько точек на пиксель ещё различимо на линии
+DEFAULT_WIDTH_PX = 1200
+POINTS_PER_PX = 2
+# Замеренная ширина округляется до шага, чтобы мелкие изменения размера не пересчитывали ряды
+WIDTH_STEP_PX = 100
+
+# Отправляет на сервер clientWidth графика сразу после появления элемента и при каждом изменении размера
+WIDTH_OBSERVER_JS = '''
+(function observe() {
+    const el = getHtmlElement(%(id)d);
+    if (!el) return setTimeout(observe, 100);
+    new ResizeObserver(() => getElement(%(id)d)?.$emit('chart_width', el.clientWidth)).observe(el);
+})();
+'''
+
+
+def point_budget(width_px: int = DEFAULT_WIDTH_PX, points_per_px: float = POINTS_PER_PX) -> int:
+    """Сколько точек имеет смысл отправлять в браузер для графика шириной width_px"""
+    return max(int(width_px * points_per_px), 16)
+
+
+def numeric_x(x) -> np.ndarray:
+    """Ось X как float64: даты — в наносекундах, числа — как есть, прочее — по порядку"""
+    values = np.asarray(x)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').view(np.int64).astype(np.float64)
+    if np.issubdtype(values.dtype, np.number):
+        return values.astype(np.float64)
+    try:
+        return pd.to_datetime(pd.Series(values), format='ISO8601').to_numpy().view(np.int64).astype(np.float64)
+    except (ValueError, TypeError):
+        return np.arange(len(values), dtype=np.float64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Индексы точек, выбранных Largest-Triangle-Three-Buckets.
+
+    Первая и последняя точки сохраняются; остальные делятся на n_out - 2 корзины,
+    и из каждой берётся точка, образующая наибольший треугольник с уже выбранной
+    точкой предыдущей корзины и средним следующей. Форма линии (в том числе
+    одиночные выбросы) сохраняется заметно лучше, чем при прореживании через шаг.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Средние по корзинам считаются разом через кумулятивные суммы
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    starts, stops = edges[:-1], edges[1:]
+    counts = stops - starts
+    mean_x = (cx[stops] - cx[starts]) / counts
+    mean_y = (cy[stops] - cy[starts]) / counts
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = starts[i], stops[i]
+        if i + 1 < len(starts):
+            next_x, next_y = mean_x[i + 1], mean_y[i + 1]
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # Удвоенная площадь треугольника (a, точка корзины, среднее следующей корзины)
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_envelope(x: np.ndarray, y: np.ndarray, n_buckets: int):
+    """Минимум и максимум y по n_buckets равным корзинам: (x начала корзины, min, max)"""
+    n = len(y)
+    n_buckets = max(1, min(n_buckets, n))
+    starts = np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1]
+    return x[starts], np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)
+
+
+class DownsampledFigure:
+    """Фигура plotly, у которой длинные линии прореживаются до бюджета точек.
+
+    Исходные ряды линий (go.Scatter с mode, содержащим 'lines') длиннее бюджета
+    остаются на сервере; в фигуру попадает LTTB-выборка и, при envelope=True,
+    полоса min/max по корзинам, чтобы пики не терялись. window(x0, x1) заново
+    прореживает только видимый диапазон — так при зуме детализация растёт до
+    исходной. resize(width_px) пересчитывает бюджет под фактическую ширину графика.
+    """
+
+    def __init__(self, fig: go.Figure, width_px: int = DEFAULT_WIDTH_PX, envelope: bool = True):
+        self.fig = go.Figure(fig)
+        self.budget = point_budget(width_px)
+        self.envelope = envelope
+        self.raw = {}
+        self._range = (None, None)
+        for i, trace in enumerate(self.fig.data):
+            if isinstance(trace, go.Scatter) and 'lines' in (trace.mode or 'lines') \
+                    and trace.x is not None and len(trace.x) > self.budget:
+                x, y = np.asarray(trace.x), np.asarray(trace.y, dtype=np.float64)
+                keep = ~np.isnan(y)
+                x, y = x[keep], y[keep]
+                order = np.argsort(numeric_x(x), kind='stable')
+                self.raw[i] = (x[order], numeric_x(x)[order], y[order])
+        self._envelope_traces = {}
+        if self.envelope:
+            for i in self.raw:
+                trace = self.fig.data[i]
+                color = trace.line.color if trace.line and trace.line.color else '#95a5a6'
+                self.fig.add_trace(go.Scatter(x=[], y=[], mode='lines', line=dict(width=0), hoverinfo='skip',
+                                              showlegend=False, name=f'{trace.name} max'))
+                self.fig.add_trace(go.Scatter(x=[], y=[], mode='lines', line=dict(width=0), fill='tonexty',
+                                              fillcolor=_transparent(color), hoverinfo='skip',
+                                              showlegend=False, name=f'{trace.name} min'))
+                self._envelope_traces[i] = (len(self.fig.data) - 2, len(self.fig.data) - 1)
+        # Постоянный uirevision: обновление фигуры после зума не сбрасывает состояние осей в браузере
+        self.fig.update_layout(uirevision='downsample')
+        self.window()
+
+    @property
+    def downsampled(self) -> bool:
+        return bool(self.raw)
+
+    def window(self, x0=None, x1=None) -> go.Figure:
+        """Прореживает ряды в диапазоне [x0, x1] (None — весь ряд) и возвращает фигуру"""
+        self._range = (x0, x1)
+        lo = None if x0 is None else numeric_x([x0])[0]
+        hi = None if x1 is None else numeric_x([x1])[0]
+        with self.fig.batch_update():
+            for i, (x, x_num, y) in self.raw.items():
+                start = 0 if lo is None else max(int(np.searchsorted(x_num, lo, side='left')) - 1, 0)
+                stop = len(x) if hi is None else min(int(np.searchsorted(x_num, hi, side='right')) + 1, len(x))
+                xs, xn, ys = x[start:stop], x_num[start:stop], y[start:stop]
+
+                idx = lttb_indices(xn, ys, self.budget)
+                self.fig.data[i].x, self.fig.data[i].y = xs[idx], ys[idx]
+                if i in self._envelope_traces:
+                    upper, lower = self._envelope_traces[i]
+                    if len(idx) < len(ys):
+                        bx, low, high = minmax_envelope(xs, ys, self.budget // 2)
+                    else:
+                        bx, low, high = [], [], []
+                    self.fig.data[upper].x, self.fig.data[upper].y = bx, high
+                    self.fig.data[lower].x, self.fig.data[lower].y = bx, low
+        return self.fig
+
+    def resize(self, width_px: int) -> bool:
+        """Бюджет точек под замеренную ширину графика: True, если ряды были пересчитаны"""
+        width_px = max(round(width_px / WIDTH_STEP_PX), 1) * WIDTH_STEP_PX
+        budget = point_budget(width_px)
+        if not self.raw or budget == self.budget:
+            return False
+        self.budget = budget
+        self.window(*self._range)
+        return True
+
+    def relayout(self, event: dict) -> bool:
+        """Обработка plotly_relayout: True, если ряды были пересчитаны"""
+        if not self.raw:
+            return False
+        if event.get('xaxis.autorange'):
+            self.window()
+            self.fig.update_xaxes(autorange=True, range=None)
+            return True
+        # Зум мышью присылает xaxis.range[0]/[1], Plotly.relayout из кода — и массив xaxis.range
+        if 'xaxis.range' in event:
+            x0, x1 = event['xaxis.range']
+        elif 'xaxis.range[0]' in event and 'xaxis.range[1]' in event:
+            x0, x1 = event['xaxis.range[0]'], event['xaxis.range[1]']
+        else:
+            return False
+        self.window(x0, x1)
+        # Фигура отправляется заново — сохраняем выбранный пользователем диапазон
+        self.fig.update_xaxes(range=[x0, x1], autorange=False)
+        return True
+
+
+def downsampled_plot(fig, width_px: int = DEFAULT_WIDTH_PX) -> ui.plotly:
+    """ui.plotly с прореживанием длинных линий и догрузкой точек при зуме.
+
+    fig — go.Figure или уже подготовленная DownsampledFigure; width_px — оценка ширины
+    до первого замера, дальше бюджет точек следует за clientWidth элемента в браузере.
+    """
+    downsampled = fig if isinstance(fig, DownsampledFigure) else DownsampledFigure(fig, width_px)
+    plot = ui.plotly(downsampled.fig)
+    if downsampled.downsampled:
+        def on_relayout(e):
+            if downsampled.relayout(e.args):
+                plot.update()
+
+        def on_width(e):
+            # Скрытая (ещё не открытая) вкладка даёт ширину 0
+            if isinstance(e.args, (int, float)) and e.args > 0 and downsampled.resize(int(e.args)):
+                plot.update()
+
+        plot.on('plotly_relayout', on_relayout)
+        plot.on('chart_width', on_width, throttle=0.5)
+        ui.run_javascript(WIDTH_OBSERVER_JS % {'id': plot.id})
+    return plot
+
+
+def _transparent(color: str, alpha: float = 0.2) -> str:
+    if isinstance(color, str) and color.startswith('#') and len(color) == 7:
+        r, g, b = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+        return f'rgba({r}, {g}, {b}, {alpha})'
+    return f'rgba(149, 165, 166, {alpha})'
@@ -2,16 +2,22 @@
 from nicegui import ui
 import plotly.graph_objects as go
 from .base_chart import BaseChart
+from .downsample import DEFAULT_WIDTH_PX, downsampled_plot
 
 class LineChart(BaseChart):
-    def __init__(self, title: str, x_label: str = "X", y_label: str = "Y"):
+    def __init__(self, title: str, x_label: str = "X", y_label: str = "Y", width_px: int = DEFAULT_WIDTH_PX):
         self.title = title
         self.x_label = x_label
         self.y_label = y_label
+        # Оценка ширины графика до первого замера clientWidth в браузере
+        self.width_px = width_px
 
     def render(self,  data):
         """
         data = {"x": [...], "y": [...]}
+
+        Длинные ряды прореживаются (LTTB + полоса min/max) под фактическую ширину графика;
+        исходные точки остаются на сервере и подгружаются при зуме.
         """
         fig = go.Figure()
         fig.add_trace(go.Scatter(
@@ -31,4 +37,4 @@ class LineChart(BaseChart):
         )
 
         with ui.card().classes('w-full'):
-            ui.plotly(fig).classes('w-full')
\ No newline at end of file
+            downsampled_plot(fig, self.width_px).classes('w-full')
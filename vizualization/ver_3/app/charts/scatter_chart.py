@@ -2,6 +2,9 @@ from nicegui import ui
 import plotly.graph_objects as go
 from .base_chart import BaseChart
 
+# Выше этого числа точек SVG-отрисовка начинает тормозить — переходим на WebGL (go.Scattergl)
+WEBGL_THRESHOLD = 10_000
+
 class ScatterChart(BaseChart):
     def __init__(self, title: str = "Scatter Plot", x_label: str = "X", y_label: str = "Y", color_label: str = "Group"):
         self.title = title
@@ -18,10 +21,11 @@ class ScatterChart(BaseChart):
         }
         """
         fig = go.Figure()
+        trace_class = go.Scattergl if len(data["x"]) > WEBGL_THRESHOLD else go.Scatter
 
         if "color" in data:
             # Цвет по категориям (например, кластеры)
-            fig.add_trace(go.Scatter(
+            fig.add_trace(trace_class(
                 x=data["x"],
                 y=data["y"],
                 mode='markers',
@@ -31,12 +35,13 @@ class ScatterChart(BaseChart):
                     showscale=True,
                     colorbar=dict(title=self.color_label)
                 ),
-                text=[f"Cluster: {c}" for c in data.get("labels", data["color"])],
-                hoverinfo="text+x+y"
+                # Подпись кластера подставляется в браузере — без строки на каждую точку
+                customdata=data.get("labels", data["color"]),
+                hovertemplate="Cluster: %{customdata}<br>x: %{x}<br>y: %{y}<extra></extra>"
             ))
         else:
             # Без цвета
-            fig.add_trace(go.Scatter(
+            fig.add_trace(trace_class(
                 x=data["x"],
                 y=data["y"],
                 mode='markers'